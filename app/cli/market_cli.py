@@ -4,6 +4,7 @@ import sys
 from rich.console import Console
 from rich.table import Table
 from app.infrastructure.adapters.esi_adapter_market import ESIClientMarket
+from app.infrastructure.adapters.esi_transport import close_shared_transport
 
 console = Console()
 
@@ -12,10 +13,17 @@ async def show_market_orders(region_id: int, type_id: int = None, order_type: st
     client = ESIClientMarket()
     
     try:
-        with console.status(f"[bold green]Obteniendo órdenes para región {region_id}..."):
-            orders = await client.get_market_orders(region_id, type_id, order_type)
+        # Se consumen las páginas según llegan: solo se guardan las 20 que se muestran
+        orders = []
+        total = 0
+        with console.status(f"[bold green]Obteniendo órdenes para región {region_id}...") as status:
+            async for batch in client.iter_market_orders(region_id, type_id, order_type):
+                if len(orders) < 20:
+                    orders.extend(batch[: 20 - len(orders)])
+                total += len(batch)
+                status.update(f"[bold green]Región {region_id}: {total:,} órdenes recibidas...")
         
-        if not orders:
+        if not total:
             console.print(f"[yellow]No se encontraron órdenes en la región {region_id}[/yellow]")
             if type_id:
                 console.print(f"[dim]Filtrado por tipo: {type_id}[/dim]")
@@ -34,23 +42,23 @@ async def show_market_orders(region_id: int, type_id: int = None, order_type: st
         table.add_column("Rango", style="blue")
         
         for order in orders[:20]:  # Mostrar solo las primeras 20
-            price = f"{order.get('price', 0):,.2f}"
-            volume_remain = order.get('volume_remain', 0)
-            volume_total = order.get('volume_total', 0)
-            volume = f"{volume_remain:,}/{volume_total:,}"
-            location = str(order.get('location_id', 'N/A'))
-            order_type_display = "COMPRA" if order.get('is_buy_order', False) else "VENTA"
-            range_val = order.get('range', 'station')
+            price = f"{order.price:,.2f}"
+            volume = f"{order.volume_remain:,}/{order.volume_total:,}"
+            location = str(order.location_id or 'N/A')
+            order_type_display = "COMPRA" if order.is_buy_order else "VENTA"
+            range_val = order.range
             
             table.add_row(price, volume, location, order_type_display, range_val)
         
         console.print(table)
-        console.print(f"\n[bold]Total de órdenes:[/bold] {len(orders)}")
-        if len(orders) > 20:
-            console.print(f"[dim](Mostrando 20 de {len(orders)} órdenes)[/dim]")
+        console.print(f"\n[bold]Total de órdenes:[/bold] {total}")
+        if total > 20:
+            console.print(f"[dim](Mostrando 20 de {total} órdenes)[/dim]")
             
     except Exception as e:
         console.print(f"[red]Error: {str(e)}[/red]")
+    finally:
+        await close_shared_transport()
 
 def main():
     """CLI principal sin Typer - usando sys.argv directamente"""
@@ -0,0 +1,86 @@
+# app/cli/static_data_cli.py
+import asyncio
+import sys
+from rich.console import Console
+from rich.progress import Progress
+from app.infrastructure.adapters.esi_adapter_items import ESIClientItems
+from app.infrastructure.adapters.esi_adapter_universe import ESIClientUniverse
+from app.infrastructure.adapters.esi_transport import close_shared_transport
+from app.infrastructure.config.settings import Settings
+from app.infrastructure.persistence.static_data_store import (
+    STATIC_KINDS,
+    get_static_store,
+)
+
+console = Console()
+
+
+async def warm_up_kind(kind: str, universe: ESIClientUniverse, items: ESIClientItems):
+    """Descarga a ./data todos los elementos de un tipo que aún no estén guardados"""
+    listers = {
+        "regions": (universe.get_all_regions, universe.get_region_info),
+        "constellations": (universe.get_all_constellations, universe.get_constellation_info),
+        "systems": (universe.get_all_systems, universe.get_system_info),
+        "types": (items.get_all_type_ids, items.get_type_info),
+    }
+    list_ids, get_info = listers[kind]
+    store = get_static_store()
+
+    all_ids = await list_ids()
+    missing = sorted(set(all_ids) - set(store.ids(kind)))
+    if not missing:
+        console.print(f"[green]✔ {kind}: {len(all_ids)} ya en el almacén local[/green]")
+        return
+
+    semaphore = asyncio.Semaphore(int(Settings().ESI_MAX_CONCURRENT_PAGES))
+    stored_before = store.count(kind)
+
+    with Progress(console=console) as progress:
+        task = progress.add_task(f"[cyan]{kind}", total=len(missing))
+
+        async def fetch(entity_id: int):
+            async with semaphore:
+                try:
+                    await get_info(entity_id)
+                except Exception as e:
+                    progress.console.print(f"[yellow]⚠️ {kind} {entity_id}: {e}[/yellow]")
+                progress.advance(task)
+
+        await asyncio.gather(*(fetch(entity_id) for entity_id in missing))
+
+    downloaded = store.count(kind) - stored_before
+    console.print(
+        f"[bold]{kind}:[/bold] {downloaded} descargados, "
+        f"{len(missing) - downloaded} sin guardar, {store.count(kind)} en total"
+    )
+
+
+async def warm_up(kinds: list[str]):
+    """Función principal para poblar el almacén de datos estáticos"""
+    universe = ESIClientUniverse()
+    items = ESIClientItems()
+    try:
+        for kind in kinds:
+            await warm_up_kind(kind, universe, items)
+    except Exception as e:
+        console.print(f"[red]Error: {str(e)}[/red]")
+    finally:
+        await close_shared_transport()
+
+
+def main():
+    """CLI sin Typer: python -m app.cli.static_data_cli [regions|constellations|systems|types|all]"""
+    kinds = list(STATIC_KINDS)
+    if len(sys.argv) > 1 and sys.argv[1] != "all":
+        if sys.argv[1] not in STATIC_KINDS:
+            console.print(
+                f"[red]Uso: python -m app.cli.static_data_cli [{'|'.join(STATIC_KINDS)}|all][/red]"
+            )
+            return
+        kinds = [sys.argv[1]]
+
+    asyncio.run(warm_up(kinds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# app/core/domain/entities/alert.py
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    """
+    Regla de alerta sobre un item en una región, o solo en una estación si
+    tiene location_id. Se dispara cuando se cumplen todas sus condiciones.
+    """
+    type_id: int
+    region_id: int
+    name: str = ""
+    location_id: Optional[int] = None  # None = toda la región
+    min_spread_percentage: Optional[float] = None  # Spread % por encima de
+    max_best_sell: Optional[float] = None  # Mejor venta por debajo de
+    min_volume: Optional[int] = None  # Volumen operable (mín. de ambos lados)
+    high_confidence: bool = False  # ProfitOpportunity.is_high_confidence
+    enabled: bool = True
+    rule_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+
+    @property
+    def has_conditions(self) -> bool:
+        # Volumen mínimo 0 lo cumple cualquier snapshot: no es una condición
+        return (
+            self.min_spread_percentage is not None
+            or self.max_best_sell is not None
+            or (self.min_volume or 0) >= 1
+            or self.high_confidence
+        )
+
+    def validate(self):
+        if self.min_volume is not None and self.min_volume < 1:
+            raise ValueError("min_volume must be at least 1")
+        if not self.has_conditions:
+            raise ValueError("An alert rule needs at least one condition")
+        if self.max_best_sell is not None and self.max_best_sell <= 0:
+            raise ValueError("max_best_sell must be positive")
+
+    def describe(self) -> str:
+        """Condiciones en texto, para la vista y las notificaciones"""
+        parts: List[str] = []
+        if self.min_spread_percentage is not None:
+            parts.append(f"spread ≥ {self.min_spread_percentage:g}%")
+        if self.max_best_sell is not None:
+            parts.append(f"venta ≤ {self.max_best_sell:,.2f} ISK")
+        if self.min_volume is not None:
+            parts.append(f"volumen ≥ {self.min_volume:,}")
+        if self.high_confidence:
+            parts.append("alta confianza")
+        return ", ".join(parts)
+
+
+@dataclass(frozen=True)
+class AlertEvent:
+    """Disparo de una regla: valores del mercado en el snapshot que la activó"""
+    rule_id: int
+    rule_name: str
+    type_id: int
+    region_id: int
+    location_id: Optional[int]
+    triggered_at: datetime
+    best_buy: Optional[float]
+    best_sell: Optional[float]
+    spread_percentage: Optional[float]
+    buy_volume: int
+    sell_volume: int
+    confidence: Optional[float]
+    event_id: Optional[int] = None
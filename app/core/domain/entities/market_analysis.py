@@ -3,6 +3,8 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 
+from app.core.domain.value_objects.market_values import HIGH_CONFIDENCE
+
 @dataclass(frozen=True)
 class MarketOrderSummary:
     """Resumen de órdenes de mercado para un item específico"""
@@ -52,7 +54,7 @@ class ProfitOpportunity:
     
     def is_high_confidence(self) -> bool:
         """Determina si es una oportunidad de alta confianza"""
-        return self.confidence >= 0.7
+        return self.confidence >= HIGH_CONFIDENCE
 
 @dataclass(frozen=True)
 class MarketAnalysisResult:
@@ -64,6 +66,9 @@ class MarketAnalysisResult:
     total_opportunities: int
     analysis_timestamp: datetime
     parameters: dict
+    system_id: Optional[int] = None  # Ámbito del análisis (None = toda la región)
+    location_id: Optional[int] = None
+    next_cursor: Optional[str] = None  # Cursor de la página siguiente, si la hay
     
     @property
     def top_opportunity(self) -> Optional[ProfitOpportunity]:
@@ -77,4 +82,38 @@ class MarketAnalysisResult:
     
     def get_opportunities_above_spread(self, min_spread: float) -> list[ProfitOpportunity]:
         """Filtra oportunidades por spread mínimo"""
-        return [opp for opp in self.opportunities if opp.spread_percentage >= min_spread]
\ No newline at end of file
+        return [opp for opp in self.opportunities if opp.spread_percentage >= min_spread]
+
+@dataclass(frozen=True)
+class HaulingOpportunity:
+    """Comprar en un hub (órdenes de venta) y vender en otro (órdenes de compra)"""
+    type_id: int
+    name: str
+    source_system_id: int
+    source_system_name: str
+    source_region_id: int
+    destination_system_id: int
+    destination_system_name: str
+    destination_region_id: int
+    buy_price: float  # Mejor venta en origen (lo que pagamos)
+    sell_price: float  # Mejor compra en destino (lo que cobramos)
+    profit_per_unit: float  # Después de impuestos
+    margin_percentage: float  # Profit como porcentaje del precio de compra
+    tradable_volume: int
+    total_profit: float
+    updated_at: datetime
+
+@dataclass(frozen=True)
+class ArbitrageScanResult:
+    """Resultado del escaneo de arbitraje entre hubs"""
+    hubs: list[int]
+    opportunities: list[HaulingOpportunity]
+    total_items_compared: int
+    total_opportunities: int
+    analysis_timestamp: datetime
+    parameters: dict
+
+    @property
+    def top_opportunity(self) -> Optional[HaulingOpportunity]:
+        """Retorna la mejor oportunidad"""
+        return self.opportunities[0] if self.opportunities else None
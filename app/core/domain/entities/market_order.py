@@ -0,0 +1,64 @@
+# app/core/domain/entities/market_order.py
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+
+@dataclass(frozen=True, slots=True)
+class MarketOrder:
+    """
+    Orden de mercado de ESI con __slots__: ocupa varias veces menos que el
+    diccionario equivalente y el acceso por atributo es más rápido que dict.get.
+    """
+    order_id: int
+    type_id: int
+    location_id: int
+    system_id: int
+    price: float
+    volume_remain: int
+    volume_total: int
+    is_buy_order: bool
+    issued: str  # ISO 8601 en UTC, tal como lo envía ESI
+    duration: int
+    min_volume: int
+    range: str
+
+    @classmethod
+    def from_esi(cls, data: Dict[str, Any]) -> "MarketOrder":
+        """Construye la orden a partir del JSON de /markets/{region_id}/orders/"""
+        return cls(
+            order_id=data["order_id"],
+            type_id=data["type_id"],
+            location_id=data.get("location_id", 0),
+            system_id=data.get("system_id", 0),
+            price=data.get("price", 0.0),
+            volume_remain=data.get("volume_remain", 0),
+            volume_total=data.get("volume_total", 0),
+            is_buy_order=data.get("is_buy_order", False),
+            issued=data.get("issued", ""),
+            duration=data.get("duration", 0),
+            min_volume=data.get("min_volume", 1),
+            # Pocos valores distintos: se comparte una sola cadena por valor
+            range=sys.intern(data.get("range", "station")),
+        )
+
+    @classmethod
+    def from_esi_page(cls, page: List[Dict[str, Any]]) -> List["MarketOrder"]:
+        return [cls.from_esi(data) for data in page]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Mismo formato que devuelve ESI"""
+        return {
+            "order_id": self.order_id,
+            "type_id": self.type_id,
+            "location_id": self.location_id,
+            "system_id": self.system_id,
+            "price": self.price,
+            "volume_remain": self.volume_remain,
+            "volume_total": self.volume_total,
+            "is_buy_order": self.is_buy_order,
+            "issued": self.issued,
+            "duration": self.duration,
+            "min_volume": self.min_volume,
+            "range": self.range,
+        }
@@ -0,0 +1,48 @@
+# app/core/domain/entities/market_snapshot.py
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+from app.core.domain.entities.market_order import MarketOrder
+from app.core.domain.entities.order_book import OrderBook
+from app.core.domain.entities.order_book_diff import OrderBookDiff
+
+
+@dataclass(frozen=True)
+class RegionSnapshot:
+    """Foto inmutable del libro de órdenes completo de una región"""
+    region_id: int
+    version: int
+    orders: List[MarketOrder]
+    book: OrderBook
+    fetched_at: datetime
+    expires_at: datetime
+    diff: Optional[OrderBookDiff] = None  # Cambios respecto a la versión anterior
+
+    @property
+    def is_expired(self) -> bool:
+        return datetime.now() >= self.expires_at
+
+    @property
+    def total_orders(self) -> int:
+        return len(self.book)
+
+    def filter_orders(
+        self,
+        type_id: Optional[int] = None,
+        order_type: str = "all",
+        system_id: Optional[int] = None,
+    ) -> List[MarketOrder]:
+        """Filtra las órdenes igual que lo haría ESI con type_id y order_type"""
+        orders = self.orders
+        if system_id is not None:
+            # Índice por sistema del libro: sin recorrer toda la región
+            positions = self.book.index("system_id").positions(system_id)
+            orders = [orders[i] for i in positions]
+        if type_id:
+            orders = [o for o in orders if o.type_id == type_id]
+        if order_type == "buy":
+            orders = [o for o in orders if o.is_buy_order]
+        elif order_type == "sell":
+            orders = [o for o in orders if not o.is_buy_order]
+        return orders
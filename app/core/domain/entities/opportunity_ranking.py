@@ -0,0 +1,116 @@
+# app/core/domain/entities/opportunity_ranking.py
+import base64
+import json
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from app.core.domain.entities.order_book import TypeSpreads
+
+# Claves de ordenación disponibles (todas descendentes)
+SORT_KEYS = ("spread_percentage", "spread", "total_profit", "confidence")
+
+
+def encode_cursor(sort: str, score: float, type_id: int) -> str:
+    """Cursor opaco: última posición devuelta (puntuación y type_id)"""
+    raw = json.dumps([sort, score, type_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, float, int]:
+    try:
+        sort, score, type_id = json.loads(base64.urlsafe_b64decode(cursor))
+        return str(sort), float(score), int(type_id)
+    except Exception:
+        raise ValueError(f"Invalid cursor '{cursor}'")
+
+
+class OpportunityRanking:
+    """
+    Items viables de un libro con sus puntuaciones, calculado una vez por
+    snapshot y parámetros. El orden es (puntuación desc, type_id asc) para
+    cada clave: la primera página se obtiene con selección parcial
+    (argpartition) y el ranking completo solo se ordena si se pagina más
+    allá. Los cursores son de tipo keyset, así que siguen siendo válidos
+    aunque el ranking se recalcule con un snapshot nuevo.
+    """
+
+    def __init__(self, spreads: TypeSpreads, min_spread: float, min_volume: int):
+        self.spreads = spreads
+        self.viable = np.flatnonzero(spreads.viable_mask(min_spread, min_volume))
+        self.type_ids = spreads.type_ids[self.viable]
+
+        absolute = spreads.absolute_spread[self.viable]
+        # Mismos cálculos que ProfitOpportunity y MarketAnalyzer._calculate_confidence
+        self.scores: Dict[str, np.ndarray] = {
+            "spread_percentage": spreads.percentage_spread[self.viable],
+            "spread": absolute,
+            "total_profit": absolute * spreads.tradable_volume[self.viable],
+            "confidence": spreads.confidence[self.viable],
+        }
+        self._orders: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.viable)
+
+    def _score(self, sort: str) -> np.ndarray:
+        if sort not in self.scores:
+            raise ValueError(f"sort must be one of {', '.join(SORT_KEYS)}")
+        return self.scores[sort]
+
+    def _order(self, sort: str) -> np.ndarray:
+        """Ranking completo de la clave (posiciones en self.viable)"""
+        if sort not in self._orders:
+            self._orders[sort] = np.lexsort((self.type_ids, -self._score(sort)))
+        return self._orders[sort]
+
+    def top(self, sort: str, n: int) -> np.ndarray:
+        """Las n mejores posiciones sin ordenar todo el ranking"""
+        score = self._score(sort)
+        if sort in self._orders or n >= len(score):
+            return self._order(sort)[:n]
+        if n <= 0:
+            return np.empty(0, dtype=np.intp)
+        # Umbral del n-ésimo mejor; los empates en el borde se desempatan por type_id
+        threshold = -np.partition(-score, n - 1)[n - 1]
+        candidates = np.flatnonzero(score >= threshold)
+        ordered = candidates[
+            np.lexsort((self.type_ids[candidates], -score[candidates]))
+        ]
+        return ordered[:n]
+
+    def page(
+        self,
+        sort: str,
+        limit: int,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+    ) -> Tuple[np.ndarray, Optional[str]]:
+        """Devuelve (índices en spreads, cursor siguiente o None)"""
+        if cursor is None and offset == 0:
+            positions = self.top(sort, limit)
+            start = 0
+        else:
+            order = self._order(sort)
+            start = offset
+            if cursor is not None:
+                start = self._cursor_position(sort, cursor, order)
+            positions = order[start : start + limit]
+
+        next_cursor = None
+        if len(positions) and start + len(positions) < len(self):
+            last = positions[-1]
+            next_cursor = encode_cursor(
+                sort, float(self._score(sort)[last]), int(self.type_ids[last])
+            )
+        return self.viable[positions], next_cursor
+
+    def _cursor_position(self, sort: str, cursor: str, order: np.ndarray) -> int:
+        """Primera posición estrictamente posterior a la del cursor"""
+        cursor_sort, score, type_id = decode_cursor(cursor)
+        if cursor_sort != sort:
+            raise ValueError("Cursor was issued for a different sort key")
+        keys = -self._score(sort)[order]
+        lo = int(np.searchsorted(keys, -score, side="left"))
+        hi = int(np.searchsorted(keys, -score, side="right"))
+        return lo + int(np.searchsorted(self.type_ids[order[lo:hi]], type_id, side="right"))
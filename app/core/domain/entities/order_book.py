@@ -0,0 +1,358 @@
+# app/core/domain/entities/order_book.py
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.core.domain.entities.market_order import MarketOrder
+from app.core.domain.value_objects.market_values import (
+    ISK,
+    MarketSpread,
+    Volume,
+)
+
+# Codificación numérica del campo `range` de ESI (en saltos)
+RANGE_STATION = -1
+RANGE_SOLARSYSTEM = 0
+RANGE_REGION = np.iinfo(np.int16).max
+
+
+def encode_range(value: Any) -> int:
+    """Convierte el `range` de ESI ('station', 'region', '5', ...) a saltos"""
+    if value == "station" or value is None:
+        return RANGE_STATION
+    if value == "solarsystem":
+        return RANGE_SOLARSYSTEM
+    if value == "region":
+        return RANGE_REGION
+    return int(value)
+
+
+def unique_orders(orders: List[MarketOrder]) -> List[MarketOrder]:
+    """
+    La lista de órdenes con la misma regla que OrderBook.deduplicated: la
+    última de cada order_id, en el orden en que llegó. Así la fila i del
+    libro es la orden i de la lista.
+    """
+    last = {o.order_id: i for i, o in enumerate(orders)}
+    if len(last) == len(orders):
+        return orders
+    return [orders[i] for i in sorted(last.values())]
+
+
+def decode_range(value: int) -> str:
+    if value == RANGE_STATION:
+        return "station"
+    if value == RANGE_SOLARSYSTEM:
+        return "solarsystem"
+    if value == RANGE_REGION:
+        return "region"
+    return str(value)
+
+
+@dataclass(frozen=True)
+class TypeSpreads:
+    """Mejor compra/venta y volúmenes agregados por type_id, en columnas"""
+    type_ids: np.ndarray
+    best_buy: np.ndarray
+    best_sell: np.ndarray
+    buy_volume: np.ndarray
+    sell_volume: np.ndarray
+    buy_orders: np.ndarray
+    sell_orders: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.type_ids)
+
+    @property
+    def has_both_sides(self) -> np.ndarray:
+        return (self.buy_orders > 0) & (self.sell_orders > 0)
+
+    @property
+    def absolute_spread(self) -> np.ndarray:
+        return self.best_sell - self.best_buy
+
+    @property
+    def percentage_spread(self) -> np.ndarray:
+        """Mismo cálculo que MarketSpread.percentage_spread, vectorizado"""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pct = self.absolute_spread / self.best_sell * 100
+        return np.where(self.best_sell > 0, pct, 0.0)
+
+    @property
+    def tradable_volume(self) -> np.ndarray:
+        return np.minimum(self.buy_volume, self.sell_volume)
+
+    @property
+    def confidence(self) -> np.ndarray:
+        """Mismo cálculo que MarketAnalyzer._calculate_confidence, vectorizado"""
+        return (
+            np.minimum(self.tradable_volume / 1000, 1.0) * 0.6
+            + np.minimum(self.percentage_spread / 20, 1.0) * 0.4
+        )
+
+    def viable_mask(self, min_spread: float, min_volume: int) -> np.ndarray:
+        """Equivalente vectorizado de MarketSpread.is_viable"""
+        return (
+            self.has_both_sides
+            & (self.percentage_spread >= min_spread)
+            & (self.tradable_volume >= min_volume)
+        )
+
+    def market_spread(self, index: int) -> MarketSpread:
+        return MarketSpread(
+            best_buy=ISK(float(self.best_buy[index])),
+            best_sell=ISK(float(self.best_sell[index])),
+            buy_volume=Volume(int(self.buy_volume[index])),
+            sell_volume=Volume(int(self.sell_volume[index])),
+        )
+
+
+class ColumnIndex:
+    """
+    Índice de una columna entera (system_id, location_id): las posiciones
+    de cada valor quedan contiguas tras un argsort, así que buscar todas
+    las órdenes de un valor es un searchsorted y un slice.
+    """
+
+    def __init__(self, column: np.ndarray):
+        self.order = np.argsort(column, kind="stable")
+        self.keys, self.starts, counts = np.unique(
+            column[self.order], return_index=True, return_counts=True
+        )
+        self.ends = self.starts + counts
+
+    def positions(self, key: int) -> np.ndarray:
+        """Posiciones (ascendentes, el argsort es estable) de las órdenes con ese valor"""
+        i = int(np.searchsorted(self.keys, key))
+        if i < len(self.keys) and self.keys[i] == key:
+            return self.order[self.starts[i] : self.ends[i]]
+        return np.empty(0, dtype=np.intp)
+
+
+class OrderBook:
+    """
+    Libro de órdenes en formato columnar (un array por campo).
+    Se construye una sola vez a partir de las páginas de ESI y permite
+    agregar por type_id sin recorrer millones de diccionarios.
+    """
+
+    COLUMNS = (
+        "order_id",
+        "type_id",
+        "price",
+        "volume_remain",
+        "volume_total",
+        "is_buy_order",
+        "location_id",
+        "system_id",
+        "issued",
+        "range",
+    )
+
+    def __init__(self, **columns: np.ndarray):
+        self.order_id = columns["order_id"]
+        self.type_id = columns["type_id"]
+        self.price = columns["price"]
+        self.volume_remain = columns["volume_remain"]
+        self.volume_total = columns["volume_total"]
+        self.is_buy_order = columns["is_buy_order"]
+        self.location_id = columns["location_id"]
+        self.system_id = columns["system_id"]
+        self.issued = columns["issued"]
+        self.range = columns["range"]
+        self._indexes: Dict[str, ColumnIndex] = {}
+        self._region_buys: Optional[np.ndarray] = None
+        self._spreads: Optional[TypeSpreads] = None
+
+    @classmethod
+    def from_orders(cls, orders: Iterable[MarketOrder]) -> "OrderBook":
+        """Construye el libro a partir de las órdenes de ESI"""
+        orders = orders if isinstance(orders, list) else list(orders)
+        count = len(orders)
+
+        def column(field: str, dtype) -> np.ndarray:
+            return np.fromiter(
+                (getattr(o, field) for o in orders), dtype=dtype, count=count
+            )
+
+        book = cls(
+            order_id=column("order_id", np.int64),
+            type_id=column("type_id", np.int32),
+            price=column("price", np.float64),
+            volume_remain=column("volume_remain", np.int64),
+            volume_total=column("volume_total", np.int64),
+            is_buy_order=column("is_buy_order", np.bool_),
+            location_id=column("location_id", np.int64),
+            system_id=column("system_id", np.int32),
+            # ESI usa ISO 8601 en UTC ('...Z'); numpy no admite el sufijo
+            issued=np.array(
+                [(o.issued or "").rstrip("Z") for o in orders],
+                dtype="datetime64[s]",
+            ),
+            range=np.fromiter(
+                (encode_range(o.range) for o in orders),
+                dtype=np.int16,
+                count=count,
+            ),
+        )
+        return book.deduplicated()
+
+    @classmethod
+    def empty(cls) -> "OrderBook":
+        return cls.from_orders([])
+
+    @classmethod
+    def concat(cls, books: Iterable["OrderBook"]) -> "OrderBook":
+        """Une varios libros (p. ej. uno por página de ESI) en uno solo"""
+        books = list(books)
+        if not books:
+            return cls.empty()
+        return cls(
+            **{
+                name: np.concatenate([getattr(book, name) for book in books])
+                for name in cls.COLUMNS
+            }
+        )
+
+    def __len__(self) -> int:
+        return len(self.order_id)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in self.COLUMNS)
+
+    def select(self, mask: np.ndarray) -> "OrderBook":
+        """Sub-libro con las órdenes que cumplen la máscara (o índices)"""
+        return OrderBook(**{name: getattr(self, name)[mask] for name in self.COLUMNS})
+
+    def deduplicated(self) -> "OrderBook":
+        """
+        Una fila por order_id, la última que llegó. Si las páginas cruzan un
+        refresco de la caché de ESI una orden puede venir dos veces, y el
+        diff y el histórico asumen order_id únicos.
+        """
+        _, last = np.unique(self.order_id[::-1], return_index=True)
+        if len(last) == len(self):
+            return self
+        return self.select(np.sort(len(self) - 1 - last))
+
+    def index(self, name: str) -> ColumnIndex:
+        """Índice de la columna (se construye la primera vez y se reutiliza)"""
+        if name not in self._indexes:
+            self._indexes[name] = ColumnIndex(getattr(self, name))
+        return self._indexes[name]
+
+    def build_indexes(self) -> "OrderBook":
+        """Construye de antemano los índices por estación y por sistema"""
+        self.index("location_id")
+        self.index("system_id")
+        self.region_buy_positions
+        return self
+
+    @property
+    def region_buy_positions(self) -> np.ndarray:
+        """Órdenes de compra con rango 'region' (válidas desde cualquier estación)"""
+        if self._region_buys is None:
+            self._region_buys = np.flatnonzero(
+                self.is_buy_order & (self.range == RANGE_REGION)
+            )
+        return self._region_buys
+
+    def scope_positions(
+        self, system_id: Optional[int] = None, location_id: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Órdenes con las que se puede operar desde una estación o un sistema.
+        Las de venta solo cuentan si están allí. Las de compra cuentan si
+        están allí, si tienen rango 'region' o, dentro del mismo sistema,
+        si su rango es 'solarsystem' o de saltos (se trata como sistema: sin
+        grafo de saltos no se puede afirmar más).
+        """
+        if location_id is not None:
+            local = self.index("location_id").positions(location_id)
+            if system_id is None and len(local):
+                system_id = int(self.system_id[local[0]])
+        else:
+            local = self.index("system_id").positions(system_id)
+
+        in_system = (
+            self.index("system_id").positions(system_id)
+            if system_id is not None
+            else local
+        )
+        system_buys = in_system[
+            self.is_buy_order[in_system] & (self.range[in_system] >= RANGE_SOLARSYSTEM)
+        ]
+        return np.union1d(np.union1d(local, system_buys), self.region_buy_positions)
+
+    def scoped(
+        self, system_id: Optional[int] = None, location_id: Optional[int] = None
+    ) -> "OrderBook":
+        """Sub-libro operable desde la estación o sistema indicado"""
+        return self.select(self.scope_positions(system_id, location_id))
+
+    @property
+    def cached_spreads(self) -> Optional[TypeSpreads]:
+        """Agregado por tipo si ya se calculó para este libro"""
+        return self._spreads
+
+    def spreads_by_type(self) -> TypeSpreads:
+        """Agrupa por type_id: mejor bid/ask y volumen de cada lado (una vez por libro)"""
+        if self._spreads is None:
+            self._spreads = self._aggregate()
+        return self._spreads
+
+    def update_spreads(self, previous: TypeSpreads, touched: np.ndarray) -> TypeSpreads:
+        """
+        Agregado por tipo reutilizando el del libro anterior: solo se
+        recalculan los type_ids tocados por el diff entre ambos libros.
+        """
+        # Tabla de consulta por type_id: más barata que np.isin sobre todo el libro
+        size = int(max(self.type_id.max(initial=0), previous.type_ids.max(initial=0))) + 1
+        is_touched = np.zeros(size, dtype=bool)
+        is_touched[touched[touched < size]] = True
+        fresh = self.select(is_touched[self.type_id])._aggregate()
+        keep = ~is_touched[previous.type_ids]
+        order = np.argsort(
+            np.concatenate([previous.type_ids[keep], fresh.type_ids]), kind="stable"
+        )
+        self._spreads = TypeSpreads(
+            **{
+                name: np.concatenate(
+                    [getattr(previous, name)[keep], getattr(fresh, name)]
+                )[order]
+                for name in TypeSpreads.__dataclass_fields__
+            }
+        )
+        return self._spreads
+
+    def _aggregate(self) -> TypeSpreads:
+        type_ids, groups = np.unique(self.type_id, return_inverse=True)
+        size = len(type_ids)
+        buys = self.is_buy_order
+        sells = ~buys
+
+        best_buy = np.full(size, -np.inf)
+        np.maximum.at(best_buy, groups[buys], self.price[buys])
+        best_sell = np.full(size, np.inf)
+        np.minimum.at(best_sell, groups[sells], self.price[sells])
+
+        buy_orders = np.bincount(groups[buys], minlength=size)
+        sell_orders = np.bincount(groups[sells], minlength=size)
+        buy_volume = np.bincount(
+            groups[buys], weights=self.volume_remain[buys], minlength=size
+        ).astype(np.int64)
+        sell_volume = np.bincount(
+            groups[sells], weights=self.volume_remain[sells], minlength=size
+        ).astype(np.int64)
+
+        return TypeSpreads(
+            type_ids=type_ids,
+            best_buy=np.where(buy_orders > 0, best_buy, np.nan),
+            best_sell=np.where(sell_orders > 0, best_sell, np.nan),
+            buy_volume=buy_volume,
+            sell_volume=sell_volume,
+            buy_orders=buy_orders,
+            sell_orders=sell_orders,
+        )
@@ -0,0 +1,76 @@
+# app/core/domain/entities/order_book_diff.py
+from dataclasses import dataclass
+from typing import Dict
+
+import numpy as np
+
+from app.core.domain.entities.order_book import OrderBook
+
+
+@dataclass(frozen=True)
+class OrderBookDiff:
+    """
+    Cambios entre dos libros consecutivos de una región, por order_id.
+    Las posiciones de `added`, `price_changed` y `volume_filled` se
+    refieren al libro nuevo; las órdenes eliminadas (canceladas, expiradas
+    o completadas) solo existen en el anterior, así que se guardan su
+    order_id y su type_id.
+    """
+    added: np.ndarray
+    price_changed: np.ndarray
+    volume_filled: np.ndarray
+    removed_order_ids: np.ndarray
+    removed_type_ids: np.ndarray
+
+    @classmethod
+    def compute(cls, previous: OrderBook, current: OrderBook) -> "OrderBookDiff":
+        _, prev_idx, curr_idx = np.intersect1d(
+            previous.order_id, current.order_id,
+            assume_unique=True, return_indices=True,
+        )
+        price_changed = previous.price[prev_idx] != current.price[curr_idx]
+        # Una modificación de precio puede ir junto a ventas parciales; cuenta como precio
+        volume_filled = ~price_changed & (
+            previous.volume_remain[prev_idx] != current.volume_remain[curr_idx]
+        )
+
+        added = np.ones(len(current), dtype=bool)
+        added[curr_idx] = False
+        removed = np.ones(len(previous), dtype=bool)
+        removed[prev_idx] = False
+
+        return cls(
+            added=np.flatnonzero(added),
+            price_changed=np.sort(curr_idx[price_changed]),
+            volume_filled=np.sort(curr_idx[volume_filled]),
+            removed_order_ids=previous.order_id[removed],
+            removed_type_ids=previous.type_id[removed],
+        )
+
+    @property
+    def changed(self) -> np.ndarray:
+        """Posiciones en el libro nuevo con precio o volumen distinto"""
+        return np.union1d(self.price_changed, self.volume_filled)
+
+    def touched_type_ids(self, current: OrderBook) -> np.ndarray:
+        """type_ids con alguna orden nueva, modificada o eliminada"""
+        positions = np.concatenate([self.added, self.price_changed, self.volume_filled])
+        return np.union1d(current.type_id[positions], self.removed_type_ids)
+
+    def __len__(self) -> int:
+        return (
+            len(self.added) + len(self.price_changed)
+            + len(self.volume_filled) + len(self.removed_order_ids)
+        )
+
+    @property
+    def is_empty(self) -> bool:
+        return len(self) == 0
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "new": len(self.added),
+            "price_changed": len(self.price_changed),
+            "volume_filled": len(self.volume_filled),
+            "removed": len(self.removed_order_ids),
+        }
@@ -0,0 +1,62 @@
+# app/core/domain/entities/universe_topology.py
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+@dataclass(frozen=True, slots=True)
+class SystemNode:
+    """Posición de un sistema solar en el universo"""
+    system_id: int
+    name: str
+    constellation_id: int
+    region_id: int
+    security_status: float
+
+    @property
+    def is_highsec(self) -> bool:
+        return round(self.security_status, 1) >= 0.5
+
+
+class UniverseTopology:
+    """Índice en memoria sistema -> constelación -> región"""
+
+    def __init__(self):
+        self.systems: Dict[int, SystemNode] = {}
+        self.constellation_regions: Dict[int, int] = {}
+        self._region_systems: Dict[int, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.systems)
+
+    def __contains__(self, system_id: int) -> bool:
+        return system_id in self.systems
+
+    def add_constellation(self, constellation_id: int, region_id: int):
+        self.constellation_regions[constellation_id] = region_id
+
+    def add_system(
+        self,
+        system_id: int,
+        name: str,
+        constellation_id: int,
+        security_status: float = 0.0,
+    ) -> Optional[SystemNode]:
+        """Añade un sistema si se conoce la región de su constelación"""
+        region_id = self.constellation_regions.get(constellation_id)
+        if region_id is None:
+            return None
+        node = SystemNode(system_id, name, constellation_id, region_id, security_status)
+        if system_id not in self.systems:
+            self._region_systems.setdefault(region_id, []).append(system_id)
+        self.systems[system_id] = node
+        return node
+
+    def get_system(self, system_id: int) -> Optional[SystemNode]:
+        return self.systems.get(system_id)
+
+    def region_of_system(self, system_id: int) -> Optional[int]:
+        node = self.systems.get(system_id)
+        return node.region_id if node else None
+
+    def systems_in_region(self, region_id: int) -> List[SystemNode]:
+        return [self.systems[s] for s in self._region_systems.get(region_id, [])]
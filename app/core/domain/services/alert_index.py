@@ -0,0 +1,245 @@
+# app/core/domain/services/alert_index.py
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.core.domain.entities.alert import AlertEvent, AlertRule
+from app.core.domain.entities.order_book import OrderBook, TypeSpreads
+from app.core.domain.value_objects.market_values import HIGH_CONFIDENCE
+
+# location_id de las reglas de toda la región en las columnas compiladas
+REGION_WIDE = 0
+
+
+def _take(spreads: TypeSpreads, type_ids: np.ndarray) -> TypeSpreads:
+    """Filas de spreads alineadas con type_ids; los tipos sin órdenes quedan vacíos"""
+    positions = np.searchsorted(spreads.type_ids, type_ids)
+    positions = np.minimum(positions, max(len(spreads) - 1, 0))
+    found = (
+        spreads.type_ids[positions] == type_ids
+        if len(spreads)
+        else np.zeros(len(type_ids), dtype=bool)
+    )
+
+    def column(name: str, missing) -> np.ndarray:
+        values = getattr(spreads, name)
+        if not len(spreads):
+            return np.full(len(type_ids), missing, dtype=values.dtype)
+        return np.where(found, values[positions], missing)
+
+    return TypeSpreads(
+        type_ids=type_ids,
+        best_buy=column("best_buy", np.nan),
+        best_sell=column("best_sell", np.nan),
+        buy_volume=column("buy_volume", 0),
+        sell_volume=column("sell_volume", 0),
+        buy_orders=column("buy_orders", 0),
+        sell_orders=column("sell_orders", 0),
+    )
+
+
+class CompiledRules:
+    """
+    Reglas activas de una región en columnas, ordenadas por type_id: las
+    de un tipo son un rango contiguo que se localiza con searchsorted.
+    `matching` guarda si cada regla cumplía sus condiciones en la última
+    evaluación, para avisar solo en la transición.
+    """
+
+    def __init__(self, rules: List[AlertRule]):
+        rules = sorted(rules, key=lambda rule: (rule.type_id, rule.rule_id or 0))
+        self.rules = rules
+        self.rule_ids = np.array([rule.rule_id or 0 for rule in rules], dtype=np.int64)
+        self.type_ids = np.array([rule.type_id for rule in rules], dtype=np.int64)
+        self.location_ids = np.array(
+            [rule.location_id or REGION_WIDE for rule in rules], dtype=np.int64
+        )
+        self.min_spread = np.array(
+            [np.nan if rule.min_spread_percentage is None else rule.min_spread_percentage for rule in rules],
+            dtype=np.float64,
+        )
+        self.max_best_sell = np.array(
+            [np.nan if rule.max_best_sell is None else rule.max_best_sell for rule in rules],
+            dtype=np.float64,
+        )
+        self.min_volume = np.array([rule.min_volume or 0 for rule in rules], dtype=np.int64)
+        self.high_confidence = np.array([rule.high_confidence for rule in rules], dtype=bool)
+        self.matching = np.zeros(len(rules), dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def candidates(self, type_ids: np.ndarray) -> np.ndarray:
+        """Posiciones de las reglas de esos type_ids (unión de rangos contiguos)"""
+        lo = np.searchsorted(self.type_ids, type_ids, side="left")
+        hi = np.searchsorted(self.type_ids, type_ids, side="right")
+        counts = hi - lo
+        total = int(counts.sum())
+        if not total:
+            return np.empty(0, dtype=np.intp)
+        starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+        return starts + np.arange(total)
+
+    def evaluate(self, positions: np.ndarray, values: TypeSpreads) -> np.ndarray:
+        """Condiciones de las reglas en positions contra sus valores de mercado"""
+        both = values.has_both_sides
+        pct = values.percentage_spread
+        min_spread = self.min_spread[positions]
+        max_sell = self.max_best_sell[positions]
+        with np.errstate(invalid="ignore"):
+            return (
+                (np.isnan(min_spread) | (both & (pct >= min_spread)))
+                & (np.isnan(max_sell) | (values.best_sell <= max_sell))
+                & (values.tradable_volume >= self.min_volume[positions])
+                & (~self.high_confidence[positions] | (both & (values.confidence >= HIGH_CONFIDENCE)))
+            )
+
+
+class AlertIndex:
+    """
+    Índice de reglas de alerta por región y type_id. Con cada snapshot solo
+    se evalúan las reglas de los tipos que cambiaron, en bloque y de forma
+    vectorizada, en lugar de recorrer todas las reglas contra todos los
+    tipos. Las reglas de estación usan el sub-libro operable desde ella.
+    """
+
+    def __init__(self, rules: Iterable[AlertRule], previous: Optional["AlertIndex"] = None):
+        by_region: Dict[int, List[AlertRule]] = {}
+        for rule in rules:
+            # Las reglas sin condiciones reales (p. ej. guardadas con volumen 0) se ignoran
+            if rule.enabled and rule.has_conditions:
+                by_region.setdefault(rule.region_id, []).append(rule)
+        self._regions: Dict[int, CompiledRules] = {
+            region_id: CompiledRules(region_rules)
+            for region_id, region_rules in by_region.items()
+        }
+        if previous is not None:
+            self.carry_state(previous)
+
+    def carry_state(self, previous: "AlertIndex"):
+        """Conserva qué reglas ya estaban cumpliéndose al recompilar"""
+        for region_id, compiled in self._regions.items():
+            old = previous._regions.get(region_id)
+            if old is None or not len(old):
+                continue
+            was_matching = set(old.rule_ids[old.matching].tolist())
+            compiled.matching = np.isin(compiled.rule_ids, list(was_matching))
+
+    def __len__(self) -> int:
+        return sum(len(compiled) for compiled in self._regions.values())
+
+    @property
+    def region_ids(self) -> List[int]:
+        return list(self._regions)
+
+    def evaluate(
+        self,
+        region_id: int,
+        book: OrderBook,
+        touched_type_ids: np.ndarray,
+        triggered_at: Optional[datetime] = None,
+    ) -> List[AlertEvent]:
+        """
+        Evalúa las reglas de los tipos tocados contra el libro nuevo y
+        devuelve las que pasan a cumplirse (no las que ya se cumplían).
+        """
+        compiled = self._regions.get(region_id)
+        if compiled is None:
+            return []
+        positions = compiled.candidates(np.asarray(touched_type_ids, dtype=np.int64))
+        if not len(positions):
+            return []
+
+        values = self._market_values(compiled, positions, book)
+        matched = compiled.evaluate(positions, values)
+        fired = matched & ~compiled.matching[positions]
+        compiled.matching[positions] = matched
+        if not fired.any():
+            return []
+        return self._events(compiled, positions[fired], values, fired, triggered_at or datetime.now())
+
+    @staticmethod
+    def _market_values(
+        compiled: CompiledRules, positions: np.ndarray, book: OrderBook
+    ) -> TypeSpreads:
+        """Mejor compra/venta y volúmenes por regla candidata, según su ámbito"""
+        type_ids = compiled.type_ids[positions]
+        location_ids = compiled.location_ids[positions]
+        columns = {
+            name: np.empty(len(positions), dtype=dtype)
+            for name, dtype in (
+                ("best_buy", np.float64), ("best_sell", np.float64),
+                ("buy_volume", np.int64), ("sell_volume", np.int64),
+                ("buy_orders", np.int64), ("sell_orders", np.int64),
+            )
+        }
+        for location_id in np.unique(location_ids).tolist():
+            in_scope = location_ids == location_id
+            wanted = type_ids[in_scope]
+            if location_id == REGION_WIDE:
+                # Agregado de la región: el motor de snapshots lo mantiene incremental
+                spreads = book.spreads_by_type()
+            else:
+                spreads = AlertIndex._station_spreads(book, location_id, wanted)
+            taken = _take(spreads, wanted)
+            for name in columns:
+                columns[name][in_scope] = getattr(taken, name)
+        return TypeSpreads(type_ids=type_ids, **columns)
+
+    @staticmethod
+    def _station_spreads(book: OrderBook, location_id: int, type_ids: np.ndarray) -> TypeSpreads:
+        """
+        Agregado operable desde la estación, solo de los tipos pedidos: se
+        acota el libro a esos tipos antes de aplicar el ámbito, que sobre el
+        libro completo costaría más que toda la evaluación.
+        """
+        local = book.index("location_id").positions(location_id)
+        system_id = int(book.system_id[local[0]]) if len(local) else None
+        is_wanted = np.zeros(int(max(book.type_id.max(initial=0), type_ids.max())) + 1, dtype=bool)
+        is_wanted[type_ids] = True
+        return (
+            book.select(is_wanted[book.type_id])
+            .scoped(system_id, location_id)
+            .spreads_by_type()
+        )
+
+    @staticmethod
+    def _events(
+        compiled: CompiledRules,
+        positions: np.ndarray,
+        values: TypeSpreads,
+        fired: np.ndarray,
+        triggered_at: datetime,
+    ) -> List[AlertEvent]:
+        both = values.has_both_sides[fired]
+        pct = values.percentage_spread[fired]
+        confidence = values.confidence[fired]
+        best_buy = values.best_buy[fired]
+        best_sell = values.best_sell[fired]
+        buy_volume = values.buy_volume[fired]
+        sell_volume = values.sell_volume[fired]
+
+        def optional(value: float) -> Optional[float]:
+            return None if np.isnan(value) else float(value)
+
+        events = []
+        for i, position in enumerate(positions.tolist()):
+            rule = compiled.rules[position]
+            events.append(
+                AlertEvent(
+                    rule_id=rule.rule_id,
+                    rule_name=rule.name,
+                    type_id=rule.type_id,
+                    region_id=rule.region_id,
+                    location_id=rule.location_id,
+                    triggered_at=triggered_at,
+                    best_buy=optional(best_buy[i]),
+                    best_sell=optional(best_sell[i]),
+                    spread_percentage=float(pct[i]) if both[i] else None,
+                    buy_volume=int(buy_volume[i]),
+                    sell_volume=int(sell_volume[i]),
+                    confidence=float(confidence[i]) if both[i] else None,
+                )
+            )
+        return events
@@ -0,0 +1,169 @@
+# app/core/domain/services/arbitrage_scanner.py
+import asyncio
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.core.domain.entities.market_analysis import (
+    ArbitrageScanResult,
+    HaulingOpportunity,
+)
+from app.core.domain.entities.order_book import TypeSpreads
+from app.core.domain.value_objects.market_values import Volume
+from app.core.domain.value_objects.systems import TRADE_HUBS, SystemValueObject
+
+
+class ArbitrageScanner:
+    """
+    Busca oportunidades de transporte entre hubs: comprar a las órdenes de
+    venta de un hub y vender a las órdenes de compra de otro.
+    Los libros de las regiones se descargan en paralelo y cada par de hubs
+    se cruza por type_id de forma vectorizada.
+    """
+
+    def __init__(self, market_client, name_resolver=None):
+        self.market_client = market_client
+        self.name_resolver = name_resolver
+
+    async def scan(
+        self,
+        hubs: Optional[Iterable[SystemValueObject]] = None,
+        min_margin: float = 5.0,
+        min_volume: Volume = Volume(1),
+        tax_rate: float = 0.0,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> ArbitrageScanResult:
+        """Compara todos los pares de hubs (origen, destino) sobre todos los tipos"""
+        # Un hub repetido solo generaría pares consigo mismo y filas duplicadas
+        hubs = list(dict.fromkeys(hubs or TRADE_HUBS))
+        print(f"🚚 Escaneando arbitraje entre {len(hubs)} hubs...")
+
+        spreads = await self._hub_spreads(hubs)
+
+        # Cruce vectorizado por par de hubs; se acumulan columnas de candidatos
+        columns: Dict[str, List[np.ndarray]] = {
+            name: []
+            for name in (
+                "source", "destination", "type_id", "buy_price", "sell_price",
+                "profit", "margin", "volume",
+            )
+        }
+        compared = 0
+        for source in hubs:
+            for destination in hubs:
+                if source == destination:
+                    continue
+                origin, target = spreads[source], spreads[destination]
+                type_ids, io, it = np.intersect1d(
+                    origin.type_ids, target.type_ids,
+                    assume_unique=True, return_indices=True,
+                )
+                compared += len(type_ids)
+
+                buy_price = origin.best_sell[io]
+                sell_price = target.best_buy[it]
+                volume = np.minimum(origin.sell_volume[io], target.buy_volume[it])
+                profit = sell_price * (1 - tax_rate) - buy_price
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    margin = profit / buy_price * 100
+
+                # NaN (lado sin órdenes) no pasa ninguna comparación
+                mask = (margin >= min_margin) & (profit > 0) & (volume >= min_volume)
+                count = int(mask.sum())
+                if not count:
+                    continue
+                columns["source"].append(np.full(count, source.value))
+                columns["destination"].append(np.full(count, destination.value))
+                columns["type_id"].append(type_ids[mask])
+                columns["buy_price"].append(buy_price[mask])
+                columns["sell_price"].append(sell_price[mask])
+                columns["profit"].append(profit[mask])
+                columns["margin"].append(margin[mask])
+                columns["volume"].append(volume[mask])
+
+        candidates = {
+            name: np.concatenate(parts) if parts else np.empty(0)
+            for name, parts in columns.items()
+        }
+        total_profit = candidates["profit"] * candidates["volume"]
+
+        # Ranking por profit total (orden estable ante empates)
+        ranking = np.argsort(-total_profit, kind="stable")
+        page = ranking[offset : offset + limit]
+        names = await self._resolve_names(
+            int(type_id) for type_id in candidates["type_id"][page]
+        )
+
+        opportunities = []
+        now = datetime.now()
+        for index in page:
+            source = SystemValueObject(int(candidates["source"][index]))
+            destination = SystemValueObject(int(candidates["destination"][index]))
+            type_id = int(candidates["type_id"][index])
+            opportunities.append(
+                HaulingOpportunity(
+                    type_id=type_id,
+                    name=names.get(type_id, f'Item_{type_id}'),
+                    source_system_id=source.value,
+                    source_system_name=source.display_name,
+                    source_region_id=source.region.value,
+                    destination_system_id=destination.value,
+                    destination_system_name=destination.display_name,
+                    destination_region_id=destination.region.value,
+                    buy_price=float(candidates["buy_price"][index]),
+                    sell_price=float(candidates["sell_price"][index]),
+                    profit_per_unit=float(candidates["profit"][index]),
+                    margin_percentage=float(candidates["margin"][index]),
+                    tradable_volume=int(candidates["volume"][index]),
+                    total_profit=float(total_profit[index]),
+                    updated_at=now,
+                )
+            )
+
+        return ArbitrageScanResult(
+            hubs=[hub.value for hub in hubs],
+            opportunities=opportunities,
+            total_items_compared=compared,
+            total_opportunities=len(ranking),
+            analysis_timestamp=now,
+            parameters={
+                'min_margin': min_margin,
+                'min_volume': min_volume,
+                'tax_rate': tax_rate,
+                'limit': limit,
+                'offset': offset
+            }
+        )
+
+    async def _hub_spreads(
+        self, hubs: List[SystemValueObject]
+    ) -> Dict[SystemValueObject, TypeSpreads]:
+        """Descarga en paralelo el libro de cada región y agrega por estación de hub"""
+        region_ids = list(dict.fromkeys(hub.region.value for hub in hubs))
+        books = dict(
+            zip(
+                region_ids,
+                await asyncio.gather(
+                    *(self.market_client.get_order_book(r) for r in region_ids)
+                ),
+            )
+        )
+        # Se opera en la estación del hub: ventas allí y compras cuyo rango la cubre
+        return {
+            hub: books[hub.region.value]
+            .scoped(hub.value, hub.hub_station_id)
+            .spreads_by_type()
+            for hub in hubs
+        }
+
+    async def _resolve_names(self, ids: Iterable[int]) -> Dict[int, str]:
+        """Resuelve en bloque los nombres de los items"""
+        if self.name_resolver is None:
+            return {}
+        try:
+            return await self.name_resolver.resolve(ids)
+        except Exception as e:
+            print(f"⚠️ Error resolviendo nombres: {e}")
+            return {}
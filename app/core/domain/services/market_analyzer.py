@@ -1,20 +1,36 @@
 # app/core/domain/services/market_analyzer.py
 import asyncio
-from typing import List, Dict
+import weakref
+from collections import OrderedDict
 from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
 from app.core.domain.entities.market_analysis import (
     ProfitOpportunity, 
     MarketAnalysisResult
 )
+from app.core.domain.entities.opportunity_ranking import OpportunityRanking
+from app.core.domain.entities.order_book import OrderBook
+from app.core.domain.value_objects.systems import TRADE_HUBS, SystemValueObject
 from app.core.domain.value_objects.market_values import (
     MarketSpread, ISK, Volume, ConfidenceScore
 )
 
+# Rankings guardados por libro (y por tanto por snapshot)
+RANKINGS_PER_BOOK = 32
+
+
 class MarketAnalyzer:
-    def __init__(self, market_client, universe_client, items_client):
+    # libro -> {(ámbito, filtros): ranking}; se libera junto con el snapshot
+    _rankings: "weakref.WeakKeyDictionary[OrderBook, OrderedDict]" = weakref.WeakKeyDictionary()
+
+    def __init__(self, market_client, universe_client, items_client, name_resolver=None):
         self.market_client = market_client
         self.universe_client = universe_client
         self.items_client = items_client
+        self.name_resolver = name_resolver
     
     async def analyze_region_profit(
         self, 
@@ -23,93 +39,164 @@ class MarketAnalyzer:
         min_spread: float = 5.0,
         limit: int = 20,
         offset: int = 0,
-        analysis_limit: int = 100
+        system_id: Optional[int] = None,
+        location_id: Optional[int] = None,
+        sort: str = "spread_percentage",
+        cursor: Optional[str] = None
     ) -> MarketAnalysisResult:
-        """Analiza oportunidades de profit en una región"""
+        """
+        Analiza oportunidades de profit en todos los items de una región.
+        Con system_id o location_id el análisis se limita a las órdenes
+        operables desde ese sistema o estación (respetando el rango).
+        El ranking se calcula una vez por snapshot; las páginas siguientes
+        (offset o cursor) solo lo recorren.
+        """
         print(f"🔍 Analizando región {region_id}...")
         
-        # Obtener todas las órdenes de la región
-        all_orders = await self.market_client.get_market_orders(region_id)
+        # Libro columnar de la región (del snapshot en memoria si existe; si no,
+        # se construye página a página). El nombre de la región se resuelve en paralelo
+        book, _ = await asyncio.gather(
+            self.market_client.get_order_book(region_id),
+            self._resolve_names([region_id]),
+        )
         
-        # Agrupar órdenes por type_id
-        orders_by_type = self._group_orders_by_type(all_orders)
+        return await self._analyze_book(
+            book, region_id, min_volume, min_spread, limit, offset,
+            system_id, location_id, sort, cursor
+        )
+    
+    async def analyze_hubs(
+        self,
+        hubs: Optional[Iterable[SystemValueObject]] = None,
+        min_volume: Volume = Volume(100),
+        min_spread: float = 5.0,
+        limit: int = 20,
+        sort: str = "spread_percentage"
+    ) -> List[MarketAnalysisResult]:
+        """Station trading en la estación principal de cada hub"""
+        hubs = list(hubs or TRADE_HUBS)
+        print(f"🔍 Analizando {len(hubs)} hubs...")
+        
+        # Una sola descarga por región aunque tenga varios hubs
+        region_ids = list(dict.fromkeys(hub.region.value for hub in hubs))
+        books = dict(zip(
+            region_ids,
+            await asyncio.gather(
+                *(self.market_client.get_order_book(r) for r in region_ids)
+            ),
+        ))
+        
+        return list(await asyncio.gather(*(
+            self._analyze_book(
+                books[hub.region.value], hub.region.value,
+                min_volume, min_spread, limit, 0,
+                hub.value, hub.hub_station_id, sort
+            )
+            for hub in hubs
+        )))
+    
+    async def get_market_spread(self, region_id: int, type_id: int) -> Optional[MarketSpread]:
+        """
+        Spread actual de un tipo. Con snapshot, el agregado por tipo del libro
+        ya se mantiene al día con cada diff y esto es una búsqueda binaria.
+        """
+        spreads = (await self.market_client.get_order_book(region_id)).spreads_by_type()
+        index = int(np.searchsorted(spreads.type_ids, type_id))
+        if index == len(spreads) or spreads.type_ids[index] != type_id:
+            return None
+        if not spreads.has_both_sides[index]:
+            return None
+        return spreads.market_spread(index)
+    
+    def ranking(
+        self,
+        book: OrderBook,
+        min_volume: Volume,
+        min_spread: float,
+        system_id: Optional[int] = None,
+        location_id: Optional[int] = None
+    ) -> OpportunityRanking:
+        """Ranking del libro para esos filtros, reutilizado mientras viva el libro"""
+        rankings = self._rankings.setdefault(book, OrderedDict())
+        key = (system_id, location_id, float(min_spread), int(min_volume))
+        if key in rankings:
+            rankings.move_to_end(key)
+            return rankings[key]
+        
+        if system_id is not None or location_id is not None:
+            book = book.scoped(system_id, location_id)
+        # Mejor compra/venta y volúmenes de todos los tipos de una vez
+        ranking = OpportunityRanking(book.spreads_by_type(), min_spread, min_volume)
+        rankings[key] = ranking
+        if len(rankings) > RANKINGS_PER_BOOK:
+            rankings.popitem(last=False)
+        return ranking
+    
+    async def _analyze_book(
+        self,
+        book: OrderBook,
+        region_id: int,
+        min_volume: Volume,
+        min_spread: float,
+        limit: int,
+        offset: int,
+        system_id: Optional[int] = None,
+        location_id: Optional[int] = None,
+        sort: str = "spread_percentage",
+        cursor: Optional[str] = None
+    ) -> MarketAnalysisResult:
+        """Página del ranking de items viables de un libro (región o ámbito)"""
+        ranking = self.ranking(book, min_volume, min_spread, system_id, location_id)
+        spreads = ranking.spreads
+        page, next_cursor = ranking.page(sort, limit, offset, cursor)
+        
+        # Solo se resuelven nombres de la página devuelta, en una sola tanda
+        names = await self._resolve_names(
+            [int(type_id) for type_id in spreads.type_ids[page]] + [region_id]
+        )
+        region_name = names.get(region_id, f'Region_{region_id}')
         
-        # Analizar cada tipo de item
         opportunities = []
-        total_analyzed = 0
-        
-        for type_id, orders in list(orders_by_type.items())[:analysis_limit]:  # Limitar para performance
-            total_analyzed += 1
-            try:
-                opportunity = await self._analyze_item_profit(
-                    region_id, type_id, orders, min_volume, min_spread
+        for index in page:
+            type_id = int(spreads.type_ids[index])
+            opportunities.append(
+                self._build_opportunity(
+                    region_id,
+                    region_name,
+                    type_id,
+                    names.get(type_id, f'Item_{type_id}'),
+                    spreads.market_spread(index),
                 )
-                if opportunity:
-                    opportunities.append(opportunity)
-            except Exception as e:
-                print(f"⚠️ Error analizando item {type_id}: {e}")
-                continue
-        
-        # Ordenar por mejor spread
-        opportunities.sort(key=lambda x: x.spread_percentage, reverse=True)
-        
-        total_opportunities = len(opportunities)
-        
-        region_name = await self._get_region_name(region_id)
+            )
         
         return MarketAnalysisResult(
             region_id=region_id,
             region_name=region_name,
-            opportunities=opportunities[offset : offset + limit],
-            total_items_analyzed=total_analyzed,
-            total_opportunities=total_opportunities,
+            opportunities=opportunities,
+            total_items_analyzed=len(spreads),
+            total_opportunities=len(ranking),
             analysis_timestamp=datetime.now(),
             parameters={
                 'min_volume': min_volume,
                 'min_spread': min_spread,
                 'limit': limit,
                 'offset': offset,
-                'analysis_limit': analysis_limit
-            }
+                'sort': sort
+            },
+            system_id=system_id,
+            location_id=location_id,
+            next_cursor=next_cursor
         )
     
-    def _group_orders_by_type(self, orders: List[Dict]) -> Dict[int, List[Dict]]:
-        """Agrupa órdenes por type_id"""
-        grouped = {}
-        for order in orders:
-            type_id = order.get('type_id')
-            if type_id not in grouped:
-                grouped[type_id] = []
-            grouped[type_id].append(order)
-        return grouped
-    
-    async def _analyze_item_profit(
+    def _build_opportunity(
         self, 
         region_id: int, 
+        region_name: str,
         type_id: int, 
-        orders: List[Dict], 
-        min_volume: Volume, 
-        min_spread: float
+        item_name: str,
+        market_spread: MarketSpread
     ) -> ProfitOpportunity:
-        """Analiza profit para un item específico"""
-        # Separar órdenes de compra y venta
-        buy_orders = [o for o in orders if o.get('is_buy_order')]
-        sell_orders = [o for o in orders if not o.get('is_buy_order')]
-        
-        if not buy_orders or not sell_orders:
-            return None
-        
-        # Calcular market spread
-        market_spread = self._calculate_market_spread(buy_orders, sell_orders)
-        
-        # Verificar viabilidad
-        if not market_spread.is_viable(min_spread, min_volume):
-            return None
-        
-        # Obtener nombres
-        item_name = await self._get_item_name(type_id)
-        region_name = await self._get_region_name(region_id)
-        
+        """Construye la oportunidad de profit de un item ya viable"""
         # Calcular confianza
         confidence = self._calculate_confidence(market_spread)
         
@@ -128,20 +215,6 @@ class MarketAnalyzer:
             updated_at=datetime.now()
         )
     
-    def _calculate_market_spread(self, buy_orders: List[Dict], sell_orders: List[Dict]) -> MarketSpread:
-        """Calcula el spread de mercado"""
-        best_buy = ISK(max([o.get('price', 0) for o in buy_orders]))
-        best_sell = ISK(min([o.get('price', 0) for o in sell_orders]))
-        buy_volume = Volume(sum([o.get('volume_remain', 0) for o in buy_orders]))
-        sell_volume = Volume(sum([o.get('volume_remain', 0) for o in sell_orders]))
-        
-        return MarketSpread(
-            best_buy=best_buy,
-            best_sell=best_sell,
-            buy_volume=buy_volume,
-            sell_volume=sell_volume
-        )
-    
     def _calculate_confidence(self, market_spread: MarketSpread) -> ConfidenceScore:
         """Calcula la confianza basada en volumen y spread"""
         volume_confidence = min(market_spread.tradable_volume / 1000, 1.0)
@@ -151,18 +224,12 @@ class MarketAnalyzer:
         confidence = (volume_confidence * 0.6) + (spread_confidence * 0.4)
         return ConfidenceScore(confidence)
     
-    async def _get_item_name(self, type_id: int) -> str:
-        """Obtiene el nombre de un item"""
-        try:
-            item_info = await self.items_client.get_type_info(type_id)
-            return item_info.get('name', f'Item_{type_id}')
-        except:
-            return f'Item_{type_id}'
-    
-    async def _get_region_name(self, region_id: int) -> str:
-        """Obtiene el nombre de una región"""
+    async def _resolve_names(self, ids: List[int]) -> Dict[int, str]:
+        """Resuelve en bloque los nombres de items y regiones"""
+        if self.name_resolver is None:
+            return {}
         try:
-            region_info = await self.universe_client.get_region_info(region_id)
-            return region_info.get('name', f'Region_{region_id}')
-        except:
-            return f'Region_{region_id}'
\ No newline at end of file
+            return await self.name_resolver.resolve(ids)
+        except Exception as e:
+            print(f"⚠️ Error resolviendo nombres: {e}")
+            return {}
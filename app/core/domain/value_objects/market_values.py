@@ -4,6 +4,7 @@ from typing import NewType
 
 MIN_SPREAD_PERCENTAGE = 5.0
 MIN_VOLUME = 100
+HIGH_CONFIDENCE = 0.7
 
 # Type Aliases para mayor claridad
 ISK = NewType('ISK', float)
@@ -1,5 +1,8 @@
 # app/core/domain/value_objects/systems.py
 from enum import Enum
+from typing import Optional
+
+from app.core.domain.value_objects.regions import RegionValueObject
 
 # SYSTEMS
 class SystemValueObject(Enum):
@@ -8,6 +11,7 @@ class SystemValueObject(Enum):
     AMARR = 30002187
     DODIXIE = 30002659
     RENS = 30002510
+    HEK = 30002053
 
     @property
     def display_name(self):
@@ -17,11 +21,47 @@ class SystemValueObject(Enum):
             self.PERIMETER: "Perimeter",
             self.AMARR: "Amarr",
             self.DODIXIE: "Dodixie",
-            self.RENS: "Renos"
+            self.RENS: "Renos",
+            self.HEK: "Hek"
         }
         return names[self]
+
+    @property
+    def region(self) -> RegionValueObject:
+        """Región a la que pertenece el sistema"""
+        regions = {
+            self.JITA: RegionValueObject.THE_FORGE,
+            self.PERIMETER: RegionValueObject.THE_FORGE,
+            self.AMARR: RegionValueObject.DOMAIN,
+            self.DODIXIE: RegionValueObject.SINQ_LAISON,
+            self.RENS: RegionValueObject.HEIMATAR,
+            self.HEK: RegionValueObject.METROPOLIS
+        }
+        return regions[self]
+
+    @property
+    def hub_station_id(self) -> Optional[int]:
+        """Estación principal de comercio del sistema, si es un hub"""
+        stations = {
+            self.JITA: 60003760,  # Jita IV - Moon 4 - Caldari Navy Assembly Plant
+            self.AMARR: 60008494,  # Amarr VIII (Oris) - Emperor Family Academy
+            self.DODIXIE: 60011866,  # Dodixie IX - Moon 20 - Federation Navy Assembly Plant
+            self.RENS: 60004588,  # Rens VI - Moon 8 - Brutor Tribe Treasury
+            self.HEK: 60005686,  # Hek VIII - Moon 12 - Boundless Creation Factory
+        }
+        return stations.get(self)
     
     @classmethod
     def get_choices(cls):
         """Obtener lista de tuplas (id, nombre) para el template"""
         return [(system.value, system.display_name) for system in cls]
+
+
+# Hubs de comercio principales (uno por región)
+TRADE_HUBS = (
+    SystemValueObject.JITA,
+    SystemValueObject.AMARR,
+    SystemValueObject.DODIXIE,
+    SystemValueObject.RENS,
+    SystemValueObject.HEK,
+)
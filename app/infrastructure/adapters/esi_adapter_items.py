@@ -1,50 +1,56 @@
 # app/infrastructure/adapters/esi_adapter_items.py
-import httpx
-import asyncio
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
+from app.infrastructure.adapters.esi_paginator import ESIPaginator
+from app.infrastructure.adapters.esi_transport import ESITransport, get_shared_transport
 from app.infrastructure.config.settings import Settings
+from app.infrastructure.persistence.static_data_store import (
+    StaticDataStore,
+    get_static_store,
+)
 
 
 class ESIClientItems:
-    def __init__(self):
+    def __init__(
+        self,
+        transport: Optional[ESITransport] = None,
+        static_store: Optional[StaticDataStore] = None,
+    ):
         self.settings = Settings()
         self.base_url = self.settings.ESI_URL
+        self.transport = transport or get_shared_transport()
+        self.static_store = static_store or get_static_store()
+
+    async def _get_static(self, kind: str, entity_id: int, url: str) -> Dict[str, Any]:
+        """Consulta primero el almacén estático local y solo si falta va a ESI."""
+        data = self.static_store.get(kind, entity_id)
+        if data is not None:
+            return data
+
+        client = self.transport.client
+        response = await client.get(url)
+        if response.status_code == 404:
+            # Entidad inexistente: no se decodifica ni se guarda el error de ESI
+            return {}
+        response.raise_for_status()
+        data = response.json()
+        self.static_store.put(kind, entity_id, data)
+        return data
 
     async def get_all_type_ids(self) -> List[int]:
         """
         Obtiene TODOS los IDs de tipos (items) del juego.
-        Maneja la paginación de ESI automáticamente usando asyncio.gather.
+        Maneja la paginación de ESI con concurrencia acotada (ESIPaginator).
         """
-        all_ids = []
-        async with httpx.AsyncClient() as client:
-            # Primera llamada para obtener datos y número de páginas
-            response = await client.get(f"{self.base_url}/universe/types/")
-            all_ids.extend(response.json())
-
-            total_pages = int(response.headers.get("X-Pages", 1))
-
-            if total_pages > 1:
-                tasks = []
-                for page in range(2, total_pages + 1):
-                    tasks.append(
-                        client.get(
-                            f"{self.base_url}/universe/types/", params={"page": page}
-                        )
-                    )
-
-                responses = await asyncio.gather(*tasks)
-
-                for response in responses:
-                    all_ids.extend(response.json())
-
+        paginator = ESIPaginator(self.transport)
+        all_ids, _ = await paginator.fetch_all(f"{self.base_url}/universe/types/")
         return all_ids
 
     async def get_type_info(self, type_id: int) -> Dict[str, Any]:
         """Obtiene información detallada de un tipo (item) específico."""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{self.base_url}/universe/types/{type_id}/")
-            return response.json()
+        return await self._get_static(
+            "types", type_id, f"{self.base_url}/universe/types/{type_id}/"
+        )
 
     # Método para buscar items por nombre
     async def search_type_ids(self, type_name: str) -> List[int]:
@@ -52,12 +58,13 @@ class ESIClientItems:
         Busca items por nombre exacto usando /universe/ids/.
         Por ahora solo soporta coincidencia exacta.
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/universe/ids/", json=[type_name]
-            )
-            data = response.json()
-            # La respuesta tiene formato: {"inventory_types": [{"id": 123, "name": "Name"}]}
-            if "inventory_types" in data:
-                return [item["id"] for item in data["inventory_types"]]
-            return []
+        client = self.transport.client
+        response = await client.post(
+            f"{self.base_url}/universe/ids/", json=[type_name]
+        )
+        response.raise_for_status()
+        data = response.json()
+        # La respuesta tiene formato: {"inventory_types": [{"id": 123, "name": "Name"}]}
+        if "inventory_types" in data:
+            return [item["id"] for item in data["inventory_types"]]
+        return []
@@ -1,80 +1,129 @@
 # app/infrastructure/adapters/esi_adapter_market.py
-import httpx
-import asyncio
-from typing import List, Dict, Any
+from typing import AsyncIterator, List, Optional, Tuple
 
+from app.core.domain.entities.market_order import MarketOrder
+from app.core.domain.entities.order_book import OrderBook
+from app.infrastructure.adapters.esi_paginator import ESIPaginator, PaginationStats
+from app.infrastructure.adapters.esi_transport import ESITransport, get_shared_transport
 from app.infrastructure.config.settings import Settings
 
+# ESI devuelve hasta 1000 órdenes por página; los snapshots se trocean igual
+SNAPSHOT_BATCH_SIZE = 1000
+
 
 class ESIClientMarket:
-    def __init__(self):
+    def __init__(self, transport: Optional[ESITransport] = None, snapshots=None):
         self.settings = Settings()
         self.base_url = self.settings.ESI_URL
+        self.transport = transport or get_shared_transport()
+        # Proveedor opcional de snapshots (MarketSnapshotEngine)
+        self.snapshots = snapshots
 
     # Método para obtener las ordenes del mercado de una REGION específica
     async def get_market_orders(
         self, region_id: int, type_id: int = None, order_type: str = "all"
-    ) -> List[Dict[str, Any]]:
+    ) -> List[MarketOrder]:
         """Obtiene las ordenes del mercado de una región específica. Soporta paginación y filtrado por tipo de orden."""
-        all_orders = []
+        # Si hay un snapshot en memoria de la región se sirve desde ahí
+        snapshot = self.snapshots.get_snapshot(region_id) if self.snapshots else None
+        if snapshot is not None:
+            return snapshot.filter_orders(type_id, order_type)
+
+        all_orders, _ = await self.fetch_market_orders(region_id, type_id, order_type)
+        return all_orders
+
+    async def iter_market_orders(
+        self, region_id: int, type_id: int = None, order_type: str = "all"
+    ) -> AsyncIterator[List[MarketOrder]]:
+        """Genera las órdenes de la región por lotes (una página de ESI por lote) según llegan."""
+        snapshot = self.snapshots.get_snapshot(region_id) if self.snapshots else None
+        if snapshot is not None:
+            orders = snapshot.filter_orders(type_id, order_type)
+            for start in range(0, len(orders), SNAPSHOT_BATCH_SIZE):
+                yield orders[start : start + SNAPSHOT_BATCH_SIZE]
+            return
+
         params = {"order_type": order_type}
         if type_id:
             params["type_id"] = type_id
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/markets/{region_id}/orders/", params=params
-            )
-            all_orders.extend(response.json())
-
-            total_pages = int(response.headers.get("X-Pages", 1))
-            if total_pages > 1:
-                tasks = []
-                for page in range(2, total_pages + 1):
-                    p = params.copy()
-                    p["page"] = page
-                    tasks.append(
-                        client.get(
-                            f"{self.base_url}/markets/{region_id}/orders/", params=p
-                        )
-                    )
-                responses = await asyncio.gather(*tasks)
-                for r in responses:
-                    all_orders.extend(r.json())
-        return all_orders
+        paginator = ESIPaginator(self.transport, parse=MarketOrder.from_esi_page)
+        async for _, page_orders in paginator.iter_pages(
+            f"{self.base_url}/markets/{region_id}/orders/",
+            params=params,
+            cache_key=("market_orders", region_id, type_id, order_type),
+        ):
+            yield page_orders
+
+    async def get_order_book(self, region_id: int) -> OrderBook:
+        """Libro de órdenes columnar de la región (del snapshot si existe)."""
+        snapshot = self.snapshots.get_snapshot(region_id) if self.snapshots else None
+        if snapshot is not None:
+            return snapshot.book
+
+        # Cada página se pasa a columnas en cuanto llega, sin esperar a la última
+        pages = [
+            OrderBook.from_orders(page_orders)
+            async for page_orders in self.iter_market_orders(region_id)
+        ]
+        # Una orden repetida entre páginas se queda con su última versión
+        return OrderBook.concat(pages).deduplicated()
+
+    async def fetch_market_orders(
+        self, region_id: int, type_id: int = None, order_type: str = "all"
+    ) -> Tuple[List[MarketOrder], PaginationStats]:
+        """Descarga las órdenes de la región desde ESI junto a las métricas de paginación."""
+        params = {"order_type": order_type}
+        if type_id:
+            params["type_id"] = type_id
+
+        paginator = ESIPaginator(self.transport, parse=MarketOrder.from_esi_page)
+        all_orders, stats = await paginator.fetch_all(
+            f"{self.base_url}/markets/{region_id}/orders/",
+            params=params,
+            cache_key=("market_orders", region_id, type_id, order_type),
+        )
+        if self.settings.DEBUG_LOGS:
+            print(f"📄 Región {region_id}: {stats.summary()}")
+        return all_orders, stats
 
     # Método para obtener las ordenes del mercado de un SISTEMA específico
     async def get_market_orders_by_system(
         self, system_id: int, type_id: int = None, order_type: str = "all"
-    ) -> List[Dict[str, Any]]:
+    ) -> List[MarketOrder]:
         """Obtiene las ordenes del mercado de un sistema específico. Opcionalmente filtra por tipo."""
-        from app.infrastructure.adapters.esi_adapter_universe import ESIClientUniverse
-
-        universe_client = ESIClientUniverse()
-
-        # 1. Obtener info del sistema para saber la constelación
-        system_info = await universe_client.get_system_info(system_id)
-        if not system_info or "constellation_id" not in system_info:
-            return []
+        return [
+            order
+            async for batch in self.iter_market_orders_by_system(
+                system_id, type_id, order_type
+            )
+            for order in batch
+        ]
 
-        constellation_id = system_info["constellation_id"]
+    async def iter_market_orders_by_system(
+        self, system_id: int, type_id: int = None, order_type: str = "all"
+    ) -> AsyncIterator[List[MarketOrder]]:
+        """Genera por lotes las órdenes de un sistema, filtrando página a página."""
+        from app.infrastructure.adapters.esi_topology import get_topology_service
 
-        # 2. Obtener info de la constelación para saber la región
-        constellation_info = await universe_client.get_constellation_info(
-            constellation_id
-        )
-        if not constellation_info or "region_id" not in constellation_info:
-            return []
+        # 1. Región del sistema desde el índice de topología (sin round-trips a ESI)
+        region_id = await get_topology_service().region_of_system(system_id)
+        if region_id is None:
+            return
 
-        region_id = constellation_info["region_id"]
+        snapshot = self.snapshots.get_snapshot(region_id) if self.snapshots else None
+        if snapshot is not None:
+            orders = snapshot.filter_orders(type_id, order_type, system_id)
+            for start in range(0, len(orders), SNAPSHOT_BATCH_SIZE):
+                yield orders[start : start + SNAPSHOT_BATCH_SIZE]
+            return
 
-        # 3. Obtener órdenes de la región (filtrando por tipo si se especifica)
+        # 2. Recorrer las órdenes de la región (filtrando por tipo si se especifica)
         # Esto es mucho más eficiente si se da el type_id
-        all_region_orders = await self.get_market_orders(region_id, type_id, order_type)
-
-        # 4. Filtrar por system_id
-        system_orders = [
-            order for order in all_region_orders if order.get("system_id") == system_id
-        ]
-
-        return system_orders
+        async for batch in self.iter_market_orders(region_id, type_id, order_type):
+            # 3. Filtrar por system_id sin acumular la región entera
+            system_orders = [
+                order for order in batch if order.system_id == system_id
+            ]
+            if system_orders:
+                yield system_orders
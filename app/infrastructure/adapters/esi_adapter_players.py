@@ -1,16 +1,17 @@
-import httpx
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from app.infrastructure.adapters.esi_transport import ESITransport, get_shared_transport
 from app.infrastructure.config.settings import Settings
 
 
 class ESIClientPlayers:
-    def __init__(self):
+    def __init__(self, transport: Optional[ESITransport] = None):
         self.settings = Settings()
         self.base_url = self.settings.ESI_URL
+        self.transport = transport or get_shared_transport()
 
     # Método para obtener todas las CORPS NPC
     async def get_all_npc_corps(self) -> List[int]:
         """Obtiene la lista de IDs de todas las corporaciones NPC."""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{self.base_url}/corporations/npccorps/")
-            return response.json()
+        client = self.transport.client
+        response = await client.get(f"{self.base_url}/corporations/npccorps/")
+        return response.json()
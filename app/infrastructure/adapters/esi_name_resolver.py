@@ -0,0 +1,91 @@
+# app/infrastructure/adapters/esi_name_resolver.py
+import asyncio
+import time
+from typing import Dict, Iterable, List, Optional
+
+from app.infrastructure.adapters.esi_transport import ESITransport, get_shared_transport
+from app.infrastructure.config.settings import Settings
+from app.infrastructure.serialization import json_codec
+
+# Máximo de IDs que acepta POST /universe/names/ por llamada
+NAMES_BATCH_SIZE = 1000
+
+
+class NameCache:
+    """Caché de nombres (id -> nombre) compartida por todo el proceso."""
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(NameCache, cls).__new__(cls)
+            cls._instance.store = {}
+        return cls._instance
+
+    def get(self, entity_id: int) -> Optional[str]:
+        if entity_id in self.store:
+            name, expiry = self.store[entity_id]
+            if time.time() < expiry:
+                return name
+            del self.store[entity_id]
+        return None
+
+    def set(self, entity_id: int, name: str, ttl: int):
+        self.store[entity_id] = (name, time.time() + ttl)
+
+    def clear(self):
+        self.store = {}
+
+
+class ESINameResolver:
+    """
+    Resuelve nombres de items, regiones, sistemas, etc. en bloque con
+    POST /universe/names/ (hasta 1000 IDs por llamada) y los guarda en
+    NameCache con un TTL largo.
+    """
+
+    def __init__(self, transport: Optional[ESITransport] = None):
+        self.settings = Settings()
+        self.base_url = self.settings.ESI_URL
+        self.transport = transport or get_shared_transport()
+        self.ttl = int(self.settings.NAME_CACHE_TTL)
+
+    async def resolve(self, ids: Iterable[int]) -> Dict[int, str]:
+        """Devuelve {id: nombre}; los IDs que ESI no reconoce se omiten."""
+        cache = NameCache()
+        names: Dict[int, str] = {}
+        missing: List[int] = []
+        for entity_id in dict.fromkeys(int(i) for i in ids):
+            name = cache.get(entity_id)
+            if name is None:
+                missing.append(entity_id)
+            else:
+                names[entity_id] = name
+
+        batches = [
+            missing[i : i + NAMES_BATCH_SIZE]
+            for i in range(0, len(missing), NAMES_BATCH_SIZE)
+        ]
+        for resolved in await asyncio.gather(*(self._post_names(b) for b in batches)):
+            for entity_id, name in resolved.items():
+                cache.set(entity_id, name, self.ttl)
+                names[entity_id] = name
+        return names
+
+    async def _post_names(self, ids: List[int]) -> Dict[int, str]:
+        if not ids:
+            return {}
+        response = await self.transport.client.post(
+            f"{self.base_url}/universe/names/", json=ids
+        )
+        if response.status_code == 404:
+            # ESI rechaza el lote entero si un ID no existe: se divide para aislarlo
+            if len(ids) == 1:
+                return {}
+            middle = len(ids) // 2
+            left, right = await asyncio.gather(
+                self._post_names(ids[:middle]), self._post_names(ids[middle:])
+            )
+            return {**left, **right}
+        response.raise_for_status()
+        return {item["id"]: item["name"] for item in json_codec.loads(response.content)}
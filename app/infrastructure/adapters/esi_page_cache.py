@@ -0,0 +1,79 @@
+# app/infrastructure/adapters/esi_page_cache.py
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Hashable, List, Mapping, Optional
+
+from app.infrastructure.config.settings import Settings
+
+
+def parse_expires(headers: Mapping[str, str]) -> float:
+    """Convierte la cabecera Expires de ESI a epoch; sin cabecera caduca ya."""
+    expires = headers.get("Expires")
+    if expires:
+        try:
+            return parsedate_to_datetime(expires).timestamp()
+        except (TypeError, ValueError):
+            pass
+    return time.time()
+
+
+@dataclass
+class CachedPage:
+    """Página de ESI ya decodificada junto a su ETag y caducidad"""
+    etag: Optional[str]
+    expires_at: float
+    total_pages: int
+    data: List[Any]
+    size: int = 0  # Bytes del cuerpo de ESI, como estimación de lo que ocupa
+
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+
+class ConditionalPageCache:
+    """
+    Caché de páginas de ESI para peticiones condicionales.
+    Mientras la página no caduca se sirve directamente; después se
+    revalida con If-None-Match y un 304 reutiliza el cuerpo guardado.
+    Acotada por número de páginas y por bytes (tamaño del cuerpo de ESI):
+    al superar cualquiera de los dos se expulsan las menos usadas.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ConditionalPageCache, cls).__new__(cls)
+            settings = Settings()
+            cls._instance.store = OrderedDict()
+            cls._instance.max_pages = int(settings.ESI_PAGE_CACHE_MAX_PAGES)
+            cls._instance.max_bytes = int(settings.ESI_PAGE_CACHE_MAX_BYTES)
+            cls._instance.current_bytes = 0
+        return cls._instance
+
+    def get(self, key: Hashable) -> Optional[CachedPage]:
+        page = self.store.get(key)
+        if page is not None:
+            self.store.move_to_end(key)
+        return page
+
+    def set(self, key: Hashable, page: CachedPage):
+        old = self.store.pop(key, None)
+        if old is not None:
+            self.current_bytes -= old.size
+        if page.size > self.max_bytes:
+            # No cabe ni vaciando la caché: no se guarda
+            return
+        self.store[key] = page
+        self.current_bytes += page.size
+        while len(self.store) > self.max_pages or self.current_bytes > self.max_bytes:
+            _, evicted = self.store.popitem(last=False)
+            self.current_bytes -= evicted.size
+
+    def clear(self):
+        self.store = OrderedDict()
+        self.current_bytes = 0
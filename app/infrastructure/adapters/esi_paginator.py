@@ -0,0 +1,268 @@
+# app/infrastructure/adapters/esi_paginator.py
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.infrastructure.adapters.esi_page_cache import (
+    CachedPage,
+    ConditionalPageCache,
+    parse_expires,
+)
+from app.infrastructure.adapters.esi_transport import ESITransport
+from app.infrastructure.serialization import json_codec
+
+# Códigos ante los que ESI pide esperar y reintentar
+RETRYABLE_STATUS = {420, 500, 502, 503, 504}
+
+
+class ESIPageError(Exception):
+    """Una página no pudo descargarse tras agotar los reintentos."""
+
+    def __init__(self, url: str, page: int, reason: str):
+        super().__init__(f"Página {page} de {url} falló: {reason}")
+        self.url = url
+        self.page = page
+        self.reason = reason
+
+
+@dataclass
+class PaginationStats:
+    """Métricas de una descarga paginada"""
+    total_pages: int = 0
+    retries: int = 0
+    cache_hits: int = 0
+    not_modified: int = 0
+    expires_at: Optional[float] = None
+    decode_seconds: float = 0.0
+    page_latencies: Dict[int, float] = field(default_factory=dict)
+
+    def record_expiry(self, expires_at: float):
+        if self.expires_at is None or expires_at < self.expires_at:
+            self.expires_at = expires_at
+
+    @property
+    def avg_latency(self) -> float:
+        if not self.page_latencies:
+            return 0.0
+        return sum(self.page_latencies.values()) / len(self.page_latencies)
+
+    @property
+    def max_latency(self) -> float:
+        return max(self.page_latencies.values(), default=0.0)
+
+    def summary(self) -> str:
+        return (
+            f"{self.total_pages} páginas, "
+            f"latencia media {self.avg_latency * 1000:.0f} ms, "
+            f"máx {self.max_latency * 1000:.0f} ms, "
+            f"decodificación {self.decode_seconds * 1000:.0f} ms ({json_codec.JSON_BACKEND}), "
+            f"{self.retries} reintentos, "
+            f"{self.cache_hits} en caché, {self.not_modified} sin cambios (304)"
+        )
+
+
+class ESIPaginator:
+    """
+    Descarga endpoints paginados de ESI (X-Pages) con concurrencia acotada.
+    Cada página se reintenta por separado con back-off, respetando el
+    error limit compartido del transporte. Si se indica `cache_key`, las
+    páginas se sirven desde ConditionalPageCache hasta su Expires y luego
+    se revalidan con su ETag. `parse` convierte cada página decodificada
+    (p. ej. a MarketOrder) antes de guardarla en caché y devolverla.
+    """
+
+    def __init__(
+        self,
+        transport: ESITransport,
+        max_concurrency: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        parse: Optional[Callable[[Any], Any]] = None,
+    ):
+        settings = transport.settings
+        self.transport = transport
+        self.max_concurrency = int(
+            max_concurrency or settings.ESI_MAX_CONCURRENT_PAGES
+        )
+        self.max_retries = int(
+            settings.ESI_MAX_RETRIES if max_retries is None else max_retries
+        )
+        self.backoff = float(settings.ESI_RETRY_BACKOFF)
+        self.parse = parse
+
+    async def fetch_all(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        cache_key: Optional[Tuple[Any, ...]] = None,
+    ) -> Tuple[List[Any], PaginationStats]:
+        """Descarga todas las páginas y devuelve los elementos en orden de página."""
+        stats = PaginationStats()
+        pages: Dict[int, List[Any]] = {}
+        pages[1], stats.total_pages = await self.load_page(
+            url, params, 1, stats, cache_key
+        )
+
+        if stats.total_pages > 1:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+
+            async def bounded(page: int):
+                async with semaphore:
+                    pages[page], _ = await self.load_page(
+                        url, params, page, stats, cache_key
+                    )
+
+            await asyncio.gather(
+                *(bounded(page) for page in range(2, stats.total_pages + 1))
+            )
+
+        items: List[Any] = []
+        for page in range(1, stats.total_pages + 1):
+            items.extend(pages[page])
+        return items, stats
+
+    async def iter_pages(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        cache_key: Optional[Tuple[Any, ...]] = None,
+        stats: Optional[PaginationStats] = None,
+    ) -> AsyncIterator[Tuple[int, List[Any]]]:
+        """
+        Genera (página, elementos) a medida que llegan, en orden de llegada.
+        Como mucho hay `max_concurrency` páginas en vuelo o pendientes de
+        consumir. Con `cache_key` las páginas además quedan en
+        ConditionalPageCache, acotada por ESI_PAGE_CACHE_MAX_BYTES.
+        """
+        stats = stats if stats is not None else PaginationStats()
+        first, stats.total_pages = await self.load_page(
+            url, params, 1, stats, cache_key
+        )
+        yield 1, first
+
+        async def numbered(page: int) -> Tuple[int, List[Any]]:
+            items, _ = await self.load_page(url, params, page, stats, cache_key)
+            return page, items
+
+        pending: set = set()
+        next_page = 2
+        try:
+            while next_page <= stats.total_pages or pending:
+                while next_page <= stats.total_pages and len(pending) < self.max_concurrency:
+                    pending.add(asyncio.ensure_future(numbered(next_page)))
+                    next_page += 1
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    yield task.result()
+        finally:
+            # Si el consumidor abandona (cliente desconectado) se cancela lo pendiente
+            for task in pending:
+                task.cancel()
+            # y se espera, para no dejar tareas destruidas ni excepciones sin recoger
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def load_page(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        page: int,
+        stats: PaginationStats,
+        cache_key: Optional[Tuple[Any, ...]] = None,
+    ) -> Tuple[List[Any], int]:
+        """Devuelve (elementos, X-Pages) de una página, usando la caché condicional."""
+        if cache_key is None:
+            response = await self.fetch_page(url, params, page, stats)
+            stats.record_expiry(parse_expires(response.headers))
+            return self.decode(response, stats), int(response.headers.get("X-Pages", 1))
+
+        cache = ConditionalPageCache()
+        key = (*cache_key, page)
+        cached = cache.get(key)
+        if cached is not None and cached.is_fresh:
+            stats.cache_hits += 1
+            stats.record_expiry(cached.expires_at)
+            return cached.data, cached.total_pages
+
+        headers = None
+        if cached is not None and cached.etag:
+            headers = {"If-None-Match": cached.etag}
+        response = await self.fetch_page(url, params, page, stats, headers)
+        expires_at = parse_expires(response.headers)
+        stats.record_expiry(expires_at)
+
+        if response.status_code == 304 and cached is not None:
+            # Sin cambios: se reutiliza el cuerpo ya decodificado
+            stats.not_modified += 1
+            cached.expires_at = expires_at
+            cached.total_pages = int(
+                response.headers.get("X-Pages", cached.total_pages)
+            )
+            return cached.data, cached.total_pages
+
+        page_data = CachedPage(
+            etag=response.headers.get("ETag"),
+            expires_at=expires_at,
+            total_pages=int(response.headers.get("X-Pages", 1)),
+            data=self.decode(response, stats),
+            size=len(response.content),
+        )
+        cache.set(key, page_data)
+        return page_data.data, page_data.total_pages
+
+    def decode(self, response: httpx.Response, stats: PaginationStats) -> Any:
+        """Decodifica el cuerpo con el codec rápido y mide el tiempo empleado."""
+        start = time.perf_counter()
+        data = json_codec.loads(response.content)
+        if self.parse is not None:
+            data = self.parse(data)
+        stats.decode_seconds += time.perf_counter() - start
+        return data
+
+    async def fetch_page(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        page: int,
+        stats: PaginationStats,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> httpx.Response:
+        """Descarga una página concreta reintentando errores transitorios."""
+        page_params = dict(params or {})
+        if page > 1:
+            page_params["page"] = page
+
+        budget = self.transport.error_budget
+        for attempt in range(self.max_retries + 1):
+            await budget.wait()
+            started = time.perf_counter()
+            try:
+                response = await self.transport.client.get(
+                    url, params=page_params, headers=headers
+                )
+            except httpx.TransportError as e:
+                reason = str(e) or type(e).__name__
+            else:
+                budget.update(response.headers)
+                stats.page_latencies[page] = time.perf_counter() - started
+                if response.status_code == 304:
+                    return response
+                if response.status_code not in RETRYABLE_STATUS:
+                    response.raise_for_status()
+                    return response
+                reason = f"HTTP {response.status_code}"
+                if response.status_code == 420:
+                    # Error limit agotado: ESI indica cuándo se reinicia la ventana
+                    budget.pause(
+                        float(response.headers.get("X-ESI-Error-Limit-Reset", 60))
+                    )
+
+            if attempt == self.max_retries:
+                raise ESIPageError(url, page, reason)
+            stats.retries += 1
+            await asyncio.sleep(self.backoff * (2**attempt))
+
+        raise ESIPageError(url, page, "sin intentos")
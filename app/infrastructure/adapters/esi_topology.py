@@ -0,0 +1,84 @@
+# app/infrastructure/adapters/esi_topology.py
+from typing import Optional
+
+from app.core.domain.entities.universe_topology import SystemNode, UniverseTopology
+from app.infrastructure.adapters.esi_adapter_universe import ESIClientUniverse
+from app.infrastructure.persistence.static_data_store import (
+    StaticDataStore,
+    get_static_store,
+)
+
+
+class ESITopologyService:
+    """
+    Índice sistema -> constelación -> región cargado una vez desde el
+    almacén estático. Los sistemas que aún no estén indexados se resuelven
+    contra ESI una única vez y quedan guardados para siguientes arranques.
+    """
+
+    def __init__(
+        self,
+        universe_client: Optional[ESIClientUniverse] = None,
+        static_store: Optional[StaticDataStore] = None,
+    ):
+        self.static_store = static_store or get_static_store()
+        self.universe_client = universe_client or ESIClientUniverse(
+            static_store=self.static_store
+        )
+        self.topology = UniverseTopology()
+
+    def load_from_store(self) -> int:
+        """Carga constelaciones y sistemas del almacén estático; devuelve cuántos sistemas hay"""
+        for constellation_id, info in self.static_store.iter_all("constellations"):
+            if "region_id" in info:
+                self.topology.add_constellation(constellation_id, info["region_id"])
+        for system_id, info in self.static_store.iter_all("systems"):
+            self._index_system(system_id, info)
+        return len(self.topology)
+
+    def _index_system(self, system_id: int, info: dict) -> Optional[SystemNode]:
+        if "constellation_id" not in info:
+            return None
+        return self.topology.add_system(
+            system_id,
+            info.get("name", f"System_{system_id}"),
+            info["constellation_id"],
+            info.get("security_status", 0.0),
+        )
+
+    async def get_system(self, system_id: int) -> Optional[SystemNode]:
+        """Nodo del sistema; sin round-trips si ya está en el índice"""
+        node = self.topology.get_system(system_id)
+        if node is not None:
+            return node
+
+        system_info = await self.universe_client.get_system_info(system_id)
+        if not system_info or "constellation_id" not in system_info:
+            return None
+        constellation_id = system_info["constellation_id"]
+        if constellation_id not in self.topology.constellation_regions:
+            constellation_info = await self.universe_client.get_constellation_info(
+                constellation_id
+            )
+            if not constellation_info or "region_id" not in constellation_info:
+                return None
+            self.topology.add_constellation(
+                constellation_id, constellation_info["region_id"]
+            )
+        return self._index_system(system_id, system_info)
+
+    async def region_of_system(self, system_id: int) -> Optional[int]:
+        node = await self.get_system(system_id)
+        return node.region_id if node else None
+
+
+_shared_topology: Optional[ESITopologyService] = None
+
+
+def get_topology_service() -> ESITopologyService:
+    """Devuelve el índice de topología compartido por todo el proceso."""
+    global _shared_topology
+    if _shared_topology is None:
+        _shared_topology = ESITopologyService()
+        _shared_topology.load_from_store()
+    return _shared_topology
@@ -0,0 +1,121 @@
+# app/infrastructure/adapters/esi_transport.py
+import asyncio
+import time
+from typing import Mapping, Optional
+
+import httpx
+
+from app.infrastructure.config.settings import Settings
+
+
+class ESIErrorBudget:
+    """
+    Estado del error limit de ESI compartido por todo el proceso.
+    ESI informa los errores restantes en X-ESI-Error-Limit-Remain y los
+    segundos hasta el reinicio de la ventana en X-ESI-Error-Limit-Reset;
+    si el margen baja del umbral se pausan todas las peticiones.
+    """
+
+    def __init__(self, threshold: int):
+        self.threshold = threshold
+        self.remain: Optional[int] = None
+        self._resume_at = 0.0
+
+    def update(self, headers: Mapping[str, str]):
+        """Actualiza el presupuesto con las cabeceras de una respuesta."""
+        remain = headers.get("X-ESI-Error-Limit-Remain")
+        if remain is None:
+            return
+        self.remain = int(remain)
+        if self.remain <= self.threshold:
+            self.pause(float(headers.get("X-ESI-Error-Limit-Reset", 60)))
+
+    def pause(self, seconds: float):
+        """Bloquea nuevas peticiones durante `seconds` segundos."""
+        self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+    @property
+    def paused_for(self) -> float:
+        return max(self._resume_at - time.monotonic(), 0.0)
+
+    async def wait(self):
+        """Espera a que el error limit permita volver a llamar a ESI."""
+        while self.paused_for > 0:
+            await asyncio.sleep(self.paused_for)
+
+
+class ESITransport:
+    """
+    Transporte HTTP compartido hacia ESI.
+    Mantiene un único httpx.AsyncClient con keep-alive y HTTP/2 para que
+    todos los adapters reutilicen las mismas conexiones.
+    """
+
+    def __init__(self, settings: Optional[Settings] = None):
+        self.settings = settings or Settings()
+        self._client: Optional[httpx.AsyncClient] = None
+        self.error_budget = ESIErrorBudget(
+            int(self.settings.ESI_ERROR_LIMIT_THRESHOLD)
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Cliente HTTP compartido. Se crea bajo demanda si no se inició."""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+    @property
+    def is_open(self) -> bool:
+        return self._client is not None and not self._client.is_closed
+
+    def _build_client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=int(self.settings.ESI_MAX_CONNECTIONS),
+            max_keepalive_connections=int(self.settings.ESI_MAX_KEEPALIVE_CONNECTIONS),
+            keepalive_expiry=float(self.settings.ESI_KEEPALIVE_EXPIRY),
+        )
+        return httpx.AsyncClient(
+            base_url=self.settings.ESI_URL,
+            http2=bool(self.settings.ESI_HTTP2),
+            limits=limits,
+            timeout=httpx.Timeout(float(self.settings.ESI_TIMEOUT)),
+            headers={"User-Agent": self.settings.ESI_USER_AGENT},
+        )
+
+    async def start(self) -> "ESITransport":
+        """Abre el pool de conexiones (idempotente)."""
+        _ = self.client
+        return self
+
+    async def close(self):
+        """Cierra el pool de conexiones liberando los sockets abiertos."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    async def __aenter__(self) -> "ESITransport":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+# Transporte de proceso: lo abre/cierra el lifespan de FastAPI
+_shared_transport: Optional[ESITransport] = None
+
+
+def get_shared_transport() -> ESITransport:
+    """Devuelve el transporte ESI compartido por todo el proceso."""
+    global _shared_transport
+    if _shared_transport is None:
+        _shared_transport = ESITransport()
+    return _shared_transport
+
+
+async def close_shared_transport():
+    """Cierra el transporte compartido (shutdown de la app o fin del CLI)."""
+    global _shared_transport
+    if _shared_transport is not None:
+        await _shared_transport.close()
+        _shared_transport = None
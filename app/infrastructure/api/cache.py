@@ -1,55 +1,345 @@
+import asyncio
+import enum
+from abc import ABC, abstractmethod
+import inspect
+import sys
 import time
 import functools
-from typing import Any, Callable, Dict, Optional
+from collections import OrderedDict
+from dataclasses import fields, is_dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+from fastapi.params import Depends
+
+from app.infrastructure.config.settings import Settings
+from app.infrastructure.serialization import json_codec
+
+# A partir de este tamaño las colecciones se estiman por muestreo
+SIZE_SAMPLE = 100
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """Estimación aproximada (en bytes) de lo que ocupa un valor cacheado."""
+    if isinstance(value, (bytes, bytearray, str)):
+        return sys.getsizeof(value)
+    size = sys.getsizeof(value)
+    if _depth > 8:
+        return size
+    if isinstance(value, dict):
+        items = list(value.items())
+        sample = items[:SIZE_SAMPLE]
+        sampled = sum(
+            estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1)
+            for k, v in sample
+        )
+        return size + (sampled * len(items) // len(sample) if sample else 0)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = value if isinstance(value, (list, tuple)) else list(value)
+        sample = items[:SIZE_SAMPLE]
+        sampled = sum(estimate_size(v, _depth + 1) for v in sample)
+        return size + (sampled * len(items) // len(sample) if sample else 0)
+    if is_dataclass(value) and not isinstance(value, type):
+        return size + sum(
+            estimate_size(getattr(value, f.name), _depth + 1) for f in fields(value)
+        )
+    return size
 
 
 class InMemoryCache:
+    """
+    Caché en memoria con TTL y límites de entradas y bytes.
+    Al superar cualquiera de los límites se expulsan las entradas menos
+    usadas recientemente (LRU); las caducadas se limpian al leerlas y con
+    un barrido periódico. Con `stale_ttl` una entrada caducada se conserva
+    un tiempo extra para servirla mientras se revalida.
+    """
+
     _instance = None
 
     def __new__(cls):
         if cls._instance is None:
+            settings = Settings()
             cls._instance = super(InMemoryCache, cls).__new__(cls)
-            cls._instance.store = {}
+            cls._instance.store = OrderedDict()
+            cls._instance.max_entries = int(settings.CACHE_MAX_ENTRIES)
+            cls._instance.max_bytes = int(settings.CACHE_MAX_BYTES)
+            cls._instance.current_bytes = 0
+            cls._instance.hits = 0
+            cls._instance.misses = 0
+            cls._instance.evictions = 0
+            cls._instance.expirations = 0
         return cls._instance
 
     def get(self, key: str) -> Optional[Any]:
+        entry = self.get_entry(key)
+        if entry is not None and entry[1]:
+            return entry[0]
+        return None
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, bool]]:
+        """Devuelve (valor, está_fresco) mientras la entrada siga siendo servible."""
         if key in self.store:
-            data, expiry = self.store[key]
-            if time.time() < expiry:
-                return data
+            data, expiry, stale_until, _ = self.store[key]
+            now = time.time()
+            if now < stale_until:
+                self.store.move_to_end(key)
+                self.hits += 1
+                return data, now < expiry
             else:
-                del self.store[key]
+                self._remove(key)
+                self.expirations += 1
+        self.misses += 1
         return None
 
-    def set(self, key: str, value: Any, ttl: int):
-        self.store[key] = (value, time.time() + ttl)
+    def set(self, key: str, value: Any, ttl: int, stale_ttl: int = 0):
+        size = estimate_size(value)
+        if key in self.store:
+            self._remove(key)
+        if size > self.max_bytes:
+            # No cabe ni vaciando la caché: no se guarda
+            return
+        expiry = time.time() + ttl
+        self.store[key] = (value, expiry, expiry + stale_ttl, size)
+        self.current_bytes += size
+        while len(self.store) > self.max_entries or self.current_bytes > self.max_bytes:
+            oldest = next(iter(self.store))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        *_, size = self.store.pop(key)
+        self.current_bytes -= size
+
+    def sweep_expired(self) -> int:
+        """Elimina todas las entradas caducadas; devuelve cuántas se borraron."""
+        now = time.time()
+        expired = [
+            key for key, (_, _, stale_until, _) in self.store.items()
+            if stale_until <= now
+        ]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        return len(expired)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self.store),
+            "bytes": self.current_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
 
     def clear(self):
-        self.store = {}
+        self.store = OrderedDict()
+        self.current_bytes = 0
+
+
+class CacheBackend(ABC):
+    """Interfaz de los backends que usa cache_response."""
+
+    @abstractmethod
+    async def get_entry(self, key: str) -> Optional[Tuple[Any, bool]]:
+        """Devuelve (valor, está_fresco) mientras la entrada siga siendo servible."""
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float, stale_ttl: float = 0):
+        ...
+
+    @abstractmethod
+    async def clear(self):
+        ...
+
+
+class SharedCacheBackend(CacheBackend):
+    """Backend compartido entre procesos (L2): expone también las caducidades."""
+
+    @abstractmethod
+    async def get_record(self, key: str) -> Optional[Tuple[Any, float, float]]:
+        """Devuelve (valor, fresco_hasta, servible_hasta) o None."""
+
+
+class LocalCacheBackend(CacheBackend):
+    """Backend de un solo proceso sobre InMemoryCache."""
+
+    def __init__(self):
+        self.local = InMemoryCache()
+
+    async def get_entry(self, key: str) -> Optional[Tuple[Any, bool]]:
+        return self.local.get_entry(key)
+
+    async def set(self, key: str, value: Any, ttl: float, stale_ttl: float = 0):
+        self.local.set(key, value, ttl, stale_ttl)
+
+    async def clear(self):
+        self.local.clear()
+
+
+class TieredCacheBackend(CacheBackend):
+    """
+    L1 local (InMemoryCache) delante de un L2 compartido (Redis).
+    Los aciertos en L2 se copian a L1 con la caducidad que les queda, así
+    la mayoría de lecturas no salen del proceso.
+    """
+
+    def __init__(self, remote: SharedCacheBackend):
+        self.local = InMemoryCache()
+        self.remote = remote
+
+    async def get_entry(self, key: str) -> Optional[Tuple[Any, bool]]:
+        entry = self.local.get_entry(key)
+        if entry is not None and entry[1]:
+            return entry
+
+        record = await self.remote.get_record(key)
+        if record is None:
+            return entry
+        value, fresh_until, stale_until = record
+        now = time.time()
+        self.local.set(key, value, fresh_until - now, stale_until - fresh_until)
+        return value, now < fresh_until
+
+    async def set(self, key: str, value: Any, ttl: float, stale_ttl: float = 0):
+        self.local.set(key, value, ttl, stale_ttl)
+        await self.remote.set(key, value, ttl, stale_ttl)
+
+    async def clear(self):
+        self.local.clear()
+        await self.remote.clear()
+
+
+_cache_backend: Optional[CacheBackend] = None
+
+
+def get_cache_backend() -> CacheBackend:
+    """Backend de caché según CACHE_BACKEND ('memory' o 'redis')."""
+    global _cache_backend
+    if _cache_backend is None:
+        settings = Settings()
+        if settings.CACHE_BACKEND == "redis":
+            try:
+                from app.infrastructure.api.redis_cache import RedisCache
+
+                _cache_backend = TieredCacheBackend(RedisCache())
+            except ImportError as e:
+                print(f"⚠️ Redis no disponible ({e}), usando caché en memoria")
+        if _cache_backend is None:
+            _cache_backend = LocalCacheBackend()
+    return _cache_backend
+
+
+async def run_cache_sweeper(interval: float):
+    """Tarea de fondo que barre periódicamente las entradas caducadas."""
+    cache = InMemoryCache()
+    while True:
+        await asyncio.sleep(interval)
+        cache.sweep_expired()
 
 
-def cache_response(ttl: int = 60):
+# Cálculos en curso por clave de caché (single-flight)
+_inflight: Dict[str, asyncio.Task] = {}
+
+
+def _single_flight(cache_key: str, compute: Callable) -> asyncio.Task:
+    """Devuelve el cálculo en curso para la clave o lanza uno nuevo."""
+    task = _inflight.get(cache_key)
+    if task is None:
+        task = asyncio.ensure_future(compute())
+        _inflight[cache_key] = task
+        task.add_done_callback(lambda _: _inflight.pop(cache_key, None))
+        task.add_done_callback(_log_compute_error)
+    return task
+
+
+def _log_compute_error(task: asyncio.Task):
+    # Consume la excepción aunque nadie espere la tarea (revalidación de fondo)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"⚠️ Error calculando respuesta cacheada: {task.exception()}")
+
+
+def _normalize_param(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, enum.Enum):
+        return str(value.value)
+    return str(value)
+
+
+def build_cache_key(route: str, params: Dict[str, Any]) -> str:
+    """Clave canónica: identificador de ruta + parámetros ordenados y normalizados."""
+    query = sorted((name, _normalize_param(value)) for name, value in params.items())
+    return f"{route}?{urlencode(query)}"
+
+
+def encode_json(content: Any) -> bytes:
+    """Codifica igual que JSONResponse de FastAPI, pero una sola vez."""
+    return json_codec.dumps(content)
+
+
+def cache_response(ttl: int = 60, stale_ttl: int = 0):
     """
     Decorador para cachear respuestas de endpoints.
-    Usa la ruta y los argumentos como clave.
+    La clave se construye con la ruta y sus parámetros de query/path,
+    ignorando las dependencias inyectadas con Depends. Se cachea el JSON ya
+    codificado y los aciertos se devuelven como Response sin volver a
+    serializar.
+    Las peticiones concurrentes con la misma clave comparten un único
+    cálculo (single-flight). Con `stale_ttl`, una entrada caducada se sirve
+    al instante durante ese margen mientras una tarea de fondo la refresca.
     """
 
     def decorator(func: Callable):
+        signature = inspect.signature(func)
+        # Dependencias y objetos de la petición no forman parte de la clave
+        excluded = {
+            name
+            for name, param in signature.parameters.items()
+            if isinstance(param.default, Depends) or param.annotation is Request
+        }
+        route = f"{func.__module__}.{func.__qualname__}"
+
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
-            # Crear una clave única basada en la función y los argumentos
-            # Nota: Esto es una implementación simple. Para producción, considerar algo más robusto.
-            cache_key = f"{func.__name__}:{args}:{kwargs}"
+            bound = signature.bind_partial(*args, **kwargs)
+            bound.apply_defaults()
+            cache_key = build_cache_key(
+                route,
+                {k: v for k, v in bound.arguments.items() if k not in excluded},
+            )
+
+            cache = get_cache_backend()
 
-            cache = InMemoryCache()
-            cached_result = cache.get(cache_key)
+            async def compute():
+                result = await func(*args, **kwargs)
+                body = encode_json(result)
+                await cache.set(cache_key, body, ttl, stale_ttl)
+                return body
 
-            if cached_result is not None:
-                return cached_result
+            entry = await cache.get_entry(cache_key)
+            if entry is not None:
+                body, is_fresh = entry
+                if not is_fresh:
+                    # Stale-while-revalidate: una sola revalidación en segundo plano
+                    _single_flight(cache_key, compute)
+                return Response(
+                    content=body,
+                    media_type="application/json",
+                    headers={"X-Cache": "HIT" if is_fresh else "STALE"},
+                )
 
-            result = await func(*args, **kwargs)
-            cache.set(cache_key, result, ttl)
-            return result
+            # shield: si un cliente se desconecta no cancela el cálculo compartido
+            body = await asyncio.shield(_single_flight(cache_key, compute))
+            return Response(
+                content=body, media_type="application/json", headers={"X-Cache": "MISS"}
+            )
 
         return wrapper
 
@@ -1,15 +1,71 @@
 # app/infrastructure/api/main.py
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
-from app.infrastructure.api.routers import market, universe, items
+from app.infrastructure.api.routers import market, universe, items, live, alerts
 from app.infrastructure.api.web.routes.views import router as web_router
+from app.infrastructure.adapters.esi_transport import (
+    get_shared_transport,
+    close_shared_transport,
+)
+from app.infrastructure.adapters.esi_topology import get_topology_service
+from app.infrastructure.api.cache import InMemoryCache, run_cache_sweeper
+from app.infrastructure.config.settings import Settings
+from app.infrastructure.market.alert_engine import get_alert_engine
+from app.infrastructure.market.live_hub import get_live_hub
+from app.infrastructure.market.snapshot_engine import get_snapshot_engine
+from app.infrastructure.serialization.json_codec import FastJSONResponse, codec_stats
 from fastapi.templating import Jinja2Templates
 
+settings = Settings()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Un único pool de conexiones ESI para todo el proceso
+    app.state.esi_transport = await get_shared_transport().start()
+
+    # Índice sistema -> constelación -> región desde el almacén estático
+    app.state.topology = get_topology_service()
+
+    # Snapshots del libro de órdenes refrescados en segundo plano
+    app.state.snapshot_engine = get_snapshot_engine()
+    if settings.SNAPSHOT_ENABLED:
+        await app.state.snapshot_engine.start()
+
+    # Difusión por WebSocket: una suscripción al feed de cambios para todos los clientes
+    app.state.live_hub = get_live_hub()
+    await app.state.live_hub.start()
+
+    # Reglas de alerta evaluadas con cada snapshot (solo los tipos que cambian)
+    app.state.alert_engine = get_alert_engine() if settings.ALERTS_ENABLED else None
+    if app.state.alert_engine is not None:
+        await app.state.alert_engine.start()
+
+    # Barrido periódico de entradas caducadas de la caché de endpoints
+    cache_sweeper = asyncio.create_task(
+        run_cache_sweeper(float(settings.CACHE_SWEEP_INTERVAL))
+    )
+
+    yield
+
+    cache_sweeper.cancel()
+    if app.state.alert_engine is not None:
+        await app.state.alert_engine.stop()
+    await app.state.live_hub.stop()
+    await app.state.snapshot_engine.stop()
+    await close_shared_transport()
+
+
 app = FastAPI(
     title="SNT Trade Tool",
     version="0.1.0",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
+    lifespan=lifespan,
+    # orjson si está instalado (extra "fast"), json de la stdlib si no
+    default_response_class=FastJSONResponse,
 )
 
 
@@ -29,6 +85,8 @@ app.include_router(web_router)
 app.include_router(market.router)
 app.include_router(universe.router)
 app.include_router(items.router)
+app.include_router(live.router)
+app.include_router(alerts.router)
 
 
 # @app.get("/")
@@ -38,7 +96,14 @@ app.include_router(items.router)
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "cache": InMemoryCache().stats(),
+        "json": codec_stats.as_dict(),
+        "live_clients": get_live_hub().client_count,
+        "snapshots": get_snapshot_engine().stats(),
+        "alerts": get_alert_engine().stats() if settings.ALERTS_ENABLED else None,
+    }
 
 
 if __name__ == "__main__":
@@ -0,0 +1,102 @@
+# app/infrastructure/api/redis_cache.py
+import struct
+import time
+import zlib
+from typing import Optional, Tuple
+
+from app.infrastructure.api.cache import SharedCacheBackend
+from app.infrastructure.config.settings import Settings
+
+# Cabecera de cada registro: fresco hasta / servible hasta (epoch, float64)
+RECORD_HEADER = struct.Struct("!dd")
+# A partir de este tamaño el payload se comprime
+COMPRESS_THRESHOLD = 1024
+RAW, COMPRESSED = b"b", b"Z"
+
+
+def encode_record(value: bytes, fresh_until: float, stale_until: float) -> bytes:
+    """Cabecera + payload en bytes tal cual (el JSON ya codificado)."""
+    if not isinstance(value, (bytes, bytearray)):
+        raise TypeError(f"RedisCache solo guarda bytes, no {type(value).__name__}")
+    payload = bytes(value)
+    flag = RAW
+    if len(payload) > COMPRESS_THRESHOLD:
+        payload, flag = zlib.compress(payload, 1), COMPRESSED
+    return RECORD_HEADER.pack(fresh_until, stale_until) + flag + payload
+
+
+def decode_record(data: bytes) -> Tuple[bytes, float, float]:
+    fresh_until, stale_until = RECORD_HEADER.unpack_from(data)
+    flag = data[RECORD_HEADER.size : RECORD_HEADER.size + 1]
+    payload = data[RECORD_HEADER.size + 1 :]
+    if flag == COMPRESSED:
+        payload = zlib.decompress(payload)
+    elif flag != RAW:
+        raise ValueError(f"Formato de registro desconocido: {flag!r}")
+    return payload, fresh_until, stale_until
+
+
+class RedisCache(SharedCacheBackend):
+    """
+    Caché compartida en Redis para varios workers o contenedores.
+    Las claves van con prefijo de namespace y los valores (el JSON ya
+    codificado de cache_response) se guardan como bytes, comprimidos con
+    zlib si son grandes, con TTL nativo de Redis. Nunca se deserializan
+    objetos Python desde Redis.
+    Acepta cualquier cliente compatible con redis.asyncio (p. ej. fakeredis).
+    """
+
+    def __init__(self, client=None, namespace: Optional[str] = None):
+        settings = Settings()
+        if client is None:
+            from redis import asyncio as redis_asyncio
+
+            client = redis_asyncio.from_url(settings.REDIS_URL)
+        self.client = client
+        self.namespace = namespace or settings.CACHE_NAMESPACE
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def get_record(self, key: str) -> Optional[Tuple[bytes, float, float]]:
+        """Devuelve (valor, fresco_hasta, servible_hasta) o None."""
+        try:
+            data = await self.client.get(self._key(key))
+        except Exception as e:
+            print(f"⚠️ Redis no disponible: {e}")
+            return None
+        if data is None:
+            return None
+        try:
+            return decode_record(data)
+        except (ValueError, struct.error, zlib.error) as e:
+            # Registro corrupto o de un formato anterior: se trata como fallo
+            print(f"⚠️ Registro de caché no válido en '{key}': {e}")
+            return None
+
+    async def get_entry(self, key: str) -> Optional[Tuple[bytes, bool]]:
+        record = await self.get_record(key)
+        if record is None:
+            return None
+        value, fresh_until, _ = record
+        return value, time.time() < fresh_until
+
+    async def set(self, key: str, value: bytes, ttl: float, stale_ttl: float = 0):
+        fresh_until = time.time() + ttl
+        stale_until = fresh_until + stale_ttl
+        record = encode_record(value, fresh_until, stale_until)
+        try:
+            await self.client.set(
+                self._key(key),
+                record,
+                px=max(int((ttl + stale_ttl) * 1000), 1),
+            )
+        except Exception as e:
+            print(f"⚠️ Redis no disponible: {e}")
+
+    async def clear(self):
+        try:
+            async for key in self.client.scan_iter(match=f"{self.namespace}:*"):
+                await self.client.delete(key)
+        except Exception as e:
+            print(f"⚠️ Redis no disponible: {e}")
@@ -0,0 +1,81 @@
+# app/infrastructure/api/routers/alerts.py
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from app.core.domain.entities.alert import AlertRule
+from app.infrastructure.api.routers.dependencies import get_enabled_alert_engine
+from app.infrastructure.market.alert_engine import AlertEngine
+
+router = APIRouter(prefix="/alerts", tags=["Alerts"])
+
+
+class AlertRuleRequest(BaseModel):
+    """Regla nueva: item, región (o estación) y al menos una condición"""
+    type_id: int
+    region_id: int
+    name: str = ""
+    location_id: Optional[int] = None
+    min_spread_percentage: Optional[float] = None
+    max_best_sell: Optional[float] = None
+    min_volume: Optional[int] = None
+    high_confidence: bool = False
+    enabled: bool = True
+
+
+def _rule_dict(rule: AlertRule) -> dict:
+    return {**rule.__dict__, "description": rule.describe()}
+
+
+@router.get("/rules")
+async def list_rules(engine: AlertEngine = Depends(get_enabled_alert_engine)):
+    """Reglas de alerta configuradas"""
+    return [_rule_dict(rule) for rule in await engine.rules()]
+
+
+@router.post("/rules", status_code=201)
+async def create_rule(
+    request: AlertRuleRequest,
+    engine: AlertEngine = Depends(get_enabled_alert_engine)
+):
+    """Crea una regla; se evalúa al momento contra el snapshot actual"""
+    try:
+        rule = await engine.add_rule(AlertRule(**request.model_dump()))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return _rule_dict(rule)
+
+
+@router.patch("/rules/{rule_id}")
+async def set_rule_enabled(
+    rule_id: int,
+    enabled: bool,
+    engine: AlertEngine = Depends(get_enabled_alert_engine)
+):
+    """Activa o pausa una regla"""
+    rule = await engine.set_enabled(rule_id, enabled)
+    if rule is None:
+        raise HTTPException(status_code=404, detail=f"Alert rule '{rule_id}' not found")
+    return _rule_dict(rule)
+
+
+@router.delete("/rules/{rule_id}", status_code=204)
+async def delete_rule(rule_id: int, engine: AlertEngine = Depends(get_enabled_alert_engine)):
+    """Borra una regla (su histórico de disparos se conserva)"""
+    if not await engine.delete_rule(rule_id):
+        raise HTTPException(status_code=404, detail=f"Alert rule '{rule_id}' not found")
+
+
+@router.get("/events")
+async def list_events(
+    limit: int = Query(100, ge=1, le=1000),
+    rule_id: Optional[int] = None,
+    engine: AlertEngine = Depends(get_enabled_alert_engine)
+):
+    """Histórico de disparos, los más recientes primero"""
+    return await engine.events(limit=limit, rule_id=rule_id)
+
+
+@router.get("/status")
+async def alert_status(engine: AlertEngine = Depends(get_enabled_alert_engine)):
+    """Reglas compiladas y coste de la última evaluación"""
+    return engine.stats()
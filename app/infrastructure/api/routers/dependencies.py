@@ -1,12 +1,61 @@
+from fastapi import Depends, HTTPException
 from app.infrastructure.adapters.esi_adapter_market import ESIClientMarket
 from app.infrastructure.adapters.esi_adapter_universe import ESIClientUniverse
+from app.infrastructure.adapters.esi_name_resolver import ESINameResolver
+from app.infrastructure.adapters.esi_transport import ESITransport, get_shared_transport
+from app.infrastructure.config.settings import Settings
+from app.infrastructure.market.alert_engine import AlertEngine, get_alert_engine
+from app.infrastructure.market.snapshot_engine import (
+    MarketSnapshotEngine,
+    get_snapshot_engine,
+)
+from app.core.domain.services.arbitrage_scanner import ArbitrageScanner
 from app.core.domain.services.market_analyzer import MarketAnalyzer
 
-def get_market_analyzer() -> MarketAnalyzer:
+
+def get_esi_transport() -> ESITransport:
+    """Dependency provider for the shared ESI transport"""
+    return get_shared_transport()
+
+
+def get_name_resolver(
+    transport: ESITransport = Depends(get_esi_transport),
+) -> ESINameResolver:
+    """Dependency provider for the cached ESI name resolver"""
+    return ESINameResolver(transport)
+
+
+def get_market_client(
+    transport: ESITransport = Depends(get_esi_transport),
+    snapshots: MarketSnapshotEngine = Depends(get_snapshot_engine),
+) -> ESIClientMarket:
+    """Dependency provider for ESIClientMarket backed by the snapshots"""
+    return ESIClientMarket(transport, snapshots=snapshots)
+
+
+def get_market_analyzer(
+    transport: ESITransport = Depends(get_esi_transport),
+    market_client: ESIClientMarket = Depends(get_market_client),
+) -> MarketAnalyzer:
     """Dependency provider for MarketAnalyzer"""
     from app.infrastructure.adapters.esi_adapter_items import ESIClientItems
-    
-    market_client = ESIClientMarket()
-    universe_client = ESIClientUniverse()
-    items_client = ESIClientItems()
-    return MarketAnalyzer(market_client, universe_client, items_client)
+
+    universe_client = ESIClientUniverse(transport)
+    items_client = ESIClientItems(transport)
+    name_resolver = ESINameResolver(transport)
+    return MarketAnalyzer(market_client, universe_client, items_client, name_resolver)
+
+
+def get_arbitrage_scanner(
+    transport: ESITransport = Depends(get_esi_transport),
+    market_client: ESIClientMarket = Depends(get_market_client),
+) -> ArbitrageScanner:
+    """Dependency provider for ArbitrageScanner"""
+    return ArbitrageScanner(market_client, ESINameResolver(transport))
+
+
+def get_enabled_alert_engine() -> AlertEngine:
+    """Dependency provider for the alert engine; 503 when ALERTS_ENABLED is off"""
+    if not Settings().ALERTS_ENABLED:
+        raise HTTPException(status_code=503, detail="Alerts are disabled (ALERTS_ENABLED=false)")
+    return get_alert_engine()
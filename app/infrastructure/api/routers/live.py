@@ -0,0 +1,94 @@
+# app/infrastructure/api/routers/live.py
+import asyncio
+import contextlib
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+from fastapi.websockets import WebSocketState
+from app.infrastructure.market.live_hub import LiveClient, LiveMarketHub, get_live_hub
+from app.infrastructure.serialization import json_codec
+
+router = APIRouter(prefix="/ws", tags=["Live"])
+
+
+async def _send_loop(websocket: WebSocket, client: LiveClient):
+    """Vacía la cola del cliente; los mensajes llegan ya serializados desde el hub"""
+    while True:
+        await websocket.send_text(await client.next_message())
+
+
+def _reply(client: LiveClient, message: dict):
+    client.send(json_codec.dumps(message).decode("utf-8"))
+
+
+async def _handle_message(hub: LiveMarketHub, client: LiveClient, message: dict):
+    if not isinstance(message, dict):
+        raise ValueError("Message must be a JSON object")
+    action = message.get("action")
+    if action == "subscribe":
+        view = await hub.subscribe(
+            client,
+            region_id=int(message["region_id"]),
+            type_ids=message.get("type_ids") or (),
+            min_volume=int(message.get("min_volume", 100)),
+            min_spread=float(message.get("min_spread", 5.0)),
+            limit=int(message.get("limit", 20)),
+            sort=message.get("sort", "spread_percentage"),
+        )
+        _reply(client, {"type": "subscribed", "view": view._asdict()})
+    elif action == "unsubscribe":
+        hub.unsubscribe(client, int(message["region_id"]))
+        _reply(client, {"type": "unsubscribed", "region_id": int(message["region_id"])})
+    elif action == "alerts":
+        client.alerts = bool(message.get("enabled", True))
+        _reply(client, {"type": "alerts_subscribed", "enabled": client.alerts})
+    else:
+        raise ValueError("action must be 'subscribe', 'unsubscribe' or 'alerts'")
+
+
+async def _receive_loop(websocket: WebSocket, hub: LiveMarketHub, client: LiveClient):
+    """Atiende los mensajes del cliente hasta que se desconecta"""
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            try:
+                await _handle_message(hub, client, json_codec.loads(raw))
+            except (ValueError, KeyError, TypeError) as e:
+                _reply(client, {"type": "error", "detail": str(e)})
+            except Exception as e:
+                _reply(client, {"type": "error", "detail": f"ESI Error: {str(e)}"})
+    except WebSocketDisconnect:
+        pass
+
+
+@router.websocket("/market")
+async def market_live(websocket: WebSocket, hub: LiveMarketHub = Depends(get_live_hub)):
+    """
+    Cambios de mercado en vivo. El cliente envía
+    {"action": "subscribe", "region_id": 10000002, "type_ids": [34],
+    "min_volume": 100, "min_spread": 5, "limit": 20, "sort": "spread_percentage"}
+    y recibe mensajes "opportunities" (top del ranking, solo cuando cambia)
+    y "spreads" (tipos seguidos que cambiaron) con cada snapshot nuevo.
+    Con {"action": "alerts"} recibe además los disparos de alertas.
+    """
+    await websocket.accept()
+    client = hub.connect()
+    sender = asyncio.create_task(_send_loop(websocket, client))
+    receiver = asyncio.create_task(_receive_loop(websocket, hub, client))
+    try:
+        # La conexión acaba en cuanto termina cualquiera de los dos lados
+        await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        hub.disconnect(client)
+        for task in (sender, receiver):
+            task.cancel()
+        try:
+            # Se esperan ambas: ninguna queda huérfana ni con su excepción sin recoger
+            await asyncio.wait({sender, receiver})
+        finally:
+            for task in (sender, receiver):
+                error = task.exception() if task.done() and not task.cancelled() else None
+                if error is not None and not isinstance(error, WebSocketDisconnect):
+                    print(f"⚠️ Error en la conexión en vivo: {error}")
+            # Si falló el envío el cliente sigue conectado: se le cierra la conexión
+            if websocket.client_state == WebSocketState.CONNECTED:
+                with contextlib.suppress(RuntimeError, WebSocketDisconnect):
+                    await websocket.close()
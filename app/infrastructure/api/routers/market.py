@@ -1,10 +1,17 @@
 # app/infrastructure/api/routes/market.py
+import asyncio
+from typing import AsyncIterator, List, Optional
 from app.core.domain.value_objects.regions import RegionValueObject
 from app.core.domain.value_objects.systems import SystemValueObject
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
+from app.core.domain.entities.market_order import MarketOrder
+from app.core.domain.entities.opportunity_ranking import SORT_KEYS
 from app.infrastructure.adapters.esi_adapter_market import ESIClientMarket
 from app.infrastructure.api.cache import cache_response
+from app.infrastructure.market.snapshot_engine import get_snapshot_engine
 from app.infrastructure.config.settings import Settings
+from app.infrastructure.serialization import json_codec
 
 router = APIRouter(prefix="/market", tags=["Market"])
 settings = Settings()
@@ -12,7 +19,7 @@ settings = Settings()
 
 # Endpoint para obtener las órdenes del mercado de una región específica
 @router.get("/orders")
-@cache_response(ttl=settings.ENDPOINT_MIN_AGE)
+@cache_response(ttl=settings.ENDPOINT_MIN_AGE, stale_ttl=settings.ENDPOINT_STALE_AGE)
 async def get_market_orders(
     region_id: int = RegionValueObject.THE_FORGE.value, type_id: int = 44992, order_type: str = "all"
 ):
@@ -21,7 +28,7 @@ async def get_market_orders(
     order_type: 'buy', 'sell', 'all'
     """
     try:
-        client = ESIClientMarket()
+        client = ESIClientMarket(snapshots=get_snapshot_engine())
         orders = await client.get_market_orders(region_id, type_id, order_type)
 
         return orders
@@ -31,7 +38,7 @@ async def get_market_orders(
 
 # Endpoint para obtener las ordenes del mercado de un SISTEMA especifico
 @router.get("/orders_by_system")
-@cache_response(ttl=settings.ENDPOINT_MIN_AGE)
+@cache_response(ttl=settings.ENDPOINT_MIN_AGE, stale_ttl=settings.ENDPOINT_STALE_AGE)
 async def get_market_orders_by_system(
     system_id: int = SystemValueObject.JITA.value, type_id: int = None, order_type: str = "all"
 ):
@@ -40,7 +47,7 @@ async def get_market_orders_by_system(
     order_type: 'buy', 'sell', 'all'
     """
     try:
-        client = ESIClientMarket()
+        client = ESIClientMarket(snapshots=get_snapshot_engine())
         orders = await client.get_market_orders_by_system(
             system_id, type_id, order_type
         )
@@ -50,21 +57,122 @@ async def get_market_orders_by_system(
         raise HTTPException(status_code=500, detail=f"ESI Error: {str(e)}")
 
 
-from app.infrastructure.api.routers.dependencies import get_market_analyzer
+def _encode_ndjson(orders: List[MarketOrder]) -> bytes:
+    return json_codec.dumps_lines(orders)
+
+
+async def _stream_orders(batches: AsyncIterator[List[MarketOrder]]) -> StreamingResponse:
+    """
+    Devuelve las órdenes como NDJSON lote a lote según llegan de ESI.
+    El primer lote se pide antes de responder para poder devolver un error HTTP.
+    """
+    try:
+        first = await batches.__anext__()
+    except StopAsyncIteration:
+        first = []
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"ESI Error: {str(e)}")
+
+    async def body() -> AsyncIterator[bytes]:
+        yield _encode_ndjson(first)
+        try:
+            async for orders in batches:
+                yield _encode_ndjson(orders)
+        except Exception as e:
+            # Con la respuesta ya empezada solo se puede cortar el stream
+            print(f"⚠️ Stream de órdenes interrumpido: {e}")
+        finally:
+            await batches.aclose()
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+
+async def _filter_system(
+    batches: AsyncIterator[List[MarketOrder]], system_id: Optional[int]
+) -> AsyncIterator[List[MarketOrder]]:
+    async for orders in batches:
+        if system_id is not None:
+            orders = [order for order in orders if order.system_id == system_id]
+        yield orders
+
+
+def _validate_side(side: str):
+    if side not in ("all", "buy", "sell"):
+        raise HTTPException(status_code=422, detail="side must be 'all', 'buy' or 'sell'")
+
+
+def _validate_sort(sort: str):
+    if sort not in SORT_KEYS:
+        raise HTTPException(
+            status_code=422, detail=f"sort must be one of {', '.join(SORT_KEYS)}"
+        )
+
+
+# Stream NDJSON de las órdenes de una región
+@router.get("/orders/stream")
+async def stream_market_orders(
+    region_id: int = RegionValueObject.THE_FORGE.value,
+    type_id: int = None,
+    system_id: int = None,
+    side: str = "all",
+):
+    """
+    Stream NDJSON (una orden por línea) de las órdenes de una región.
+    Filtros opcionales: type_id, system_id y side ('buy', 'sell', 'all').
+    """
+    _validate_side(side)
+    client = ESIClientMarket(snapshots=get_snapshot_engine())
+    return await _stream_orders(
+        _filter_system(client.iter_market_orders(region_id, type_id, side), system_id)
+    )
+
+
+# Stream NDJSON de las órdenes de un SISTEMA
+@router.get("/orders_by_system/stream")
+async def stream_market_orders_by_system(
+    system_id: int = SystemValueObject.JITA.value,
+    type_id: int = None,
+    side: str = "all",
+):
+    """Stream NDJSON de las órdenes de un sistema, filtradas página a página."""
+    from app.infrastructure.adapters.esi_topology import get_topology_service
+
+    _validate_side(side)
+    if await get_topology_service().region_of_system(system_id) is None:
+        raise HTTPException(status_code=404, detail=f"System '{system_id}' not found")
+    client = ESIClientMarket(snapshots=get_snapshot_engine())
+    return await _stream_orders(
+        client.iter_market_orders_by_system(system_id, type_id, side)
+    )
+
+
+from app.infrastructure.api.routers.dependencies import (
+    get_arbitrage_scanner,
+    get_market_analyzer,
+)
 
 @router.get("/analyze/{region_id}")
-@cache_response(ttl=settings.ENDPOINT_MIN_AGE)
+@cache_response(ttl=settings.ENDPOINT_MIN_AGE, stale_ttl=settings.ENDPOINT_STALE_AGE)
 async def analyze_market(
     region_id: int,
     min_volume: int = 100,
     min_spread: float = 5.0,
     limit: int = 20,
-    analysis_limit: int = 100,
+    offset: int = 0,
+    system_id: int = None,
+    location_id: int = None,
+    sort: str = "spread_percentage",
+    cursor: str = None,
     analyzer = Depends(get_market_analyzer)
 ):
     """
     Analiza el mercado de una región en busca de oportunidades de profit.
+    Se evalúan todos los items de la región; limit/offset (o el cursor
+    next_cursor de la respuesta anterior) paginan el ranking.
+    sort: spread_percentage, spread, total_profit o confidence.
+    Con system_id o location_id se limita a ese sistema o estación.
     """
+    _validate_sort(sort)
     try:
         from app.core.domain.value_objects.market_values import Volume
         
@@ -73,8 +181,111 @@ async def analyze_market(
             min_volume=Volume(min_volume),
             min_spread=min_spread,
             limit=limit,
-            analysis_limit=analysis_limit
+            offset=offset,
+            system_id=system_id,
+            location_id=location_id,
+            sort=sort,
+            cursor=cursor
         )
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis Error: {str(e)}")
+
+
+@router.get("/analyze_hubs")
+@cache_response(ttl=settings.ENDPOINT_MIN_AGE, stale_ttl=settings.ENDPOINT_STALE_AGE)
+async def analyze_hubs(
+    min_volume: int = 100,
+    min_spread: float = 5.0,
+    limit: int = 20,
+    sort: str = "spread_percentage",
+    analyzer = Depends(get_market_analyzer)
+):
+    """Station trading en la estación principal de cada hub (Jita 4-4, Amarr VIII, ...)"""
+    from app.core.domain.value_objects.market_values import Volume
+
+    _validate_sort(sort)
+    try:
+        return await analyzer.analyze_hubs(
+            min_volume=Volume(min_volume),
+            min_spread=min_spread,
+            limit=limit,
+            sort=sort
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Analysis Error: {str(e)}")
+
+
+@router.get("/spread/{region_id}/{type_id}")
+async def market_spread(
+    region_id: int,
+    type_id: int,
+    analyzer = Depends(get_market_analyzer)
+):
+    """Mejor compra/venta y volúmenes actuales de un item en una región"""
+    spread = await analyzer.get_market_spread(region_id, type_id)
+    if spread is None:
+        raise HTTPException(
+            status_code=404, detail=f"No buy and sell orders for type '{type_id}'"
+        )
+    return {
+        "region_id": region_id,
+        "type_id": type_id,
+        "best_buy": spread.best_buy,
+        "best_sell": spread.best_sell,
+        "buy_volume": spread.buy_volume,
+        "sell_volume": spread.sell_volume,
+        "spread": spread.absolute_spread,
+        "spread_percentage": spread.percentage_spread,
+    }
+
+
+@router.get("/history/{region_id}/{type_id}")
+async def market_history(region_id: int, type_id: int, hours: float = 24.0):
+    """OHLC por hora de mejor compra/venta y volumen de un item en las últimas `hours` horas"""
+    import time
+    from app.infrastructure.persistence.market_history_store import get_history_store
+
+    rows = await asyncio.to_thread(
+        get_history_store().ohlc, region_id, type_id, time.time() - hours * 3600
+    )
+    return {"region_id": region_id, "type_id": type_id, "hours": hours, "ohlc": rows}
+
+
+@router.get("/arbitrage")
+@cache_response(ttl=settings.ENDPOINT_MIN_AGE, stale_ttl=settings.ENDPOINT_STALE_AGE)
+async def scan_arbitrage(
+    hubs: str = None,
+    min_margin: float = 5.0,
+    min_volume: int = 1,
+    tax_rate: float = 0.0,
+    limit: int = 20,
+    offset: int = 0,
+    scanner = Depends(get_arbitrage_scanner)
+):
+    """
+    Oportunidades de transporte entre hubs: comprar a la venta en un hub y
+    vender a la compra en otro. hubs es una lista de system_id separados por
+    comas (por defecto Jita, Amarr, Dodixie, Rens y Hek).
+    """
+    from app.core.domain.value_objects.market_values import Volume
+
+    selected = None
+    if hubs:
+        try:
+            selected = [SystemValueObject(int(h)) for h in hubs.split(",") if h.strip()]
+        except ValueError:
+            raise HTTPException(status_code=422, detail=f"Unknown hub in '{hubs}'")
+    try:
+        return await scanner.scan(
+            hubs=selected,
+            min_margin=min_margin,
+            min_volume=Volume(min_volume),
+            tax_rate=tax_rate,
+            limit=limit,
+            offset=offset
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Arbitrage Error: {str(e)}")
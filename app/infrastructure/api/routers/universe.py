@@ -1,6 +1,8 @@
 # app/infrastructure/api/routes/universe.py
+from dataclasses import asdict
 from fastapi import APIRouter, HTTPException
 from app.infrastructure.adapters.esi_adapter_universe import ESIClientUniverse
+from app.infrastructure.adapters.esi_topology import get_topology_service
 
 from app.infrastructure.api.cache import cache_response
 from app.infrastructure.config.settings import Settings
@@ -146,6 +148,31 @@ async def get_system_by_name(name: str):
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 
+# TOPOLOGÍA
+@router.get("/system/{system_id}/location")
+async def get_system_location(system_id: int):
+    """Constelación, región y seguridad de un sistema desde el índice de topología"""
+    try:
+        node = await get_topology_service().get_system(system_id)
+        if node is None:
+            raise HTTPException(status_code=404, detail=f"System '{system_id}' not found")
+        return asdict(node)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+@router.get("/region/{region_id}/systems")
+async def get_region_systems(region_id: int):
+    """Sistemas indexados de una región (ver make warmup para el índice completo)"""
+    systems = get_topology_service().topology.systems_in_region(region_id)
+    return {
+        "total_systems": len(systems),
+        "systems": [asdict(node) for node in systems],
+    }
+
+
 # CORPORACIONES NPC
 @router.get("/npcs")
 @cache_response(ttl=settings.ENDPOINT_MAX_AGE)
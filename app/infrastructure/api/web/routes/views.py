@@ -2,14 +2,26 @@
 from fastapi import APIRouter, Request, Depends
 from fastapi.responses import HTMLResponse
 from app.infrastructure.config.templates import templates
-from app.infrastructure.api.routers.dependencies import get_market_analyzer
+from app.infrastructure.api.routers.dependencies import (
+    get_enabled_alert_engine,
+    get_market_analyzer,
+    get_name_resolver,
+)
 from app.core.domain.value_objects.market_values import Volume
 from app.core.domain.value_objects.regions import RegionValueObject
 from app.core.domain.constants.universe import Region
+from app.core.domain.entities.opportunity_ranking import SORT_KEYS
 import math
 
 router = APIRouter(tags=["Web"])
 
+SORT_CHOICES = [
+    ("spread_percentage", "Spread %"),
+    ("spread", "Ganancia por unidad"),
+    ("total_profit", "Ganancia potencial"),
+    ("confidence", "Confianza"),
+]
+
 @router.get("/", response_class=HTMLResponse)
 async def dashboard(request: Request):
     """Dashboard principal"""
@@ -26,7 +38,7 @@ async def market_view(
     min_spread: float = 2.0,
     page: int = 1,
     limit: int = 100,
-    analysis_limit: int = 250,
+    sort: str = "spread_percentage",
     submitted: bool = False,
     analyzer = Depends(get_market_analyzer) 
 ):
@@ -38,6 +50,10 @@ async def market_view(
     if region_id is None:
         region_id = Region.THE_FORGE.value
     
+    if sort not in SORT_KEYS:
+        sort = "spread_percentage"
+
+    # El ranking se calcula una vez por snapshot: cambiar de página solo lo recorre
     if submitted and region_id:
         offset = (page - 1) * limit
         results = await analyzer.analyze_region_profit(
@@ -46,7 +62,7 @@ async def market_view(
             min_spread=min_spread,
             limit=limit,
             offset=offset,
-            analysis_limit=analysis_limit,
+            sort=sort,
         )
         total_pages = math.ceil(results.total_opportunities / limit)
 
@@ -60,16 +76,36 @@ async def market_view(
         "min_spread": min_spread,
         "page": page,
         "limit": limit,
-        "analysis_limit": analysis_limit,
+        "sort": sort,
+        "sort_choices": SORT_CHOICES,
         "total_pages": total_pages
     })
 
 @router.get("/alerts", response_class=HTMLResponse)
-async def alerts_view(request: Request):
-    """Vista de alertas"""
+async def alerts_view(
+    request: Request,
+    engine = Depends(get_enabled_alert_engine),
+    name_resolver = Depends(get_name_resolver)
+):
+    """Vista de alertas: reglas, últimos disparos y alta de reglas nuevas"""
+    rules = await engine.rules()
+    events = await engine.events(limit=50)
+    ids = {rule.type_id for rule in rules} | {event.type_id for event in events}
+    ids |= {rule.region_id for rule in rules} | {event.region_id for event in events}
+    try:
+        names = await name_resolver.resolve(list(ids)) if ids else {}
+    except Exception as e:
+        print(f"⚠️ Error resolviendo nombres: {e}")
+        names = {}
+
     return templates.TemplateResponse("alerts.html", {
         "request": request,
-        "title": "Alertas - SNT Trade Tool"
+        "title": "Alertas - SNT Trade Tool",
+        "rules": rules,
+        "events": events,
+        "names": names,
+        "regions": RegionValueObject.get_choices(),
+        "stats": engine.stats(),
     })
 
 @router.get("/regions", response_class=HTMLResponse)
@@ -0,0 +1,80 @@
+// app/infrastructure/api/web/static/js/alerts.js
+function formPayload(form) {
+    const data = new FormData(form);
+    const number = name => (data.get(name) === '' || data.get(name) === null ? null : Number(data.get(name)));
+    return {
+        name: data.get('name') || '',
+        region_id: Number(data.get('region_id')),
+        type_id: Number(data.get('type_id')),
+        location_id: number('location_id'),
+        min_spread_percentage: number('min_spread_percentage'),
+        max_best_sell: number('max_best_sell'),
+        min_volume: number('min_volume'),
+        high_confidence: data.get('high_confidence') === 'on',
+    };
+}
+
+function prependAlertRows(tbody, alerts) {
+    const isk = value => (value === null ? '—' : `${value.toLocaleString('en-US', { minimumFractionDigits: 2, maximumFractionDigits: 2 })} ISK`);
+    alerts.forEach(alert => {
+        const row = document.createElement('tr');
+        const cells = [
+            alert.triggered_at.replace('T', ' ').slice(0, 16),
+            alert.rule_name || alert.rule_id,
+            alert.type_id,
+            isk(alert.best_buy),
+            isk(alert.best_sell),
+            alert.spread_percentage === null ? '—' : `${alert.spread_percentage.toFixed(1)}%`,
+            `${alert.buy_volume} / ${alert.sell_volume}`,
+        ];
+        cells.forEach(value => {
+            const cell = document.createElement('td');
+            cell.textContent = value;
+            row.appendChild(cell);
+        });
+        tbody.insertBefore(row, tbody.firstChild);
+    });
+}
+
+document.addEventListener('DOMContentLoaded', function () {
+    const form = document.getElementById('alert-form');
+    const formError = document.getElementById('alert-form-error');
+
+    form.addEventListener('submit', async event => {
+        event.preventDefault();
+        const response = await fetch('/alerts/rules', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(formPayload(form)),
+        });
+        if (response.ok) {
+            window.location.reload();
+        } else {
+            const error = await response.json();
+            formError.textContent = `⚠️ ${typeof error.detail === 'string' ? error.detail : 'Datos no válidos'}`;
+        }
+    });
+
+    document.querySelectorAll('.alert-toggle').forEach(toggle => {
+        toggle.addEventListener('change', () => {
+            fetch(`/alerts/rules/${toggle.dataset.ruleId}?enabled=${toggle.checked}`, { method: 'PATCH' });
+        });
+    });
+
+    document.querySelectorAll('.alert-delete').forEach(button => {
+        button.addEventListener('click', async () => {
+            const response = await fetch(`/alerts/rules/${button.dataset.ruleId}`, { method: 'DELETE' });
+            if (response.ok) button.closest('tr').remove();
+        });
+    });
+
+    // Disparos nuevos en vivo por el WebSocket de mercado
+    const status = document.getElementById('alerts-live-status');
+    const tbody = document.querySelector('#alert-events-table tbody');
+    const live = new LiveMarket();
+    live.on('status', state => {
+        status.textContent = state === 'connected' ? '● En vivo' : '○ Reconectando...';
+    });
+    live.on('alerts', message => prependAlertRows(tbody, message.alerts));
+    live.watchAlerts();
+});
@@ -0,0 +1,130 @@
+// app/infrastructure/api/web/static/js/live-market.js
+class LiveMarket {
+    constructor(path = '/ws/market') {
+        const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+        this.url = `${protocol}//${window.location.host}${path}`;
+        this.subscriptions = new Map(); // region_id -> mensaje de suscripción
+        this.alerts = false;
+        this.handlers = {};
+        this.retryDelay = 1000;
+        this.closed = false;
+        this.connect();
+    }
+
+    connect() {
+        this.socket = new WebSocket(this.url);
+
+        this.socket.addEventListener('open', () => {
+            this.retryDelay = 1000;
+            this.emit('status', 'connected');
+            // Tras una reconexión se renuevan las suscripciones
+            this.subscriptions.forEach(message => this.socket.send(JSON.stringify(message)));
+            if (this.alerts) this.socket.send(JSON.stringify({ action: 'alerts' }));
+        });
+
+        this.socket.addEventListener('message', event => {
+            const message = JSON.parse(event.data);
+            this.emit(message.type, message);
+        });
+
+        this.socket.addEventListener('close', () => {
+            this.emit('status', 'disconnected');
+            if (this.closed) return;
+            setTimeout(() => this.connect(), this.retryDelay);
+            this.retryDelay = Math.min(this.retryDelay * 2, 30000);
+        });
+    }
+
+    on(type, handler) {
+        (this.handlers[type] = this.handlers[type] || []).push(handler);
+        return this;
+    }
+
+    emit(type, payload) {
+        (this.handlers[type] || []).forEach(handler => handler(payload));
+    }
+
+    subscribe(params) {
+        const message = { action: 'subscribe', ...params };
+        this.subscriptions.set(params.region_id, message);
+        if (this.socket.readyState === WebSocket.OPEN) {
+            this.socket.send(JSON.stringify(message));
+        }
+    }
+
+    unsubscribe(regionId) {
+        this.subscriptions.delete(regionId);
+        if (this.socket.readyState === WebSocket.OPEN) {
+            this.socket.send(JSON.stringify({ action: 'unsubscribe', region_id: regionId }));
+        }
+    }
+
+    watchAlerts() {
+        this.alerts = true;
+        if (this.socket.readyState === WebSocket.OPEN) {
+            this.socket.send(JSON.stringify({ action: 'alerts' }));
+        }
+    }
+
+    close() {
+        this.closed = true;
+        this.socket.close();
+    }
+}
+
+// Tabla de oportunidades de /market actualizada en vivo
+function renderOpportunityRows(tbody, opportunities) {
+    const isk = value => `${Math.round(value).toLocaleString('en-US')} ISK`;
+    tbody.innerHTML = '';
+    opportunities.forEach(opp => {
+        const roi = opp.spread / opp.best_buy_price * 100;
+        const row = document.createElement('tr');
+        row.innerHTML = `
+            <td></td>
+            <td data-sort="${opp.best_buy_price}">${isk(opp.best_buy_price)}</td>
+            <td data-sort="${opp.best_sell_price}">${isk(opp.best_sell_price)}</td>
+            <td data-sort="${opp.spread}">${isk(opp.spread)}</td>
+            <td data-sort="${roi}"><strong>${roi.toFixed(1)}%</strong></td>
+            <td data-sort="${opp.buy_volume}">${opp.buy_volume} / ${opp.sell_volume}</td>
+            <td data-sort="${opp.confidence}">${Math.round(opp.confidence * 100)}%</td>`;
+        row.cells[0].textContent = opp.name;
+        tbody.appendChild(row);
+    });
+}
+
+document.addEventListener('DOMContentLoaded', function () {
+    const toggle = document.getElementById('live-toggle');
+    const table = document.getElementById('opportunities-table');
+    if (!toggle || !table) return;
+
+    const status = document.getElementById('live-status');
+    const total = document.getElementById('live-total');
+    let live = null;
+
+    toggle.addEventListener('change', () => {
+        if (!toggle.checked) {
+            if (live) live.close();
+            live = null;
+            status.textContent = '';
+            return;
+        }
+        live = new LiveMarket();
+        live.on('status', state => {
+            status.textContent = state === 'connected' ? '● En vivo' : '○ Reconectando...';
+        });
+        live.on('opportunities', message => {
+            renderOpportunityRows(table.querySelector('tbody'), message.result.opportunities);
+            if (total) total.textContent = message.result.total_opportunities;
+        });
+        live.on('error', message => {
+            status.textContent = `⚠️ ${message.detail}`;
+        });
+        live.subscribe({
+            region_id: Number(toggle.dataset.regionId),
+            min_volume: Number(toggle.dataset.minVolume),
+            min_spread: Number(toggle.dataset.minSpread),
+            limit: Number(toggle.dataset.limit),
+            sort: toggle.dataset.sort,
+        });
+    });
+});
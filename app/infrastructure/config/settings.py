@@ -21,7 +21,61 @@ class Settings(BaseSettings):
         "API_DESCRIPTION", "API para obtener información del universo de EVE Online"
     )
     DOMAIN: str = os.getenv("DOMAIN", "http://localhost:8000")
+    # Trazas por refresco (paginación, snapshots, alertas); las métricas están en /health
+    DEBUG_LOGS: bool = os.getenv("DEBUG_LOGS", False)
     ENDPOINT_MAX_AGE: int = os.getenv("ENDPOINT_MAX_AGE", 86400)
     ENDPOINT_MIN_AGE: int = os.getenv("ENDPOINT_MIN_AGE", 60)
     ESI_URL: str = os.getenv("ESI_URL", "https://esi.evetech.net")
     ESI_VERSION: str = os.getenv("ESI_VERSION", "v6")
+
+    # Pool de conexiones compartido hacia ESI
+    ESI_HTTP2: bool = os.getenv("ESI_HTTP2", True)
+    ESI_MAX_CONNECTIONS: int = os.getenv("ESI_MAX_CONNECTIONS", 100)
+    ESI_MAX_KEEPALIVE_CONNECTIONS: int = os.getenv("ESI_MAX_KEEPALIVE_CONNECTIONS", 20)
+    ESI_KEEPALIVE_EXPIRY: float = os.getenv("ESI_KEEPALIVE_EXPIRY", 30.0)
+    ESI_TIMEOUT: float = os.getenv("ESI_TIMEOUT", 30.0)
+    ESI_USER_AGENT: str = os.getenv("ESI_USER_AGENT", "snt-trade-tool/0.1.0")
+
+    # Paginación concurrente y control del error limit de ESI
+    ESI_MAX_CONCURRENT_PAGES: int = os.getenv("ESI_MAX_CONCURRENT_PAGES", 20)
+    ESI_MAX_RETRIES: int = os.getenv("ESI_MAX_RETRIES", 3)
+    ESI_RETRY_BACKOFF: float = os.getenv("ESI_RETRY_BACKOFF", 0.5)
+    ESI_ERROR_LIMIT_THRESHOLD: int = os.getenv("ESI_ERROR_LIMIT_THRESHOLD", 10)
+    ESI_PAGE_CACHE_MAX_PAGES: int = os.getenv("ESI_PAGE_CACHE_MAX_PAGES", 5000)
+    # Techo de memoria de las páginas cacheadas (bytes del cuerpo de ESI)
+    ESI_PAGE_CACHE_MAX_BYTES: int = os.getenv("ESI_PAGE_CACHE_MAX_BYTES", 268435456)
+
+    # Snapshots del libro de órdenes mantenidos en segundo plano
+    SNAPSHOT_ENABLED: bool = os.getenv("SNAPSHOT_ENABLED", True)
+    # IDs separados por comas; vacío = ninguna región, "all" = todas las conocidas
+    SNAPSHOT_REGIONS: str = os.getenv("SNAPSHOT_REGIONS", "")
+    SNAPSHOT_MIN_INTERVAL: float = os.getenv("SNAPSHOT_MIN_INTERVAL", 60.0)
+    SNAPSHOT_RETRY_INTERVAL: float = os.getenv("SNAPSHOT_RETRY_INTERVAL", 30.0)
+
+    # TTL de la caché de nombres (/universe/names/): cambian solo con parches
+    NAME_CACHE_TTL: int = os.getenv("NAME_CACHE_TTL", 604800)
+
+    # Almacén local de datos estáticos (regiones, sistemas, tipos...)
+    STATIC_DATA_PATH: str = os.getenv("STATIC_DATA_PATH", "./data/static_data.sqlite3")
+
+    # Histórico de snapshots (deltas comprimidos) y rollups OHLC por hora
+    HISTORY_ENABLED: bool = os.getenv("HISTORY_ENABLED", True)
+    HISTORY_PATH: str = os.getenv("HISTORY_PATH", "./data/market_history.sqlite3")
+    HISTORY_KEYFRAME_INTERVAL: int = os.getenv("HISTORY_KEYFRAME_INTERVAL", 288)
+    HISTORY_RETENTION_DAYS: float = os.getenv("HISTORY_RETENTION_DAYS", 30.0)
+
+    # Alertas evaluadas con cada snapshot; reglas e histórico en SQLite
+    ALERTS_ENABLED: bool = os.getenv("ALERTS_ENABLED", True)
+    ALERTS_PATH: str = os.getenv("ALERTS_PATH", "./data/alerts.sqlite3")
+    ALERTS_RETENTION_DAYS: float = os.getenv("ALERTS_RETENTION_DAYS", 90.0)
+
+    # Caché de respuestas de endpoints (LRU + TTL acotada)
+    CACHE_MAX_ENTRIES: int = os.getenv("CACHE_MAX_ENTRIES", 1024)
+    CACHE_MAX_BYTES: int = os.getenv("CACHE_MAX_BYTES", 256 * 1024 * 1024)
+    CACHE_SWEEP_INTERVAL: float = os.getenv("CACHE_SWEEP_INTERVAL", 60.0)
+    ENDPOINT_STALE_AGE: int = os.getenv("ENDPOINT_STALE_AGE", 300)
+
+    # Backend de caché: "memory" (por proceso) o "redis" (L1 local + L2 compartido)
+    CACHE_BACKEND: Literal["memory", "redis"] = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_NAMESPACE: str = os.getenv("CACHE_NAMESPACE", "snt-tt")
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
@@ -0,0 +1,179 @@
+# app/infrastructure/market/alert_engine.py
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from app.core.domain.entities.alert import AlertEvent, AlertRule
+from app.core.domain.services.alert_index import AlertIndex
+from app.infrastructure.config.settings import Settings
+from app.infrastructure.market.change_feed import (
+    MarketChangeEvent,
+    MarketChangeFeed,
+    get_change_feed,
+)
+from app.infrastructure.market.live_hub import get_live_hub
+from app.infrastructure.market.snapshot_engine import (
+    MarketSnapshotEngine,
+    get_snapshot_engine,
+)
+from app.infrastructure.persistence.alert_store import AlertStore, get_alert_store
+
+
+class AlertEngine:
+    """
+    Evalúa las reglas de alerta con cada snapshot nuevo. Las reglas activas
+    se compilan en un AlertIndex por región y type_id, así que cada refresco
+    solo mira las reglas de los tipos tocados por el diff. Los disparos se
+    guardan en el AlertStore y se notifican (WebSocket) al momento.
+    """
+
+    def __init__(
+        self,
+        store: AlertStore,
+        snapshots: Optional[MarketSnapshotEngine] = None,
+        feed: Optional[MarketChangeFeed] = None,
+        notify: Optional[Callable[[List[AlertEvent]], None]] = None,
+    ):
+        self.store = store
+        self.snapshots = snapshots
+        self.feed = feed or get_change_feed()
+        self.notify = notify
+        self.index = AlertIndex(store.rules(enabled_only=True))
+        self._task: Optional[asyncio.Task] = None
+        # Una recompilación a la vez: la última siempre ve todas las escrituras
+        self._reload_lock = asyncio.Lock()
+        self.evaluations = 0
+        self.fired = 0
+        self.last_seconds = 0.0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self.debug = bool(Settings().DEBUG_LOGS)
+
+    # -- ciclo de vida -----------------------------------------------------
+
+    async def start(self):
+        if self._task is None:
+            await asyncio.to_thread(self.store.prune_events)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _run(self):
+        subscription = self.feed.subscribe()
+        async for event in subscription:
+            try:
+                await self.dispatch(event)
+            except Exception as e:
+                self.errors += 1
+                self.last_error = str(e)
+                if self.debug:
+                    print(f"⚠️ Error evaluando alertas de región {event.region_id}: {e}")
+
+    # -- reglas ------------------------------------------------------------
+
+    async def reload(self):
+        """Recompila el índice conservando qué reglas ya se estaban cumpliendo"""
+        async with self._reload_lock:
+            # Lectura de SQLite y compilación fuera del event loop
+            index = await asyncio.to_thread(
+                lambda: AlertIndex(self.store.rules(enabled_only=True))
+            )
+            # El estado se copia ya en el event loop: ninguna evaluación se cuela en medio
+            index.carry_state(self.index)
+            self.index = index
+
+    async def rules(self) -> List[AlertRule]:
+        return await asyncio.to_thread(self.store.rules)
+
+    async def events(self, limit: int = 100, rule_id: Optional[int] = None) -> List[AlertEvent]:
+        return await asyncio.to_thread(self.store.events, limit=limit, rule_id=rule_id)
+
+    async def add_rule(self, rule: AlertRule) -> AlertRule:
+        rule.validate()
+        saved = await asyncio.to_thread(self.store.add_rule, rule)
+        await self.reload()
+        # Sin esperar al próximo cambio del tipo: se evalúa contra el snapshot actual
+        await self._evaluate_rule(saved)
+        return saved
+
+    async def set_enabled(self, rule_id: int, enabled: bool) -> Optional[AlertRule]:
+        if not await asyncio.to_thread(self.store.set_enabled, rule_id, enabled):
+            return None
+        await self.reload()
+        rule = await asyncio.to_thread(self.store.get_rule, rule_id)
+        if enabled:
+            await self._evaluate_rule(rule)
+        return rule
+
+    async def delete_rule(self, rule_id: int) -> bool:
+        deleted = await asyncio.to_thread(self.store.delete_rule, rule_id)
+        if deleted:
+            await self.reload()
+        return deleted
+
+    async def _evaluate_rule(self, rule: AlertRule):
+        snapshot = self.snapshots.get_snapshot(rule.region_id) if self.snapshots else None
+        if snapshot is None:
+            return
+        await self._fire(
+            self.index.evaluate(
+                rule.region_id, snapshot.book, np.array([rule.type_id]), snapshot.fetched_at
+            )
+        )
+
+    # -- evaluación --------------------------------------------------------
+
+    async def dispatch(self, event: MarketChangeEvent):
+        """Evalúa las reglas de los tipos que cambiaron en el snapshot"""
+        started = time.perf_counter()
+        fired = self.index.evaluate(
+            event.region_id,
+            event.snapshot.book,
+            event.touched_type_ids,
+            event.snapshot.fetched_at,
+        )
+        self.last_seconds = time.perf_counter() - started
+        self.evaluations += 1
+        await self._fire(fired)
+
+    async def _fire(self, events: List[AlertEvent]):
+        if not events:
+            return
+        saved = await asyncio.to_thread(self.store.record_events, events)
+        self.fired += len(saved)
+        if self.debug:
+            print(f"🔔 {len(saved)} alertas disparadas")
+        if self.notify is not None:
+            self.notify(saved)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rules": len(self.index),
+            "regions": self.index.region_ids,
+            "evaluations": self.evaluations,
+            "fired": self.fired,
+            "last_evaluation_ms": round(self.last_seconds * 1000, 3),
+            "errors": self.errors,
+            "last_error": self.last_error,
+        }
+
+
+_shared_engine: Optional[AlertEngine] = None
+
+
+def get_alert_engine() -> AlertEngine:
+    """Devuelve el motor de alertas compartido por todo el proceso."""
+    global _shared_engine
+    if _shared_engine is None:
+        _shared_engine = AlertEngine(
+            get_alert_store(),
+            snapshots=get_snapshot_engine(),
+            notify=get_live_hub().publish_alerts,
+        )
+    return _shared_engine
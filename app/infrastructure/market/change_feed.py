@@ -0,0 +1,103 @@
+# app/infrastructure/market/change_feed.py
+import asyncio
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterable, Optional, Set
+
+import numpy as np
+
+from app.core.domain.entities.market_snapshot import RegionSnapshot
+from app.core.domain.entities.order_book_diff import OrderBookDiff
+
+# Eventos pendientes por suscriptor antes de descartar los más antiguos
+SUBSCRIBER_QUEUE_SIZE = 64
+
+
+@dataclass(frozen=True)
+class MarketChangeEvent:
+    """Cambios de una región entre el snapshot anterior y el nuevo"""
+    region_id: int
+    version: int
+    snapshot: RegionSnapshot
+    diff: OrderBookDiff
+    touched_type_ids: np.ndarray
+
+
+class MarketSubscription:
+    """Cola de eventos de un suscriptor, filtrada opcionalmente por región"""
+
+    def __init__(self, feed: "MarketChangeFeed", region_ids: Optional[Iterable[int]] = None):
+        self.feed = feed
+        self.region_ids: Optional[Set[int]] = set(region_ids) if region_ids else None
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.dropped = 0
+
+    def wants(self, event: MarketChangeEvent) -> bool:
+        return self.region_ids is None or event.region_id in self.region_ids
+
+    def put(self, event: MarketChangeEvent):
+        # Un suscriptor lento no frena al resto: pierde los eventos más antiguos
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self) -> MarketChangeEvent:
+        return await self.queue.get()
+
+    def close(self):
+        self.feed.unsubscribe(self)
+
+    def __aiter__(self) -> AsyncIterator[MarketChangeEvent]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[MarketChangeEvent]:
+        try:
+            while True:
+                yield await self.queue.get()
+        finally:
+            self.close()
+
+    def __enter__(self) -> "MarketSubscription":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class MarketChangeFeed:
+    """
+    Pub/sub en proceso de los cambios de mercado: el motor de snapshots
+    publica un MarketChangeEvent por refresco y cada suscriptor los recibe
+    en su propia cola (async for event in feed.subscribe(...)).
+    """
+
+    def __init__(self):
+        self._subscribers: Set[MarketSubscription] = set()
+
+    def subscribe(self, region_ids: Optional[Iterable[int]] = None) -> MarketSubscription:
+        subscription = MarketSubscription(self, region_ids)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: MarketSubscription):
+        self._subscribers.discard(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event: MarketChangeEvent):
+        for subscription in list(self._subscribers):
+            if subscription.wants(event):
+                subscription.put(event)
+
+
+_shared_feed: Optional[MarketChangeFeed] = None
+
+
+def get_change_feed() -> MarketChangeFeed:
+    """Devuelve el feed de cambios compartido por todo el proceso."""
+    global _shared_feed
+    if _shared_feed is None:
+        _shared_feed = MarketChangeFeed()
+    return _shared_feed
@@ -0,0 +1,309 @@
+# app/infrastructure/market/live_hub.py
+import asyncio
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+from app.core.domain.entities.alert import AlertEvent
+from app.core.domain.entities.market_analysis import MarketAnalysisResult
+from app.core.domain.entities.opportunity_ranking import SORT_KEYS
+from app.core.domain.services.market_analyzer import MarketAnalyzer
+from app.core.domain.value_objects.market_values import MarketSpread, Volume
+from app.infrastructure.adapters.esi_adapter_items import ESIClientItems
+from app.infrastructure.adapters.esi_adapter_market import ESIClientMarket
+from app.infrastructure.adapters.esi_adapter_universe import ESIClientUniverse
+from app.infrastructure.adapters.esi_name_resolver import ESINameResolver
+from app.infrastructure.adapters.esi_transport import get_shared_transport
+from app.infrastructure.market.change_feed import (
+    MarketChangeEvent,
+    MarketChangeFeed,
+    get_change_feed,
+)
+from app.infrastructure.market.snapshot_engine import get_snapshot_engine
+from app.infrastructure.serialization import json_codec
+
+# Mensajes pendientes por cliente antes de descartar los más antiguos
+CLIENT_QUEUE_SIZE = 32
+# Límites por suscripción para que un cliente no encarezca el fan-out
+MAX_LIMIT = 100
+MAX_TYPE_IDS = 500
+
+
+class LiveView(NamedTuple):
+    """Parámetros de ranking de una suscripción; clientes iguales comparten cálculo"""
+    region_id: int
+    min_volume: int
+    min_spread: float
+    limit: int
+    sort: str
+
+
+class LiveClient:
+    """Conexión de un cliente: sus suscripciones y su cola de mensajes salientes"""
+
+    def __init__(self):
+        self.views: Dict[int, LiveView] = {}  # region_id -> vista
+        self.type_ids: Dict[int, Set[int]] = {}  # region_id -> tipos con spread en vivo
+        self.alerts = False  # Recibe los disparos del motor de alertas
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self.dropped = 0
+
+    def send(self, message: str):
+        # Un cliente lento pierde los mensajes más antiguos, no frena al resto
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    async def next_message(self) -> str:
+        return await self.queue.get()
+
+
+def _encode(message: Dict[str, Any]) -> str:
+    return json_codec.dumps(message).decode("utf-8")
+
+
+def _spread_entry(type_id: int, spread: MarketSpread) -> Dict[str, Any]:
+    return {
+        "type_id": type_id,
+        "best_buy": spread.best_buy,
+        "best_sell": spread.best_sell,
+        "buy_volume": spread.buy_volume,
+        "sell_volume": spread.sell_volume,
+        "spread_percentage": spread.percentage_spread,
+    }
+
+
+def _signature(result: MarketAnalysisResult) -> Tuple:
+    """Lo que ve el cliente de un ranking; si no cambia, no se reenvía"""
+    return (result.total_opportunities,) + tuple(
+        (opp.type_id, opp.best_buy_price, opp.best_sell_price, opp.buy_volume, opp.sell_volume)
+        for opp in result.opportunities
+    )
+
+
+class LiveMarketHub:
+    """
+    Difusión en vivo de los cambios de mercado a clientes WebSocket. El hub
+    se suscribe una sola vez al feed de cambios; por cada snapshot nuevo
+    calcula el ranking una vez por vista distinta (región y filtros) y los
+    spreads de los tipos tocados que alguien sigue, serializa cada mensaje
+    una vez y lo reparte a las colas de todos los clientes interesados.
+    """
+
+    def __init__(
+        self,
+        analyzer: MarketAnalyzer,
+        feed: Optional[MarketChangeFeed] = None,
+        snapshots=None,
+    ):
+        self.analyzer = analyzer
+        self.feed = feed or get_change_feed()
+        # Solo las regiones con snapshot en memoria reciben cambios en vivo
+        self.snapshots = snapshots or get_snapshot_engine()
+        self._clients: Set[LiveClient] = set()
+        # Última firma enviada por vista, para notificar solo cambios
+        self._signatures: Dict[LiveView, Tuple] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    # -- ciclo de vida -----------------------------------------------------
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _run(self):
+        subscription = self.feed.subscribe()
+        async for event in subscription:
+            try:
+                await self.dispatch(event)
+            except Exception as e:
+                print(f"⚠️ Error difundiendo cambios de región {event.region_id}: {e}")
+
+    # -- clientes ----------------------------------------------------------
+
+    @property
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    def connect(self) -> LiveClient:
+        client = LiveClient()
+        self._clients.add(client)
+        return client
+
+    def disconnect(self, client: LiveClient):
+        self._clients.discard(client)
+        self._forget_unused_views()
+
+    async def subscribe(
+        self,
+        client: LiveClient,
+        region_id: int,
+        type_ids: Iterable[int] = (),
+        min_volume: int = 100,
+        min_spread: float = 5.0,
+        limit: int = 20,
+        sort: str = "spread_percentage",
+    ) -> LiveView:
+        """
+        Sustituye la suscripción del cliente a la región y le envía el estado
+        actual, para que no tenga que esperar al siguiente snapshot.
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"sort must be one of {', '.join(SORT_KEYS)}")
+        if not 1 <= limit <= MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+        type_ids = {int(type_id) for type_id in type_ids}
+        if len(type_ids) > MAX_TYPE_IDS:
+            raise ValueError(f"At most {MAX_TYPE_IDS} type_ids per region")
+        region_id = int(region_id)
+        # Sin snapshots de la región el feed nunca publicaría nada para ella
+        if region_id not in self.snapshots.region_ids:
+            raise ValueError(f"Region {region_id} is not in SNAPSHOT_REGIONS")
+        if self.snapshots.get_snapshot(region_id) is None:
+            raise ValueError(f"Region {region_id} has no snapshot yet, retry later")
+
+        view = LiveView(region_id, int(min_volume), float(min_spread), int(limit), sort)
+        client.views[view.region_id] = view
+        client.type_ids[view.region_id] = type_ids
+        self._forget_unused_views()
+
+        result = await self._analyze(view)
+        client.send(_encode(self._opportunities_message(view, result, version=None)))
+        spreads = await self._spreads(view.region_id, sorted(type_ids))
+        if spreads:
+            client.send(_encode(self._spreads_message(view.region_id, None, spreads)))
+        return view
+
+    def unsubscribe(self, client: LiveClient, region_id: int):
+        client.views.pop(region_id, None)
+        client.type_ids.pop(region_id, None)
+        self._forget_unused_views()
+
+    def _forget_unused_views(self):
+        active = {view for client in self._clients for view in client.views.values()}
+        for view in list(self._signatures):
+            if view not in active:
+                del self._signatures[view]
+
+    # -- difusión ----------------------------------------------------------
+
+    def publish_alerts(self, events: List[AlertEvent]):
+        """Reparte los disparos de alertas a los clientes que los siguen"""
+        clients = [client for client in self._clients if client.alerts]
+        if not clients or not events:
+            return
+        message = _encode({"type": "alerts", "alerts": events})
+        for client in clients:
+            client.send(message)
+
+    async def dispatch(self, event: MarketChangeEvent):
+        """Reparte a los clientes de la región lo que cambió en el snapshot"""
+        region_id = event.region_id
+        clients = [client for client in self._clients if region_id in client.views]
+        if not clients:
+            return
+
+        # Oportunidades: un análisis y una serialización por vista distinta
+        by_view: Dict[LiveView, List[LiveClient]] = {}
+        for client in clients:
+            by_view.setdefault(client.views[region_id], []).append(client)
+        views = list(by_view)
+        results = await asyncio.gather(*(self._analyze(view) for view in views))
+        for view, result in zip(views, results):
+            signature = _signature(result)
+            if self._signatures.get(view) == signature:
+                continue
+            self._signatures[view] = signature
+            message = _encode(self._opportunities_message(view, result, event.version))
+            for client in by_view[view]:
+                client.send(message)
+
+        # Spreads: solo los tipos tocados que algún cliente sigue, calculados una vez
+        followed = set().union(*(client.type_ids[region_id] for client in clients))
+        if not followed:
+            return
+        touched = np.intersect1d(
+            event.touched_type_ids, np.fromiter(followed, dtype=np.int64, count=len(followed))
+        )
+        spreads = await self._spreads(region_id, touched.tolist())
+        if not spreads:
+            return
+        # Los clientes que siguen todos los tipos tocados comparten mensaje
+        full_message = None
+        for client in clients:
+            wanted = [entry for entry in spreads if entry["type_id"] in client.type_ids[region_id]]
+            if not wanted:
+                continue
+            if len(wanted) == len(spreads):
+                full_message = full_message or _encode(
+                    self._spreads_message(region_id, event.version, spreads)
+                )
+                client.send(full_message)
+            else:
+                client.send(_encode(self._spreads_message(region_id, event.version, wanted)))
+
+    async def _analyze(self, view: LiveView) -> MarketAnalysisResult:
+        # El ranking se cachea por libro: las vistas nuevas sobre el mismo snapshot lo reutilizan
+        return await self.analyzer.analyze_region_profit(
+            region_id=view.region_id,
+            min_volume=Volume(view.min_volume),
+            min_spread=view.min_spread,
+            limit=view.limit,
+            sort=view.sort,
+        )
+
+    async def _spreads(self, region_id: int, type_ids: List[int]) -> List[Dict[str, Any]]:
+        entries = []
+        for type_id in type_ids:
+            spread = await self.analyzer.get_market_spread(region_id, type_id)
+            if spread is not None:
+                entries.append(_spread_entry(type_id, spread))
+        return entries
+
+    @staticmethod
+    def _opportunities_message(
+        view: LiveView, result: MarketAnalysisResult, version: Optional[int]
+    ) -> Dict[str, Any]:
+        return {
+            "type": "opportunities",
+            "region_id": view.region_id,
+            "version": version,
+            "view": view._asdict(),
+            "result": result,
+        }
+
+    @staticmethod
+    def _spreads_message(
+        region_id: int, version: Optional[int], spreads: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        return {
+            "type": "spreads",
+            "region_id": region_id,
+            "version": version,
+            "spreads": spreads,
+        }
+
+
+_shared_hub: Optional[LiveMarketHub] = None
+
+
+def get_live_hub() -> LiveMarketHub:
+    """Devuelve el hub en vivo compartido por todo el proceso."""
+    global _shared_hub
+    if _shared_hub is None:
+        transport = get_shared_transport()
+        analyzer = MarketAnalyzer(
+            ESIClientMarket(transport, snapshots=get_snapshot_engine()),
+            ESIClientUniverse(transport),
+            ESIClientItems(transport),
+            ESINameResolver(transport),
+        )
+        _shared_hub = LiveMarketHub(analyzer, snapshots=get_snapshot_engine())
+    return _shared_hub
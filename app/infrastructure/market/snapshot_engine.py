@@ -0,0 +1,232 @@
+# app/infrastructure/market/snapshot_engine.py
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.domain.entities.market_snapshot import RegionSnapshot
+from app.core.domain.entities.market_order import MarketOrder
+from app.core.domain.entities.order_book import OrderBook, unique_orders
+from app.core.domain.entities.order_book_diff import OrderBookDiff
+from app.core.domain.value_objects.regions import RegionValueObject
+from app.infrastructure.adapters.esi_adapter_market import ESIClientMarket
+from app.infrastructure.config.settings import Settings
+from app.infrastructure.market.change_feed import (
+    MarketChangeEvent,
+    MarketChangeFeed,
+    get_change_feed,
+)
+from app.infrastructure.persistence.market_history_store import (
+    FULL,
+    MarketHistoryStore,
+    get_history_store,
+)
+
+
+def configured_regions(settings: Settings) -> List[int]:
+    """
+    Regiones a mantener en memoria según SNAPSHOT_REGIONS (IDs separados por
+    comas). Vacío significa ninguna: sin configurarlo no se lanza ningún crawl;
+    "all" mantiene todas las regiones conocidas.
+    """
+    value = str(settings.SNAPSHOT_REGIONS or "").strip()
+    if value.lower() == "all":
+        return [region.value for region in RegionValueObject]
+    return [int(r) for r in value.split(",") if r.strip()]
+
+
+class MarketSnapshotEngine:
+    """
+    Mantiene en memoria un snapshot del libro de órdenes por región.
+    Cada región se refresca en su propia tarea siguiendo el Expires de ESI
+    y el snapshot nuevo sustituye al anterior de forma atómica, así los
+    lectores nunca ven un libro a medio descargar.
+    """
+
+    def __init__(
+        self,
+        market_client: Optional[ESIClientMarket] = None,
+        region_ids: Optional[Iterable[int]] = None,
+        settings: Optional[Settings] = None,
+        history: Optional[MarketHistoryStore] = None,
+        change_feed: Optional[MarketChangeFeed] = None,
+    ):
+        self.settings = settings or Settings()
+        # Histórico opcional: cada snapshot se guarda como delta del anterior
+        self.history = history
+        # Los cambios entre snapshots se publican aquí
+        self.change_feed = change_feed or get_change_feed()
+        self.market_client = market_client or ESIClientMarket()
+        self.region_ids = list(region_ids or configured_regions(self.settings))
+        self.min_interval = float(self.settings.SNAPSHOT_MIN_INTERVAL)
+        self.retry_interval = float(self.settings.SNAPSHOT_RETRY_INTERVAL)
+        self._snapshots: Dict[int, RegionSnapshot] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self.debug = bool(self.settings.DEBUG_LOGS)
+        # Métricas por región expuestas en /health en lugar de trazas por refresco
+        self._region_stats: Dict[int, Dict[str, Any]] = {}
+
+    def get_snapshot(self, region_id: int) -> Optional[RegionSnapshot]:
+        """Último snapshot completo de la región, o None si aún no hay."""
+        return self._snapshots.get(region_id)
+
+    def _stats_for(self, region_id: int) -> Dict[str, Any]:
+        if region_id not in self._region_stats:
+            self._region_stats[region_id] = {
+                "version": 0, "errors": 0, "last_error": None,
+                "history_errors": 0, "last_history_error": None,
+            }
+        return self._region_stats[region_id]
+
+    def stats(self) -> Dict[int, Dict[str, Any]]:
+        """Último refresco y errores acumulados por región"""
+        return {region_id: dict(stats) for region_id, stats in self._region_stats.items()}
+
+    @property
+    def snapshots(self) -> Dict[int, RegionSnapshot]:
+        return dict(self._snapshots)
+
+    async def refresh_region(self, region_id: int) -> RegionSnapshot:
+        """Descarga el libro de la región y publica un snapshot nuevo."""
+        orders, stats = await self.market_client.fetch_market_orders(region_id)
+        previous = self._snapshots.get(region_id)
+        # Columnar, índices y diff una sola vez por snapshot, fuera del event loop
+        orders, book, diff = await asyncio.to_thread(self._build_book, orders, previous)
+        snapshot = RegionSnapshot(
+            region_id=region_id,
+            version=previous.version + 1 if previous else 1,
+            orders=orders,
+            book=book,
+            fetched_at=datetime.now(),
+            expires_at=datetime.fromtimestamp(stats.expires_at or time.time()),
+            diff=diff,
+        )
+        # Sustitución atómica: una sola asignación en el event loop
+        self._snapshots[region_id] = snapshot
+        region_stats = self._stats_for(region_id)
+        region_stats.update(
+            version=snapshot.version,
+            orders=snapshot.total_orders,
+            pages=stats.total_pages,
+            avg_page_latency_ms=round(stats.avg_latency * 1000, 1),
+            fetched_at=snapshot.fetched_at.isoformat(),
+            changes=diff.summary() if diff is not None else None,
+        )
+        if self.debug:
+            changes = f", cambios {diff.summary()}" if diff is not None else ""
+            print(
+                f"📸 Snapshot región {region_id} v{snapshot.version}: "
+                f"{snapshot.total_orders} órdenes{changes}"
+            )
+        if diff is not None and not diff.is_empty:
+            self.change_feed.publish(
+                MarketChangeEvent(
+                    region_id=region_id,
+                    version=snapshot.version,
+                    snapshot=snapshot,
+                    diff=diff,
+                    touched_type_ids=diff.touched_type_ids(book),
+                )
+            )
+        if self.history is not None:
+            await self._record_history(snapshot, previous)
+        return snapshot
+
+    @staticmethod
+    def _build_book(
+        orders: List[MarketOrder], previous: Optional[RegionSnapshot]
+    ) -> Tuple[List[MarketOrder], OrderBook, Optional[OrderBookDiff]]:
+        # Las posiciones de los índices del libro sirven para la lista de órdenes
+        orders = unique_orders(orders)
+        book = OrderBook.from_orders(orders).build_indexes()
+        if previous is None:
+            # Agregado por tipo completo una vez; los siguientes se derivan con cada diff
+            book.spreads_by_type()
+            return orders, book, None
+        diff = OrderBookDiff.compute(previous.book, book)
+        # Si el agregado por tipo anterior ya existe, solo se rehacen los tipos tocados
+        if previous.book.cached_spreads is not None:
+            book.update_spreads(
+                previous.book.cached_spreads, diff.touched_type_ids(book)
+            )
+        else:
+            book.spreads_by_type()
+        return orders, book, diff
+
+    async def _record_history(
+        self, snapshot: RegionSnapshot, previous: Optional[RegionSnapshot]
+    ):
+        """Guarda el snapshot en el histórico sin bloquear el event loop."""
+
+        def record():
+            # Si el anterior no llegó a guardarse, el almacén lo escribe completo
+            kind = self.history.record_snapshot(
+                snapshot.region_id,
+                snapshot.book,
+                snapshot.fetched_at.timestamp(),
+                previous.book if previous else None,
+                snapshot.diff,
+            )
+            # La retención se aplica con cada snapshot completo
+            if kind == FULL:
+                self.history.prune()
+
+        try:
+            await asyncio.to_thread(record)
+        except Exception as e:
+            region_stats = self._stats_for(snapshot.region_id)
+            region_stats["history_errors"] += 1
+            region_stats["last_history_error"] = str(e)
+            if self.debug:
+                print(f"⚠️ Error guardando histórico de región {snapshot.region_id}: {e}")
+
+    def _next_refresh_delay(self, snapshot: RegionSnapshot) -> float:
+        remaining = (snapshot.expires_at - datetime.now()).total_seconds()
+        return max(remaining + 1, self.min_interval)
+
+    async def _run_region(self, region_id: int):
+        while True:
+            try:
+                snapshot = await self.refresh_region(region_id)
+                delay = self._next_refresh_delay(snapshot)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                region_stats = self._stats_for(region_id)
+                region_stats["errors"] += 1
+                region_stats["last_error"] = str(e)
+                if self.debug:
+                    print(f"⚠️ Error refrescando snapshot de región {region_id}: {e}")
+                delay = self.retry_interval
+            await asyncio.sleep(delay)
+
+    async def start(self):
+        """Lanza una tarea de refresco por región configurada."""
+        for region_id in self.region_ids:
+            if region_id not in self._tasks:
+                self._tasks[region_id] = asyncio.create_task(
+                    self._run_region(region_id)
+                )
+
+    async def stop(self):
+        """Cancela las tareas de refresco en curso."""
+        tasks = list(self._tasks.values())
+        self._tasks = {}
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+_shared_engine: Optional[MarketSnapshotEngine] = None
+
+
+def get_snapshot_engine() -> MarketSnapshotEngine:
+    """Devuelve el motor de snapshots compartido por todo el proceso."""
+    global _shared_engine
+    if _shared_engine is None:
+        settings = Settings()
+        _shared_engine = MarketSnapshotEngine(
+            settings=settings,
+            history=get_history_store() if settings.HISTORY_ENABLED else None,
+        )
+    return _shared_engine
@@ -0,0 +1,204 @@
+# app/infrastructure/persistence/alert_store.py
+import sqlite3
+import threading
+import time
+from dataclasses import replace
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from app.core.domain.entities.alert import AlertEvent, AlertRule
+from app.infrastructure.config.settings import Settings
+
+RULE_FIELDS = (
+    "rule_id", "name", "type_id", "region_id", "location_id",
+    "min_spread_percentage", "max_best_sell", "min_volume",
+    "high_confidence", "enabled", "created_at",
+)
+
+EVENT_FIELDS = (
+    "event_id", "rule_id", "rule_name", "type_id", "region_id", "location_id",
+    "triggered_at", "best_buy", "best_sell", "spread_percentage",
+    "buy_volume", "sell_volume", "confidence",
+)
+
+
+def _rule_from_row(row: tuple) -> AlertRule:
+    values = dict(zip(RULE_FIELDS, row))
+    values["high_confidence"] = bool(values["high_confidence"])
+    values["enabled"] = bool(values["enabled"])
+    values["created_at"] = datetime.fromtimestamp(values["created_at"])
+    return AlertRule(**values)
+
+
+def _event_from_row(row: tuple) -> AlertEvent:
+    values = dict(zip(EVENT_FIELDS, row))
+    values["triggered_at"] = datetime.fromtimestamp(values["triggered_at"])
+    return AlertEvent(**values)
+
+
+class AlertStore:
+    """
+    Reglas de alerta y su histórico de disparos en un SQLite local
+    (./data/alerts.sqlite3 por defecto, configurable con ALERTS_PATH).
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or Settings().ALERTS_PATH
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS alert_rules (
+                rule_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                type_id INTEGER NOT NULL,
+                region_id INTEGER NOT NULL,
+                location_id INTEGER,
+                min_spread_percentage REAL,
+                max_best_sell REAL,
+                min_volume INTEGER,
+                high_confidence INTEGER NOT NULL,
+                enabled INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS alert_events (
+                event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                rule_id INTEGER NOT NULL,
+                rule_name TEXT NOT NULL,
+                type_id INTEGER NOT NULL,
+                region_id INTEGER NOT NULL,
+                location_id INTEGER,
+                triggered_at REAL NOT NULL,
+                best_buy REAL,
+                best_sell REAL,
+                spread_percentage REAL,
+                buy_volume INTEGER NOT NULL,
+                sell_volume INTEGER NOT NULL,
+                confidence REAL
+            );
+
+            CREATE INDEX IF NOT EXISTS alert_events_by_time ON alert_events (triggered_at);
+            CREATE INDEX IF NOT EXISTS alert_events_by_rule ON alert_events (rule_id, triggered_at);
+            """
+        )
+        self.conn.commit()
+        # Las escrituras del histórico llegan desde hilos (asyncio.to_thread)
+        self._lock = threading.Lock()
+
+    # -- reglas ------------------------------------------------------------
+
+    def add_rule(self, rule: AlertRule) -> AlertRule:
+        created_at = rule.created_at or datetime.now()
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                f"INSERT INTO alert_rules ({', '.join(RULE_FIELDS[1:])}) "
+                f"VALUES ({', '.join('?' * (len(RULE_FIELDS) - 1))})",
+                (
+                    rule.name, rule.type_id, rule.region_id, rule.location_id,
+                    rule.min_spread_percentage, rule.max_best_sell, rule.min_volume,
+                    int(rule.high_confidence), int(rule.enabled), created_at.timestamp(),
+                ),
+            )
+        return replace(rule, rule_id=cursor.lastrowid, created_at=created_at)
+
+    def get_rule(self, rule_id: int) -> Optional[AlertRule]:
+        with self._lock:
+            row = self.conn.execute(
+                f"SELECT {', '.join(RULE_FIELDS)} FROM alert_rules WHERE rule_id = ?",
+                (rule_id,),
+            ).fetchone()
+        return _rule_from_row(row) if row else None
+
+    def rules(self, enabled_only: bool = False) -> List[AlertRule]:
+        query = f"SELECT {', '.join(RULE_FIELDS)} FROM alert_rules"
+        if enabled_only:
+            query += " WHERE enabled = 1"
+        with self._lock:
+            rows = self.conn.execute(query + " ORDER BY rule_id").fetchall()
+        return [_rule_from_row(row) for row in rows]
+
+    def set_enabled(self, rule_id: int, enabled: bool) -> bool:
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "UPDATE alert_rules SET enabled = ? WHERE rule_id = ?",
+                (int(enabled), rule_id),
+            )
+        return cursor.rowcount > 0
+
+    def delete_rule(self, rule_id: int) -> bool:
+        """Borra la regla; su histórico de disparos se conserva"""
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "DELETE FROM alert_rules WHERE rule_id = ?", (rule_id,)
+            )
+        return cursor.rowcount > 0
+
+    # -- histórico ---------------------------------------------------------
+
+    def record_events(self, events: List[AlertEvent]) -> List[AlertEvent]:
+        """Guarda los disparos y los devuelve con su event_id"""
+        saved = []
+        with self._lock, self.conn:
+            for event in events:
+                cursor = self.conn.execute(
+                    f"INSERT INTO alert_events ({', '.join(EVENT_FIELDS[1:])}) "
+                    f"VALUES ({', '.join('?' * (len(EVENT_FIELDS) - 1))})",
+                    (
+                        event.rule_id, event.rule_name, event.type_id, event.region_id,
+                        event.location_id, event.triggered_at.timestamp(),
+                        event.best_buy, event.best_sell, event.spread_percentage,
+                        event.buy_volume, event.sell_volume, event.confidence,
+                    ),
+                )
+                saved.append(replace(event, event_id=cursor.lastrowid))
+        return saved
+
+    def events(
+        self,
+        limit: int = 100,
+        rule_id: Optional[int] = None,
+        since: Optional[float] = None,
+    ) -> List[AlertEvent]:
+        """Disparos más recientes primero, opcionalmente de una regla o desde un instante"""
+        conditions, params = [], []
+        if rule_id is not None:
+            conditions.append("rule_id = ?")
+            params.append(rule_id)
+        if since is not None:
+            conditions.append("triggered_at >= ?")
+            params.append(since)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT {', '.join(EVENT_FIELDS)} FROM alert_events{where} "
+                "ORDER BY triggered_at DESC, event_id DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+        return [_event_from_row(row) for row in rows]
+
+    def prune_events(self, older_than: Optional[float] = None) -> int:
+        """Borra los disparos anteriores a la retención (ALERTS_RETENTION_DAYS)"""
+        if older_than is None:
+            older_than = time.time() - float(Settings().ALERTS_RETENTION_DAYS) * 86400
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "DELETE FROM alert_events WHERE triggered_at < ?", (older_than,)
+            )
+        return cursor.rowcount
+
+    def close(self):
+        self.conn.close()
+
+
+_shared_store: Optional[AlertStore] = None
+
+
+def get_alert_store() -> AlertStore:
+    """Devuelve el almacén de alertas compartido por todo el proceso."""
+    global _shared_store
+    if _shared_store is None:
+        _shared_store = AlertStore()
+    return _shared_store
@@ -0,0 +1,315 @@
+# app/infrastructure/persistence/market_history_store.py
+import io
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.domain.entities.order_book import OrderBook
+from app.core.domain.entities.order_book_diff import OrderBookDiff
+from app.infrastructure.config.settings import Settings
+
+# Tamaño del bucket de los rollups (una hora)
+ROLLUP_BUCKET = 3600
+
+FULL, DELTA = "full", "delta"
+
+OHLC_FIELDS = (
+    "bid_open", "bid_high", "bid_low", "bid_close",
+    "ask_open", "ask_high", "ask_low", "ask_close",
+    "buy_volume", "sell_volume", "samples",
+)
+
+
+def _pack(arrays: Dict[str, np.ndarray]) -> bytes:
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def _unpack(payload: bytes) -> Dict[str, np.ndarray]:
+    with np.load(io.BytesIO(payload), allow_pickle=False) as data:
+        return {name: data[name] for name in data.files}
+
+
+def _book_columns(book: OrderBook, prefix: str = "") -> Dict[str, np.ndarray]:
+    return {prefix + name: getattr(book, name) for name in OrderBook.COLUMNS}
+
+
+def _positions(order_ids: np.ndarray, wanted: np.ndarray) -> np.ndarray:
+    """Posición en order_ids de cada id de wanted (todos presentes)"""
+    sorter = np.argsort(order_ids)
+    return sorter[np.searchsorted(order_ids, wanted, sorter=sorter)]
+
+
+def encode_delta(
+    previous: OrderBook, current: OrderBook, diff: Optional[OrderBookDiff] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Órdenes nuevas, cambiadas y eliminadas por order_id. De las cambiadas
+    se guarda la fila completa: una modificación también renueva `issued`.
+    """
+    diff = diff or OrderBookDiff.compute(previous, current)
+    return {
+        **_book_columns(current.select(diff.added), "added_"),
+        **_book_columns(current.select(diff.changed), "changed_"),
+        "removed": diff.removed_order_ids,
+    }
+
+
+def apply_delta(book: OrderBook, delta: Dict[str, np.ndarray]) -> OrderBook:
+    """Reconstruye el libro siguiente a partir del anterior y su delta"""
+    # select copia las columnas, así que se pueden modificar en sitio
+    book = book.select(~np.isin(book.order_id, delta["removed"]))
+    if len(delta["changed_order_id"]):
+        positions = _positions(book.order_id, delta["changed_order_id"])
+        for name in OrderBook.COLUMNS:
+            getattr(book, name)[positions] = delta["changed_" + name]
+    added = OrderBook(
+        **{name: delta["added_" + name] for name in OrderBook.COLUMNS}
+    )
+    return OrderBook.concat([book, added])
+
+
+class MarketHistoryStore:
+    """
+    Histórico local (SQLite bajo ./data) de los snapshots de mercado.
+    Cada snapshot se guarda como delta comprimido contra el anterior
+    (nuevas, cambiadas y eliminadas por order_id), con un snapshot completo
+    cada HISTORY_KEYFRAME_INTERVAL para acotar la reconstrucción. Además se
+    mantienen rollups OHLC por hora, tipo y región para consultas rápidas.
+    Un delta solo se escribe contra el último libro que llegó a guardarse:
+    si el anterior falló, el siguiente va completo.
+    """
+
+    def __init__(self, path: Optional[str] = None, keyframe_interval: Optional[int] = None):
+        settings = Settings()
+        self.path = path or settings.HISTORY_PATH
+        self.keyframe_interval = int(
+            keyframe_interval or settings.HISTORY_KEYFRAME_INTERVAL
+        )
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS snapshots (
+                region_id INTEGER NOT NULL,
+                ts REAL NOT NULL,
+                kind TEXT NOT NULL,
+                total_orders INTEGER NOT NULL,
+                payload BLOB NOT NULL,
+                PRIMARY KEY (region_id, ts)
+            ) WITHOUT ROWID;
+
+            CREATE TABLE IF NOT EXISTS ohlc_hourly (
+                region_id INTEGER NOT NULL,
+                type_id INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                bid_open REAL, bid_high REAL, bid_low REAL, bid_close REAL,
+                ask_open REAL, ask_high REAL, ask_low REAL, ask_close REAL,
+                buy_volume INTEGER NOT NULL,
+                sell_volume INTEGER NOT NULL,
+                samples INTEGER NOT NULL,
+                PRIMARY KEY (region_id, type_id, bucket)
+            ) WITHOUT ROWID;
+            """
+        )
+        self.conn.commit()
+        # Las escrituras llegan desde hilos (asyncio.to_thread) de varias regiones
+        self._lock = threading.Lock()
+        # Último libro guardado por región (timestamp, libro), base de los deltas
+        self._persisted: Dict[int, Tuple[float, OrderBook]] = {}
+
+    # -- escritura ---------------------------------------------------------
+
+    def record_snapshot(
+        self,
+        region_id: int,
+        book: OrderBook,
+        timestamp: Optional[float] = None,
+        previous: Optional[OrderBook] = None,
+        diff: Optional[OrderBookDiff] = None,
+    ) -> str:
+        """
+        Guarda el snapshot y actualiza los rollups. Es un delta si `previous`
+        es el último libro guardado de la región; si no (primer snapshot,
+        reinicio o fallo al guardar el anterior) se guarda completo.
+        """
+        timestamp = timestamp or time.time()
+        with self._lock:
+            kind = FULL
+            if (
+                previous is not None
+                and self._is_persisted(region_id, previous, timestamp)
+                and self._deltas_since_keyframe(region_id) < self.keyframe_interval
+            ):
+                kind = DELTA
+            arrays = encode_delta(previous, book, diff) if kind == DELTA else _book_columns(book)
+
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO snapshots (region_id, ts, kind, total_orders, payload) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (region_id, timestamp, kind, len(book), _pack(arrays)),
+                )
+                self._update_rollups(region_id, book, timestamp)
+            # Solo tras el commit: si algo falla, el siguiente no será delta de este
+            self._persisted[region_id] = (timestamp, book)
+        return kind
+
+    def _is_persisted(self, region_id: int, book: OrderBook, timestamp: float) -> bool:
+        last = self._persisted.get(region_id)
+        return last is not None and last[1] is book and last[0] < timestamp
+
+    def _deltas_since_keyframe(self, region_id: int) -> int:
+        row = self.conn.execute(
+            "SELECT COUNT(*) FROM snapshots WHERE region_id = ? AND ts > "
+            "(SELECT MAX(ts) FROM snapshots WHERE region_id = ? AND kind = ?)",
+            (region_id, region_id, FULL),
+        ).fetchone()
+        # Sin keyframe previo COUNT devuelve 0, pero hace falta uno completo
+        has_keyframe = self.conn.execute(
+            "SELECT 1 FROM snapshots WHERE region_id = ? AND kind = ? LIMIT 1",
+            (region_id, FULL),
+        ).fetchone()
+        return row[0] if has_keyframe else self.keyframe_interval
+
+    def _update_rollups(self, region_id: int, book: OrderBook, timestamp: float):
+        spreads = book.spreads_by_type()
+        bucket = int(timestamp // ROLLUP_BUCKET * ROLLUP_BUCKET)
+
+        def price(value: float) -> Optional[float]:
+            return None if np.isnan(value) else float(value)
+
+        rows = (
+            (
+                region_id, int(type_id), bucket,
+                price(bid), price(bid), price(bid), price(bid),
+                price(ask), price(ask), price(ask), price(ask),
+                int(buy_volume), int(sell_volume),
+            )
+            for type_id, bid, ask, buy_volume, sell_volume in zip(
+                spreads.type_ids, spreads.best_buy, spreads.best_sell,
+                spreads.buy_volume, spreads.sell_volume,
+            )
+        )
+        # max()/min() de SQLite devuelven NULL si algún argumento lo es
+        self.conn.executemany(
+            """
+            INSERT INTO ohlc_hourly (
+                region_id, type_id, bucket,
+                bid_open, bid_high, bid_low, bid_close,
+                ask_open, ask_high, ask_low, ask_close,
+                buy_volume, sell_volume, samples
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
+            ON CONFLICT (region_id, type_id, bucket) DO UPDATE SET
+                bid_open = COALESCE(bid_open, excluded.bid_open),
+                bid_high = max(COALESCE(bid_high, excluded.bid_high), COALESCE(excluded.bid_high, bid_high)),
+                bid_low = min(COALESCE(bid_low, excluded.bid_low), COALESCE(excluded.bid_low, bid_low)),
+                bid_close = COALESCE(excluded.bid_close, bid_close),
+                ask_open = COALESCE(ask_open, excluded.ask_open),
+                ask_high = max(COALESCE(ask_high, excluded.ask_high), COALESCE(excluded.ask_high, ask_high)),
+                ask_low = min(COALESCE(ask_low, excluded.ask_low), COALESCE(excluded.ask_low, ask_low)),
+                ask_close = COALESCE(excluded.ask_close, ask_close),
+                buy_volume = excluded.buy_volume,
+                sell_volume = excluded.sell_volume,
+                samples = samples + 1
+            """,
+            rows,
+        )
+
+    def prune(self, older_than: Optional[float] = None) -> int:
+        """
+        Borra snapshots anteriores a la retención, conservando el último
+        keyframe necesario para reconstruir los que quedan. Los rollups
+        OHLC se conservan.
+        """
+        if older_than is None:
+            older_than = time.time() - float(Settings().HISTORY_RETENTION_DAYS) * 86400
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                """
+                DELETE FROM snapshots WHERE ts < ? AND ts < COALESCE((
+                    SELECT MAX(k.ts) FROM snapshots AS k
+                    WHERE k.region_id = snapshots.region_id AND k.kind = ? AND k.ts <= ?
+                ), 0)
+                """,
+                (older_than, FULL, older_than),
+            )
+        return cursor.rowcount
+
+    # -- lectura -----------------------------------------------------------
+
+    def ohlc(
+        self,
+        region_id: int,
+        type_id: int,
+        start: float,
+        end: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Rollups por hora de un tipo en una región entre start y end (epoch)"""
+        end = end if end is not None else time.time()
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT bucket, {', '.join(OHLC_FIELDS)} FROM ohlc_hourly "
+                "WHERE region_id = ? AND type_id = ? AND bucket >= ? AND bucket <= ? "
+                "ORDER BY bucket",
+                (region_id, type_id, int(start // ROLLUP_BUCKET * ROLLUP_BUCKET), end),
+            ).fetchall()
+        return [dict(zip(("bucket", *OHLC_FIELDS), row)) for row in rows]
+
+    def snapshot_times(
+        self, region_id: int, start: float = 0, end: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        end = end if end is not None else time.time()
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT ts, kind, total_orders, length(payload) FROM snapshots "
+                "WHERE region_id = ? AND ts >= ? AND ts <= ? ORDER BY ts",
+                (region_id, start, end),
+            ).fetchall()
+        return [
+            {"ts": ts, "kind": kind, "total_orders": total, "bytes": size}
+            for ts, kind, total, size in rows
+        ]
+
+    def book_at(self, region_id: int, timestamp: float) -> Optional[OrderBook]:
+        """Reconstruye el libro de la región tal como estaba en ese instante"""
+        with self._lock:
+            keyframe = self.conn.execute(
+                "SELECT ts, payload FROM snapshots WHERE region_id = ? AND kind = ? "
+                "AND ts <= ? ORDER BY ts DESC LIMIT 1",
+                (region_id, FULL, timestamp),
+            ).fetchone()
+            if keyframe is None:
+                return None
+            deltas = self.conn.execute(
+                "SELECT payload FROM snapshots WHERE region_id = ? AND kind = ? "
+                "AND ts > ? AND ts <= ? ORDER BY ts",
+                (region_id, DELTA, keyframe[0], timestamp),
+            ).fetchall()
+
+        columns = _unpack(keyframe[1])
+        book = OrderBook(**{name: columns[name] for name in OrderBook.COLUMNS})
+        for (payload,) in deltas:
+            book = apply_delta(book, _unpack(payload))
+        return book
+
+    def close(self):
+        self.conn.close()
+
+
+_shared_store: Optional[MarketHistoryStore] = None
+
+
+def get_history_store() -> MarketHistoryStore:
+    """Devuelve el almacén de histórico compartido por todo el proceso."""
+    global _shared_store
+    if _shared_store is None:
+        _shared_store = MarketHistoryStore()
+    return _shared_store
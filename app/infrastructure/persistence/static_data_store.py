@@ -0,0 +1,102 @@
+# app/infrastructure/persistence/static_data_store.py
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.infrastructure.config.settings import Settings
+
+# Tipos de datos estáticos que se guardan (solo cambian con parches del juego)
+STATIC_KINDS = ("regions", "constellations", "systems", "types")
+
+
+class StaticDataStore:
+    """
+    Almacén SQLite de datos estáticos del universo bajo ./data.
+    Los adapters lo consultan antes de ir a ESI y guardan lo que descargan,
+    así un reinicio no vuelve a pedir miles de regiones, sistemas y tipos.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or Settings().STATIC_DATA_PATH
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS static_data (
+                kind TEXT NOT NULL,
+                id INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (kind, id)
+            ) WITHOUT ROWID
+            """
+        )
+        self.conn.commit()
+
+    def get(self, kind: str, entity_id: int) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute(
+            "SELECT data FROM static_data WHERE kind = ? AND id = ?",
+            (kind, entity_id),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_many(self, kind: str, ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        ids = list(ids)
+        found: Dict[int, Dict[str, Any]] = {}
+        # SQLite limita el número de parámetros por consulta
+        for start in range(0, len(ids), 500):
+            chunk = ids[start : start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT id, data FROM static_data WHERE kind = ? AND id IN ({placeholders})",
+                (kind, *chunk),
+            )
+            found.update({row[0]: json.loads(row[1]) for row in rows})
+        return found
+
+    def put(self, kind: str, entity_id: int, data: Dict[str, Any]):
+        self.put_many(kind, [(entity_id, data)])
+
+    def put_many(self, kind: str, items: Iterable[Tuple[int, Dict[str, Any]]]):
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO static_data (kind, id, data, updated_at) "
+            "VALUES (?, ?, ?, ?)",
+            ((kind, entity_id, json.dumps(data), now) for entity_id, data in items),
+        )
+        self.conn.commit()
+
+    def ids(self, kind: str) -> List[int]:
+        rows = self.conn.execute("SELECT id FROM static_data WHERE kind = ?", (kind,))
+        return [row[0] for row in rows]
+
+    def iter_all(self, kind: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        rows = self.conn.execute(
+            "SELECT id, data FROM static_data WHERE kind = ?", (kind,)
+        )
+        for entity_id, data in rows:
+            yield entity_id, json.loads(data)
+
+    def count(self, kind: str) -> int:
+        row = self.conn.execute(
+            "SELECT COUNT(*) FROM static_data WHERE kind = ?", (kind,)
+        ).fetchone()
+        return row[0]
+
+    def close(self):
+        self.conn.close()
+
+
+_shared_store: Optional[StaticDataStore] = None
+
+
+def get_static_store() -> StaticDataStore:
+    """Devuelve el almacén de datos estáticos compartido por todo el proceso."""
+    global _shared_store
+    if _shared_store is None:
+        _shared_store = StaticDataStore()
+    return _shared_store
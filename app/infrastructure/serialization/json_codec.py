@@ -0,0 +1,113 @@
+# app/infrastructure/serialization/json_codec.py
+import json
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Iterable, Union
+
+from starlette.responses import JSONResponse
+
+# orjson es opcional (extra "fast"); sin él se usa el json de la stdlib
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+@dataclass
+class CodecStats:
+    """Tiempo de CPU y bytes que pasan por el codec en todo el proceso"""
+    decoded_bytes: int = 0
+    decode_seconds: float = 0.0
+    encoded_bytes: int = 0
+    encode_seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "backend": JSON_BACKEND,
+            "decoded_mb": round(self.decoded_bytes / 1024 / 1024, 2),
+            "decode_ms": round(self.decode_seconds * 1000, 1),
+            "encoded_mb": round(self.encoded_bytes / 1024 / 1024, 2),
+            "encode_ms": round(self.encode_seconds * 1000, 1),
+        }
+
+
+codec_stats = CodecStats()
+
+
+def _default(value: Any) -> Any:
+    """Tipos que el codec no conoce (modelos pydantic, Enum, ...)"""
+    from fastapi.encoders import jsonable_encoder
+
+    return jsonable_encoder(value)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decodifica un cuerpo JSON (p. ej. response.content de httpx)."""
+    start = time.perf_counter()
+    result = orjson.loads(data) if orjson is not None else json.loads(data)
+    codec_stats.decode_seconds += time.perf_counter() - start
+    codec_stats.decoded_bytes += len(data)
+    return result
+
+
+def _finite(value: Any) -> Any:
+    """NaN/Inf a None en toda la estructura, como hace orjson al codificar"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+
+def _stdlib_dumps(content: Any) -> str:
+    return json.dumps(
+        content,
+        default=lambda value: _finite(_default(value)),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    )
+
+
+def _dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+    try:
+        return _stdlib_dumps(content).encode("utf-8")
+    except ValueError:
+        # Hay floats no finitos: se recorre la estructura solo en ese caso
+        return _stdlib_dumps(_finite(content)).encode("utf-8")
+
+
+def dumps(content: Any) -> bytes:
+    """Codifica a JSON compacto en UTF-8 (mismo formato que JSONResponse)."""
+    start = time.perf_counter()
+    body = _dumps(content)
+    codec_stats.encode_seconds += time.perf_counter() - start
+    codec_stats.encoded_bytes += len(body)
+    return body
+
+
+def dumps_lines(items: Iterable[Any]) -> bytes:
+    """Codifica una secuencia como NDJSON (un documento por línea)."""
+    start = time.perf_counter()
+    body = b"".join(_dumps(item) + b"\n" for item in items)
+    codec_stats.encode_seconds += time.perf_counter() - start
+    codec_stats.encoded_bytes += len(body)
+    return body
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse que serializa con el codec rápido si está disponible"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -8,6 +8,8 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from app.infrastructure.adapters.esi_adapter_market import ESIClientMarket
 from app.infrastructure.adapters.esi_adapter_universe import ESIClientUniverse
 from app.infrastructure.adapters.esi_adapter_items import ESIClientItems
+from app.infrastructure.adapters.esi_name_resolver import ESINameResolver
+from app.core.domain.entities.order_book import OrderBook
 from app.core.domain.services.market_analyzer import MarketAnalyzer
 from app.core.domain.value_objects.market_values import Volume
 
@@ -19,7 +21,9 @@ async def debug_analysis():
     universe_client = ESIClientUniverse()
     items_client = ESIClientItems()
     
-    analyzer = MarketAnalyzer(market_client, universe_client, items_client)
+    name_resolver = ESINameResolver()
+    
+    analyzer = MarketAnalyzer(market_client, universe_client, items_client, name_resolver)
     
     # Parameters from user request
     region_id = 10000002 # The Forge
@@ -40,27 +44,26 @@ async def debug_analysis():
             print("❌ No orders returned from ESI.")
             return
 
-        orders_by_type = analyzer._group_orders_by_type(all_orders)
-        print(f"📦 Grouped into {len(orders_by_type)} unique item types.")
+        book = OrderBook.from_orders(all_orders)
+        spreads = book.spreads_by_type()
+        print(f"📦 Grouped into {len(spreads)} unique item types.")
         
         print(f"🕵️ Analyzing first {analysis_limit} items...")
         
         analyzed_count = 0
         opportunities = []
         
-        for type_id, orders in list(orders_by_type.items())[:analysis_limit]:
+        for index in range(min(len(spreads), analysis_limit)):
             analyzed_count += 1
-            print(f"  [{analyzed_count}] Analyzing TypeID {type_id} ({len(orders)} orders)...")
+            type_id = int(spreads.type_ids[index])
+            print(f"  [{analyzed_count}] Analyzing TypeID {type_id} ({spreads.buy_orders[index] + spreads.sell_orders[index]} orders)...")
             
             # Check buy/sell split
-            buy_orders = [o for o in orders if o.get('is_buy_order')]
-            sell_orders = [o for o in orders if not o.get('is_buy_order')]
-            
-            if not buy_orders or not sell_orders:
-                print(f"    ⚠️ Skipped: Missing buy or sell orders (Buy: {len(buy_orders)}, Sell: {len(sell_orders)})")
+            if not spreads.has_both_sides[index]:
+                print(f"    ⚠️ Skipped: Missing buy or sell orders (Buy: {spreads.buy_orders[index]}, Sell: {spreads.sell_orders[index]})")
                 continue
                 
-            market_spread = analyzer._calculate_market_spread(buy_orders, sell_orders)
+            market_spread = spreads.market_spread(index)
             
             print(f"    💰 Spread: {market_spread.percentage_spread:.2f}% (Min: {min_spread}%)")
             print(f"    📦 Volume: {market_spread.tradable_volume} (Min: {min_volume})")
@@ -70,8 +73,10 @@ async def debug_analysis():
                 continue
             
             print("    ✅ VIABLE OPPORTUNITY FOUND!")
-            opportunity = await analyzer._analyze_item_profit(
-                region_id, type_id, orders, min_volume, min_spread
+            names = await name_resolver.resolve([type_id, region_id])
+            opportunity = analyzer._build_opportunity(
+                region_id, names.get(region_id, f'Region_{region_id}'),
+                type_id, names.get(type_id, f'Item_{type_id}'), market_spread
             )
             if opportunity:
                 opportunities.append(opportunity)
@@ -0,0 +1,179 @@
+# tests/test_alert_index.py
+import asyncio
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.core.domain.entities.alert import AlertRule
+from app.core.domain.entities.market_order import MarketOrder
+from app.core.domain.entities.market_snapshot import RegionSnapshot
+from app.core.domain.entities.order_book import OrderBook
+from app.core.domain.entities.order_book_diff import OrderBookDiff
+from app.core.domain.services.alert_index import AlertIndex, CompiledRules
+from app.infrastructure.market.alert_engine import AlertEngine
+from app.infrastructure.market.change_feed import MarketChangeEvent, MarketChangeFeed
+from app.infrastructure.persistence.alert_store import AlertStore
+
+REGION = 10000002
+JITA = 60003760
+JITA_SYSTEM = 30000142
+AMARR = 60008494
+AMARR_SYSTEM = 30002187
+
+
+def order(order_id, price, is_buy=False, type_id=34, location_id=JITA, system_id=JITA_SYSTEM,
+          range_="region", volume=1000):
+    return MarketOrder(
+        order_id=order_id,
+        type_id=type_id,
+        location_id=location_id,
+        system_id=system_id,
+        price=price,
+        volume_remain=volume,
+        volume_total=volume,
+        is_buy_order=is_buy,
+        issued="2026-01-01T00:00:00Z",
+        duration=90,
+        min_volume=1,
+        range=range_ if is_buy else "station",
+    )
+
+
+def book(*orders):
+    return OrderBook.from_orders(list(orders))
+
+
+def rule(rule_id, type_id=34, **conditions):
+    return AlertRule(type_id=type_id, region_id=REGION, rule_id=rule_id, **conditions)
+
+
+def test_candidates_with_several_rules_per_type():
+    rules = [
+        rule(1, 36, min_spread_percentage=5),
+        rule(2, 34, min_spread_percentage=5),
+        rule(3, 35, min_spread_percentage=5),
+        rule(4, 34, max_best_sell=10),
+        rule(5, 36, min_volume=10),
+        rule(6, 34, high_confidence=True),
+    ]
+    compiled = CompiledRules(rules)
+
+    positions = compiled.candidates(np.array([34, 36, 99]))
+    assert compiled.type_ids[positions].tolist() == [34, 34, 34, 36, 36]
+    assert compiled.rule_ids[positions].tolist() == [2, 4, 6, 1, 5]
+    assert compiled.rule_ids[compiled.candidates(np.array([35]))].tolist() == [3]
+    # Tipos sin reglas, o ningún tipo tocado
+    assert len(compiled.candidates(np.array([33, 99]))) == 0
+    assert len(compiled.candidates(np.array([], dtype=np.int64))) == 0
+
+
+def test_fires_only_on_transition():
+    index = AlertIndex([rule(1, min_spread_percentage=10)])
+    touched = np.array([34])
+    narrow = book(order(1, 105.0), order(2, 100.0, is_buy=True))
+    wide = book(order(1, 200.0), order(2, 100.0, is_buy=True))
+
+    assert index.evaluate(REGION, narrow, touched) == []
+    (event,) = index.evaluate(REGION, wide, touched)
+    assert (event.rule_id, event.best_buy, event.best_sell, event.spread_percentage) == (
+        1, 100.0, 200.0, 50.0,
+    )
+    # Sigue cumpliéndose: no se repite
+    assert index.evaluate(REGION, wide, touched) == []
+    # Deja de cumplirse y vuelve: nuevo aviso
+    assert index.evaluate(REGION, narrow, touched) == []
+    assert len(index.evaluate(REGION, wide, touched)) == 1
+    # Otra región o un tipo sin reglas no evalúan nada
+    assert index.evaluate(REGION + 1, wide, touched) == []
+    assert index.evaluate(REGION, wide, np.array([35])) == []
+
+
+def test_matching_state_survives_engine_reload(tmp_path):
+    store = AlertStore(str(tmp_path / "alerts.sqlite3"))
+    wide = book(order(1, 200.0), order(2, 100.0, is_buy=True))
+    now = datetime.now()
+    snapshot = RegionSnapshot(
+        region_id=REGION, version=1, orders=[], book=wide, fetched_at=now, expires_at=now
+    )
+
+    class Snapshots:
+        def get_snapshot(self, region_id):
+            return snapshot if region_id == REGION else None
+
+    fired = []
+    engine = AlertEngine(store, snapshots=Snapshots(), feed=MarketChangeFeed(), notify=fired.extend)
+    event = MarketChangeEvent(
+        region_id=REGION,
+        version=2,
+        snapshot=snapshot,
+        diff=OrderBookDiff.compute(wide, wide),
+        touched_type_ids=np.array([34]),
+    )
+
+    async def scenario():
+        first = await engine.add_rule(AlertRule(type_id=34, region_id=REGION, min_spread_percentage=10))
+        # Se evalúa al crearla contra el snapshot actual
+        assert [e.rule_id for e in fired] == [first.rule_id]
+
+        # Recompilar (regla nueva de otro tipo, pausar otra) no vuelve a disparar la primera
+        second = await engine.add_rule(AlertRule(type_id=35, region_id=REGION, min_volume=1))
+        await engine.set_enabled(second.rule_id, False)
+        await engine.dispatch(event)
+        assert len(fired) == 1
+
+        # Al reactivarla empieza de cero
+        await engine.set_enabled(first.rule_id, False)
+        await engine.set_enabled(first.rule_id, True)
+        assert len(fired) == 2
+        assert await engine.delete_rule(first.rule_id)
+        assert not await engine.delete_rule(first.rule_id)
+        assert len(engine.index) == 0
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        store.close()
+
+
+def test_station_rule_uses_the_station_book():
+    market = book(
+        # Venta barata en Amarr: cuenta para la región, no para Jita
+        order(1, 110.0, location_id=AMARR, system_id=AMARR_SYSTEM),
+        order(2, 150.0),
+        order(3, 100.0, is_buy=True),
+        # Compra en Amarr con rango de sistema: no operable desde Jita
+        order(4, 140.0, is_buy=True, location_id=AMARR, system_id=AMARR_SYSTEM,
+              range_="solarsystem"),
+        order(5, 500.0, type_id=35),
+    )
+
+    spreads = AlertIndex._station_spreads(market, JITA, np.array([34]))
+    assert spreads.type_ids.tolist() == [34]
+    assert (spreads.best_buy[0], spreads.best_sell[0]) == (100.0, 150.0)
+
+    index = AlertIndex([
+        rule(1, max_best_sell=120),
+        rule(2, max_best_sell=120, location_id=JITA),
+        rule(3, min_spread_percentage=30, location_id=JITA),
+    ])
+    fired = index.evaluate(REGION, market, np.array([34]))
+    assert sorted(e.rule_id for e in fired) == [1, 3]
+    station = next(e for e in fired if e.rule_id == 3)
+    assert (station.best_buy, station.best_sell, station.location_id) == (100.0, 150.0, JITA)
+
+
+@pytest.mark.parametrize(
+    "conditions",
+    [{"min_volume": 0}, {"min_volume": 0, "min_spread_percentage": 5}, {"min_volume": -1}],
+)
+def test_min_volume_below_one_is_rejected(conditions):
+    with pytest.raises(ValueError):
+        AlertRule(type_id=34, region_id=REGION, **conditions).validate()
+
+
+def test_stored_rule_without_real_conditions_is_ignored():
+    # Guardada antes de la validación: volumen 0 no es una condición
+    index = AlertIndex([rule(1, min_volume=0), rule(2, min_volume=0, max_best_sell=1)])
+    assert len(index) == 1
+    assert index.evaluate(REGION, book(order(1, 200.0)), np.array([34])) == []
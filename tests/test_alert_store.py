@@ -0,0 +1,87 @@
+# tests/test_alert_store.py
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.domain.entities.alert import AlertEvent, AlertRule
+from app.infrastructure.persistence.alert_store import AlertStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    alerts = AlertStore(str(tmp_path / "alerts.sqlite3"))
+    yield alerts
+    alerts.close()
+
+
+def event(rule_id, triggered_at, **values):
+    fields = dict(
+        rule_id=rule_id,
+        rule_name=f"regla {rule_id}",
+        type_id=34,
+        region_id=10000002,
+        location_id=None,
+        triggered_at=triggered_at,
+        best_buy=None,
+        best_sell=None,
+        spread_percentage=None,
+        buy_volume=0,
+        sell_volume=0,
+        confidence=None,
+    )
+    return AlertEvent(**{**fields, **values})
+
+
+def test_rule_round_trip(store):
+    station = store.add_rule(AlertRule(
+        type_id=34, region_id=10000002, name="Trit Jita", location_id=60003760,
+        min_spread_percentage=7.5, max_best_sell=4.2, min_volume=1000, high_confidence=True,
+    ))
+    region = store.add_rule(AlertRule(type_id=35, region_id=10000043, min_volume=1))
+
+    assert station.rule_id is not None and station.created_at is not None
+    assert store.get_rule(station.rule_id) == station
+    assert store.rules() == [station, region]
+
+    assert store.set_enabled(region.rule_id, False)
+    assert not store.get_rule(region.rule_id).enabled
+    assert store.rules(enabled_only=True) == [station]
+
+    assert store.delete_rule(station.rule_id)
+    assert store.get_rule(station.rule_id) is None
+    assert not store.delete_rule(station.rule_id)
+    assert not store.set_enabled(station.rule_id, True)
+
+
+def test_event_round_trip_and_filters(store):
+    start = datetime(2026, 1, 1, 12, 0, 0)
+    saved = store.record_events([
+        event(1, start, best_buy=100.0, best_sell=150.0, spread_percentage=33.3,
+              buy_volume=10, sell_volume=20, confidence=0.5, location_id=60003760),
+        # Un solo lado: los valores opcionales quedan a None
+        event(2, start + timedelta(minutes=1), best_sell=90.0, sell_volume=5),
+        event(1, start + timedelta(minutes=2)),
+    ])
+
+    assert [e.event_id for e in saved] == [1, 2, 3]
+    # Más recientes primero
+    assert store.events() == saved[::-1]
+    assert store.events(limit=1) == [saved[2]]
+    assert store.events(rule_id=1) == [saved[2], saved[0]]
+    assert store.events(since=(start + timedelta(minutes=1)).timestamp()) == saved[:0:-1]
+
+
+def test_prune_events(store, monkeypatch):
+    start = datetime(2026, 1, 1)
+    store.record_events([event(1, start + timedelta(days=day)) for day in range(4)])
+
+    assert store.prune_events(older_than=(start + timedelta(days=2)).timestamp()) == 2
+    assert [e.triggered_at for e in store.events()] == [
+        start + timedelta(days=3), start + timedelta(days=2),
+    ]
+
+    # Sin límite explícito se usa ALERTS_RETENTION_DAYS
+    monkeypatch.setenv("ALERTS_RETENTION_DAYS", "1")
+    store.record_events([event(2, datetime.now())])
+    assert store.prune_events() == 2
+    assert [e.rule_id for e in store.events()] == [2]
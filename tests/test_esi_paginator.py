@@ -0,0 +1,78 @@
+# tests/test_esi_paginator.py
+import asyncio
+
+from app.infrastructure.adapters.esi_page_cache import CachedPage, ConditionalPageCache
+from app.infrastructure.adapters.esi_paginator import ESIPaginator, PaginationStats
+from app.infrastructure.adapters.esi_transport import ESITransport
+
+
+class SlowPaginator(ESIPaginator):
+    """Página 1 al instante; el resto tarda, para que queden tareas en vuelo"""
+
+    def __init__(self):
+        super().__init__(ESITransport(), max_concurrency=4)
+        self.cancelled = 0
+
+    async def load_page(self, url, params, page, stats, cache_key=None):
+        if page == 1:
+            return [1], 10
+        try:
+            await asyncio.sleep(0.01 * page)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return [page], 10
+
+
+def test_abandoned_stream_awaits_pending_pages():
+    async def scenario():
+        paginator = SlowPaginator()
+        pages = paginator.iter_pages("https://esi.test/markets/10000002/orders/")
+        received = [await pages.__anext__(), await pages.__anext__()]
+        # El consumidor abandona con páginas aún en vuelo
+        await pages.aclose()
+        leftovers = [
+            task for task in asyncio.all_tasks()
+            if task is not asyncio.current_task()
+        ]
+        return received, paginator.cancelled, leftovers
+
+    received, cancelled, leftovers = asyncio.run(scenario())
+    assert received == [(1, [1]), (2, [2])]
+    assert cancelled == 3
+    assert leftovers == []
+
+
+def test_iter_pages_yields_every_page():
+    async def scenario():
+        stats = PaginationStats()
+        paginator = SlowPaginator()
+        return [page async for page, _ in paginator.iter_pages("u", stats=stats)], stats
+
+    pages, stats = asyncio.run(scenario())
+    assert sorted(pages) == list(range(1, 11))
+    assert stats.total_pages == 10
+
+
+def test_page_cache_is_bounded_by_bytes():
+    cache = ConditionalPageCache()
+    cache.clear()
+    max_bytes, cache.max_bytes = cache.max_bytes, 1000
+    try:
+        for page in range(1, 6):
+            cache.set(("orders", page), CachedPage(None, 0.0, 5, [page], size=300))
+        # Solo caben tres páginas de 300 bytes: se expulsan las más antiguas
+        assert list(cache.store) == [("orders", 3), ("orders", 4), ("orders", 5)]
+        assert cache.current_bytes == 900
+
+        # Reemplazar una página descuenta el tamaño anterior
+        cache.set(("orders", 5), CachedPage(None, 0.0, 5, [5], size=100))
+        assert cache.current_bytes == 700
+
+        # Una página mayor que el límite no se guarda
+        cache.set(("orders", 6), CachedPage(None, 0.0, 5, [6], size=2000))
+        assert cache.get(("orders", 6)) is None
+        assert cache.current_bytes == 700
+    finally:
+        cache.max_bytes = max_bytes
+        cache.clear()
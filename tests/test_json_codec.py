@@ -0,0 +1,51 @@
+# tests/test_json_codec.py
+import math
+from dataclasses import dataclass
+
+import pytest
+
+from app.infrastructure.serialization import json_codec
+
+
+@dataclass
+class Spread:
+    type_id: int
+    spread_percentage: float
+
+
+@pytest.fixture(params=["orjson", "json"])
+def codec(request, monkeypatch):
+    """El mismo módulo con orjson (si está instalado) y con la stdlib"""
+    if request.param == "orjson":
+        if json_codec.orjson is None:
+            pytest.skip("orjson no instalado")
+    else:
+        monkeypatch.setattr(json_codec, "orjson", None)
+    return json_codec
+
+
+def test_non_finite_floats_become_null(codec):
+    payload = {
+        "best_buy": math.nan,
+        "rows": [{"spread": math.inf}, (1.5, -math.inf)],
+        "nested": {"ok": 2.0},
+        "spread": Spread(34, math.nan),
+    }
+
+    assert codec.loads(codec.dumps(payload)) == {
+        "best_buy": None,
+        "rows": [{"spread": None}, [1.5, None]],
+        "nested": {"ok": 2.0},
+        "spread": {"type_id": 34, "spread_percentage": None},
+    }
+
+
+def test_ndjson_with_nan(codec):
+    body = codec.dumps_lines([{"price": 1.0}, {"price": math.nan}])
+    assert body == b'{"price":1.0}\n{"price":null}\n'
+
+
+def test_finite_payload_is_compact_utf8(codec):
+    assert codec.dumps({"name": "Jita IV", "región": [1, 2.5]}) == (
+        '{"name":"Jita IV","región":[1,2.5]}'.encode("utf-8")
+    )
@@ -0,0 +1,179 @@
+# tests/test_market_history_store.py
+import numpy as np
+import pytest
+
+from app.core.domain.entities.market_order import MarketOrder
+from app.core.domain.entities.order_book import OrderBook
+from app.core.domain.entities.order_book_diff import OrderBookDiff
+from app.infrastructure.persistence.market_history_store import (
+    DELTA,
+    FULL,
+    MarketHistoryStore,
+    apply_delta,
+    encode_delta,
+)
+
+# Todos los snapshots del test caen en el mismo bucket horario
+HOUR = 3600 * 100
+
+
+def order(order_id, price, volume=100, is_buy=False, type_id=34, issued="2026-01-01T00:00:00Z"):
+    return MarketOrder(
+        order_id=order_id,
+        type_id=type_id,
+        location_id=60003760,
+        system_id=30000142,
+        price=price,
+        volume_remain=volume,
+        volume_total=100,
+        is_buy_order=is_buy,
+        issued=issued,
+        duration=90,
+        min_volume=1,
+        range="region" if is_buy else "station",
+    )
+
+
+def book(*orders):
+    return OrderBook.from_orders(list(orders))
+
+
+def same_book(a: OrderBook, b: OrderBook) -> bool:
+    """Mismas órdenes con las mismas columnas, sin importar el orden de filas"""
+    if len(a) != len(b):
+        return False
+    sa, sb = np.argsort(a.order_id), np.argsort(b.order_id)
+    return all(
+        np.array_equal(getattr(a, name)[sa], getattr(b, name)[sb])
+        for name in OrderBook.COLUMNS
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    history = MarketHistoryStore(str(tmp_path / "history.sqlite3"), keyframe_interval=2)
+    yield history
+    history.close()
+
+
+def test_delta_round_trip_keeps_every_column():
+    previous = book(order(1, 10.0), order(2, 11.0), order(3, 12.0))
+    current = book(
+        # Modificada: precio nuevo y `issued` renovado
+        order(1, 9.5, issued="2026-01-02T10:00:00Z"),
+        # Venta parcial
+        order(2, 11.0, volume=40),
+        # Nueva; la 3 se ha eliminado
+        order(4, 13.0, is_buy=True),
+    )
+
+    delta = encode_delta(previous, current)
+
+    assert delta["added_order_id"].tolist() == [4]
+    assert sorted(delta["changed_order_id"].tolist()) == [1, 2]
+    assert delta["removed"].tolist() == [3]
+    assert same_book(apply_delta(previous, delta), current)
+
+
+def test_book_at_rebuilds_across_keyframes(store):
+    books = [
+        book(order(1, 10.0), order(2, 11.0)),
+        book(order(1, 9.0), order(2, 11.0), order(3, 12.0)),
+        book(order(2, 11.0, volume=50), order(3, 12.0)),
+        book(order(3, 12.5, issued="2026-01-03T00:00:00Z"), order(4, 8.0, is_buy=True)),
+        book(
+            order(3, 12.5, issued="2026-01-03T00:00:00Z"),
+            order(4, 8.0, is_buy=True, volume=60),
+            order(5, 7.0, is_buy=True),
+        ),
+        book(order(5, 7.5, is_buy=True)),
+    ]
+    kinds, previous = [], None
+    for i, current in enumerate(books):
+        diff = OrderBookDiff.compute(previous, current) if previous is not None else None
+        kinds.append(store.record_snapshot(1, current, HOUR + i * 60, previous, diff))
+        previous = current
+
+    # Un keyframe y como mucho keyframe_interval deltas detrás
+    assert kinds == [FULL, DELTA, DELTA, FULL, DELTA, DELTA]
+    for i, expected in enumerate(books):
+        assert same_book(store.book_at(1, HOUR + i * 60), expected)
+        assert same_book(store.book_at(1, HOUR + i * 60 + 30), expected)
+    assert store.book_at(1, HOUR - 1) is None
+    assert store.book_at(2, HOUR) is None
+
+
+def test_delta_only_against_last_persisted_book(store):
+    first = book(order(1, 10.0))
+    second = book(order(1, 9.0))
+    third = book(order(1, 8.0), order(2, 11.0))
+    fourth = book(order(2, 11.0))
+
+    assert store.record_snapshot(1, first, HOUR) == FULL
+    # `previous` no es el último libro guardado (p. ej. tras un reinicio): completo
+    assert store.record_snapshot(1, second, HOUR + 60, book(order(1, 10.0))) == FULL
+    assert store.record_snapshot(1, third, HOUR + 120, second) == DELTA
+
+    # Falla la escritura de fourth: el siguiente no puede ser delta suyo
+    update_rollups = store._update_rollups
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    store._update_rollups = fail
+    with pytest.raises(OSError):
+        store.record_snapshot(1, fourth, HOUR + 180, third)
+    store._update_rollups = update_rollups
+
+    fifth = book(order(2, 10.0))
+    assert store.record_snapshot(1, fifth, HOUR + 240, fourth) == FULL
+    assert [row["kind"] for row in store.snapshot_times(1, end=HOUR + 300)] == [
+        FULL, FULL, DELTA, FULL,
+    ]
+    assert same_book(store.book_at(1, HOUR + 180), third)
+    assert same_book(store.book_at(1, HOUR + 240), fifth)
+
+
+def test_prune_keeps_the_keyframe_still_needed(store):
+    books = [book(order(1, 10.0 + i)) for i in range(5)]
+    previous = None
+    for i, current in enumerate(books):
+        store.record_snapshot(1, current, HOUR + i * 100, previous)
+        previous = current
+    # ts: +0 full, +100 delta, +200 delta, +300 full, +400 delta
+
+    # Antes de +250 solo hay un keyframe útil (+0): no se puede borrar nada
+    assert store.prune(older_than=HOUR + 250) == 0
+
+    # Con +300 como keyframe, lo anterior sobra
+    assert store.prune(older_than=HOUR + 350) == 3
+    assert [row["ts"] for row in store.snapshot_times(1, end=HOUR + 500)] == [
+        HOUR + 300, HOUR + 400,
+    ]
+    assert same_book(store.book_at(1, HOUR + 400), books[4])
+    assert store.book_at(1, HOUR + 200) is None
+
+
+def test_ohlc_upserts_with_one_sided_prices(store):
+    snapshots = [
+        # Solo ventas: sin bid
+        book(order(1, 10.0)),
+        # Aparece la compra
+        book(order(1, 12.0), order(2, 8.0, is_buy=True)),
+        book(order(1, 9.0), order(2, 7.0, is_buy=True, volume=30)),
+        # Desaparece la venta: ask sin dato en este snapshot
+        book(order(2, 7.5, is_buy=True)),
+    ]
+    for i, current in enumerate(snapshots):
+        store.record_snapshot(1, current, HOUR + i * 60)
+
+    (row,) = store.ohlc(1, 34, HOUR, HOUR + 3600)
+    assert row["bucket"] == HOUR
+    assert (row["bid_open"], row["bid_high"], row["bid_low"], row["bid_close"]) == (
+        8.0, 8.0, 7.0, 7.5,
+    )
+    # El cierre de ask se queda en el último valor conocido
+    assert (row["ask_open"], row["ask_high"], row["ask_low"], row["ask_close"]) == (
+        10.0, 12.0, 9.0, 9.0,
+    )
+    assert (row["buy_volume"], row["sell_volume"], row["samples"]) == (100, 0, 4)
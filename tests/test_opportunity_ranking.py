@@ -0,0 +1,106 @@
+# tests/test_opportunity_ranking.py
+import numpy as np
+import pytest
+
+from app.core.domain.entities.opportunity_ranking import (
+    SORT_KEYS,
+    OpportunityRanking,
+    decode_cursor,
+    encode_cursor,
+)
+from app.core.domain.entities.order_book import TypeSpreads
+
+
+def make_spreads(count: int = 200, seed: int = 7) -> TypeSpreads:
+    """Pocos valores distintos de precio y volumen: muchos empates en cada clave"""
+    rng = np.random.default_rng(seed)
+    best_buy = rng.choice([80.0, 90.0, 100.0], size=count)
+    best_sell = best_buy + rng.choice([10.0, 20.0, 40.0], size=count)
+    volume = rng.choice([100, 500, 2000], size=count)
+    return TypeSpreads(
+        type_ids=np.arange(1000, 1000 + count, dtype=np.int64),
+        best_buy=best_buy,
+        best_sell=best_sell,
+        buy_volume=volume,
+        sell_volume=volume,
+        buy_orders=np.ones(count, dtype=np.int64),
+        sell_orders=np.ones(count, dtype=np.int64),
+    )
+
+
+def expected_order(ranking: OpportunityRanking, sort: str) -> list:
+    """Orden de referencia: puntuación desc y type_id asc"""
+    score = ranking.scores[sort]
+    rows = sorted(range(len(ranking)), key=lambda i: (-score[i], ranking.type_ids[i]))
+    return [int(ranking.viable[i]) for i in rows]
+
+
+@pytest.mark.parametrize("sort", SORT_KEYS)
+def test_top_matches_full_sort_with_ties(sort):
+    spreads = make_spreads()
+    for n in (1, 5, 17, 60, 500):
+        ranking = OpportunityRanking(spreads, min_spread=0, min_volume=0)
+        first, _ = ranking.page(sort, limit=n)
+        # Por debajo del total la primera página sale de la selección parcial
+        assert (sort in ranking._orders) == (n >= len(ranking))
+        assert first.tolist() == expected_order(ranking, sort)[:n]
+
+
+@pytest.mark.parametrize("sort", SORT_KEYS)
+def test_cursor_paging_matches_offset_paging(sort):
+    spreads = make_spreads()
+    ranking = OpportunityRanking(spreads, min_spread=5, min_volume=100)
+    limit = 7
+
+    by_offset = []
+    for offset in range(0, len(ranking), limit):
+        rows, _ = ranking.page(sort, limit=limit, offset=offset)
+        by_offset.append(rows.tolist())
+
+    by_cursor = []
+    rows, cursor = ranking.page(sort, limit=limit)
+    by_cursor.append(rows.tolist())
+    while cursor is not None:
+        # Un ranking recalculado (snapshot nuevo) acepta el mismo cursor
+        ranking = OpportunityRanking(spreads, min_spread=5, min_volume=100)
+        rows, cursor = ranking.page(sort, limit=limit, cursor=cursor)
+        by_cursor.append(rows.tolist())
+
+    assert by_cursor == by_offset
+    assert sum(by_cursor, []) == expected_order(ranking, sort)
+
+
+def test_last_page_has_no_cursor():
+    ranking = OpportunityRanking(make_spreads(10), min_spread=0, min_volume=0)
+    rows, cursor = ranking.page("spread", limit=10)
+    assert len(rows) == 10 and cursor is None
+    rows, cursor = ranking.page("spread", limit=20, offset=5)
+    assert len(rows) == 5 and cursor is None
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("confidence", 0.75, 34)
+    assert decode_cursor(cursor) == ("confidence", 0.75, 34)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    ["not-base64!", "bm90IGpzb24=", encode_cursor("spread", 1.0, 34)[:-4], "WzFd"],
+)
+def test_malformed_cursor_raises_value_error(cursor):
+    ranking = OpportunityRanking(make_spreads(), min_spread=0, min_volume=0)
+    with pytest.raises(ValueError):
+        ranking.page("spread", limit=5, cursor=cursor)
+
+
+def test_cursor_for_another_sort_key_is_rejected():
+    ranking = OpportunityRanking(make_spreads(), min_spread=0, min_volume=0)
+    _, cursor = ranking.page("spread", limit=5)
+    with pytest.raises(ValueError):
+        ranking.page("confidence", limit=5, cursor=cursor)
+
+
+def test_unknown_sort_key_is_rejected():
+    ranking = OpportunityRanking(make_spreads(), min_spread=0, min_volume=0)
+    with pytest.raises(ValueError):
+        ranking.page("volume", limit=5)
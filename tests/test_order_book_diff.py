@@ -0,0 +1,91 @@
+# tests/test_order_book_diff.py
+from datetime import datetime
+
+import numpy as np
+
+from app.core.domain.entities.market_order import MarketOrder
+from app.core.domain.entities.market_snapshot import RegionSnapshot
+from app.core.domain.entities.order_book import OrderBook
+from app.core.domain.entities.order_book_diff import OrderBookDiff
+from app.infrastructure.market.snapshot_engine import MarketSnapshotEngine
+
+
+def order(
+    order_id: int, price: float, volume_remain: int = 100, system_id: int = 30000142
+) -> MarketOrder:
+    return MarketOrder(
+        order_id=order_id,
+        type_id=34,
+        location_id=60003760,
+        system_id=system_id,
+        price=price,
+        volume_remain=volume_remain,
+        volume_total=100,
+        is_buy_order=False,
+        issued="2026-01-01T00:00:00Z",
+        duration=90,
+        min_volume=1,
+        range="region",
+    )
+
+
+def test_duplicated_order_keeps_last_occurrence():
+    # Páginas que cruzan un refresco de caché: la orden 2 llega dos veces
+    book = OrderBook.from_orders([order(1, 10.0), order(2, 11.0), order(3, 12.0), order(2, 10.5, 80)])
+
+    assert book.order_id.tolist() == [1, 3, 2]
+    assert book.price.tolist() == [10.0, 12.0, 10.5]
+    assert book.volume_remain.tolist() == [100, 100, 80]
+
+
+def test_duplicates_across_concatenated_pages():
+    pages = [
+        OrderBook.from_orders([order(1, 10.0), order(2, 11.0)]),
+        OrderBook.from_orders([order(2, 10.5), order(3, 12.0)]),
+    ]
+    book = OrderBook.concat(pages).deduplicated()
+
+    assert sorted(book.order_id.tolist()) == [1, 2, 3]
+    assert book.price[book.order_id == 2].tolist() == [10.5]
+
+
+def test_diff_with_duplicated_order():
+    previous = OrderBook.from_orders([order(1, 10.0), order(2, 11.0)])
+    current = OrderBook.from_orders([order(1, 10.0), order(2, 11.0), order(2, 9.0), order(3, 12.0)])
+
+    diff = OrderBookDiff.compute(previous, current)
+
+    assert current.order_id[diff.added].tolist() == [3]
+    assert current.order_id[diff.price_changed].tolist() == [2]
+    assert len(diff.removed_order_ids) == 0
+
+
+def test_build_book_with_duplicated_order():
+    orders = [order(1, 10.0), order(2, 11.0)]
+    _, book, _ = MarketSnapshotEngine._build_book(orders, None)
+    book.spreads_by_type()
+    now = datetime.now()
+    previous = RegionSnapshot(
+        region_id=10000002, version=1, orders=orders, book=book, fetched_at=now, expires_at=now
+    )
+
+    _, book, diff = MarketSnapshotEngine._build_book(orders + [order(2, 9.0)], previous)
+
+    assert len(book) == 2
+    assert diff.summary() == {"new": 0, "price_changed": 1, "volume_filled": 0, "removed": 0}
+    np.testing.assert_array_equal(book.spreads_by_type().best_sell, [9.0])
+
+
+def test_filter_orders_by_system_after_duplicated_order():
+    orders = [order(1, 10.0, system_id=100), order(1, 9.5, system_id=100),
+              order(2, 11.0, system_id=200), order(3, 12.0, system_id=300)]
+    orders, book, _ = MarketSnapshotEngine._build_book(orders, None)
+    now = datetime.now()
+    snapshot = RegionSnapshot(
+        region_id=10000002, version=1, orders=orders, book=book, fetched_at=now, expires_at=now
+    )
+
+    assert snapshot.total_orders == 3
+    assert [o.order_id for o in snapshot.filter_orders(system_id=200)] == [2]
+    assert [o.order_id for o in snapshot.filter_orders(system_id=300)] == [3]
+    assert [o.price for o in snapshot.filter_orders(system_id=100)] == [9.5]
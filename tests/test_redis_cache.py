@@ -0,0 +1,127 @@
+# tests/test_redis_cache.py
+import asyncio
+import time
+
+import pytest
+
+from app.infrastructure.api.redis_cache import (
+    COMPRESS_THRESHOLD,
+    COMPRESSED,
+    RECORD_HEADER,
+    RedisCache,
+    decode_record,
+    encode_record,
+)
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def cache_pair():
+    """Dos caches con distinto namespace sobre el mismo servidor falso"""
+    server = fakeredis.FakeServer()
+    return (
+        RedisCache(fakeredis.FakeAsyncRedis(server=server), namespace="snt"),
+        RedisCache(fakeredis.FakeAsyncRedis(server=server), namespace="other"),
+    )
+
+
+def test_record_round_trip():
+    async def scenario():
+        cache, _ = cache_pair()
+        await cache.set("market?region_id=1", b'{"total": 1}', ttl=60)
+        value, fresh_until, stale_until = await cache.get_record("market?region_id=1")
+        assert value == b'{"total": 1}'
+        assert fresh_until == stale_until > time.time()
+        assert await cache.get_entry("market?region_id=1") == (b'{"total": 1}', True)
+        assert await cache.get_entry("missing") is None
+
+    run(scenario())
+
+
+def test_large_payload_is_compressed():
+    body = b'{"orders": [' + b'{"price": 5.0},' * 500 + b'{}]}'
+    assert len(body) > COMPRESS_THRESHOLD
+
+    record = encode_record(body, 10.0, 20.0)
+    assert record[RECORD_HEADER.size : RECORD_HEADER.size + 1] == COMPRESSED
+    assert len(record) < len(body)
+    assert decode_record(record) == (body, 10.0, 20.0)
+
+    async def scenario():
+        cache, _ = cache_pair()
+        await cache.set("big", body, ttl=60)
+        assert (await cache.get_entry("big"))[0] == body
+
+    run(scenario())
+
+
+def test_only_bytes_are_stored():
+    with pytest.raises(TypeError):
+        encode_record({"total": 1}, 10.0, 20.0)
+
+
+def test_corrupt_record_is_a_miss():
+    async def scenario():
+        cache, _ = cache_pair()
+        # Formato desconocido (p. ej. un pickle de una versión anterior)
+        await cache.client.set("snt:old", RECORD_HEADER.pack(9e9, 9e9) + b"p\x80\x04")
+        # Cabecera truncada y payload comprimido roto
+        await cache.client.set("snt:short", b"\x00\x01")
+        await cache.client.set("snt:zlib", RECORD_HEADER.pack(9e9, 9e9) + COMPRESSED + b"nope")
+        for key in ("old", "short", "zlib"):
+            assert await cache.get_record(key) is None
+
+    run(scenario())
+
+
+def test_ttl_expiry():
+    async def scenario():
+        cache, _ = cache_pair()
+        await cache.set("stale", b"1", ttl=0.05, stale_ttl=60)
+        await cache.set("gone", b"2", ttl=0.05)
+        await asyncio.sleep(0.15)
+        # Caducada pero aún servible mientras se revalida
+        assert await cache.get_entry("stale") == (b"1", False)
+        # Sin margen stale, Redis la expira con su TTL nativo
+        assert await cache.get_entry("gone") is None
+        assert await cache.client.exists("snt:gone") == 0
+
+    run(scenario())
+
+
+def test_clear_only_touches_its_namespace():
+    async def scenario():
+        cache, other = cache_pair()
+        await cache.set("a", b"1", ttl=60)
+        await cache.set("b", b"2", ttl=60)
+        await other.set("a", b"3", ttl=60)
+        await cache.clear()
+        assert await cache.get_entry("a") is None
+        assert await cache.get_entry("b") is None
+        assert await other.get_entry("a") == (b"3", True)
+
+    run(scenario())
+
+
+def test_unavailable_redis_degrades_to_misses():
+    class Down:
+        async def get(self, key):
+            raise ConnectionError("down")
+
+        async def set(self, *args, **kwargs):
+            raise ConnectionError("down")
+
+        def scan_iter(self, match=None):
+            raise ConnectionError("down")
+
+    async def scenario():
+        cache = RedisCache(Down(), namespace="snt")
+        await cache.set("a", b"1", ttl=60)
+        assert await cache.get_entry("a") is None
+        await cache.clear()
+
+    run(scenario())